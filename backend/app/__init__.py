@@ -21,16 +21,22 @@ def create_app():
     from .config import Config
     app.config.from_object(Config)
 
-    # Initialize extensions
-    db.init_app(app)
+    # Initialize extensions (engine options / SQLite pragmas in database.py)
+    from .database import init_database
+    init_database(app)
 
     # Register blueprints (ORDER MATTERS!)
-    from .routes import home, auth, claims, instructor, verify
+    from .routes import home, auth, claims, instructor, verify, registrar
     app.register_blueprint(home.bp)  # This handles /
     app.register_blueprint(auth.bp)  # This handles /auth/*
     app.register_blueprint(claims.bp)   # Our student claim route
     app.register_blueprint(instructor.bp)
     app.register_blueprint(verify.bp)
+    app.register_blueprint(registrar.bp)  # /registrar/import
+
+    # Register CLI commands (flask storage ...)
+    from .cli import register_commands
+    register_commands(app)
 
     # Create database tables
     with app.app_context():
@@ -0,0 +1,215 @@
+"""
+Maintenance commands for the Flask CLI
+Run from backend/ with e.g.: flask --app run storage shard --dry-run
+"""
+import os
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import update
+
+from app import db
+from app.models import Claim
+from app.services.storage import StorageService
+from app.services.evidence_gc import collect_garbage
+from app.services.schema import sync_indexes
+from app.services.claim_stats import rebuild_status_counts
+from app.services.issuance import RECEIPT_WAIT_SECONDS, confirm_minting
+from app.services.roster_import import DEFAULT_CHUNK_SIZE, ROSTER_FORMATS, RosterError, import_roster, roster_format
+from app.services.pdf_signer import KEY_TYPES, PDFSignerService, key_type_of
+
+storage_cli = AppGroup('storage', help='Private evidence storage maintenance.')
+
+
+@storage_cli.command('shard')
+@click.option('--base-path', default='app/private_storage', show_default=True,
+              help='Local storage directory to migrate.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be moved.')
+def shard_storage(base_path, dry_run):
+    """Move flat local evidence files into the sharded directory layout"""
+    storage = StorageService(base_path=base_path)
+    if storage.use_s3:
+        click.echo('S3 storage is configured, nothing to migrate locally.')
+        return
+
+    moves = storage.shard_existing_files(dry_run=dry_run)
+
+    for old_path, new_path in moves:
+        click.echo(f"{old_path} -> {new_path}")
+
+    if dry_run:
+        click.echo(f"Dry run: {len(moves)} files would be moved.")
+        return
+
+    # point the claims at the new location (reads also fall back to the shard, so order is safe)
+    updated = 0
+    for old_path, new_path in moves:
+        result = db.session.execute(
+            update(Claim)
+            .where(Claim.evidence_file_path == old_path)
+            .values(evidence_file_path=new_path)
+        )
+        updated += result.rowcount
+    db.session.commit()
+
+    click.echo(f"Moved {len(moves)} files, updated {updated} claims.")
+
+
+@storage_cli.command('gc')
+@click.option('--base-path', default='app/private_storage', show_default=True,
+              help='Local storage directory.')
+@click.option('--retention-days', type=int, default=lambda: int(os.getenv('EVIDENCE_RETENTION_DAYS', 30)),
+              show_default='EVIDENCE_RETENTION_DAYS or 30',
+              help='Keep evidence of denied claims this many days after the decision.')
+@click.option('--orphan-grace-hours', type=int, default=24, show_default=True,
+              help='Skip unreferenced files younger than this.')
+@click.option('--batch-size', type=int, default=1000, show_default=True,
+              help='Files per delete batch (S3 DeleteObjects allows at most 1000).')
+@click.option('--workers', type=int, default=8, show_default=True,
+              help='Parallel unlinks for local files.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be deleted.')
+def gc_storage(base_path, retention_days, orphan_grace_hours, batch_size, workers, dry_run):
+    """Delete evidence of old denied claims and files without a claim"""
+    storage = StorageService(base_path=base_path)
+    report = collect_garbage(
+        storage,
+        retention_days=retention_days,
+        orphan_grace_hours=orphan_grace_hours,
+        dry_run=dry_run,
+        batch_size=batch_size,
+        workers=workers,
+        # signed PDFs made with any other key are stale
+        key_fingerprint=PDFSignerService().key_fingerprint
+    )
+
+    if dry_run:
+        for path in report['paths']:
+            click.echo(f"would delete {path}")
+
+    click.echo(f"Denied claims past retention: {report['denied_claims']}")
+    click.echo(f"Orphaned files: {report['orphaned_files']} ({report['orphaned_bytes']} bytes)")
+    click.echo(f"Stale uploads: {report['stale_uploads']}")
+    click.echo(f"Stale signed PDFs: {report['stale_artifacts']}")
+    if dry_run:
+        click.echo('Dry run: nothing was deleted.')
+        return
+
+    click.echo(f"Deleted {report['deleted']} files.")
+    for path in report['failed']:
+        click.echo(f"failed to delete {path}", err=True)
+
+
+signing_cli = AppGroup('signing', help='Evidence signing key management.')
+
+
+@signing_cli.command('rotate-key')
+@click.option('--key-type', type=click.Choice(KEY_TYPES), default=None,
+              help='Type of the new key (default: PDF_SIGNING_KEY_TYPE, else the current type).')
+def rotate_signing_key(key_type):
+    """Retire the current signing key and generate a new one"""
+    signer = PDFSignerService()
+    retired = signer.rotate_key(key_type or os.getenv('PDF_SIGNING_KEY_TYPE'))
+
+    click.echo(f"Retired key {retired} (kept for verification)")
+    click.echo(f"New {signer.key_type} key {signer.key_fingerprint}")
+    click.echo('Restart the app and signing workers to sign with the new key.')
+
+
+@signing_cli.command('list-keys')
+def list_signing_keys():
+    """Show the current and retired signing certificates"""
+    signer = PDFSignerService()
+    for fingerprint, certificate in signer.verification_certificates.items():
+        marker = '*' if fingerprint == signer.key_fingerprint else ' '
+        click.echo(f"{marker} {fingerprint} {key_type_of(certificate.public_key()):<8} "
+                   f"valid until {certificate.not_valid_after.date()}")
+
+
+database_cli = AppGroup('database', help='Database schema maintenance.')
+
+
+@database_cli.command('ensure-indexes')
+def ensure_indexes():
+    """Create missing model indexes and rebuild changed ones (create_all skips existing tables)"""
+    report = sync_indexes(db.engine, db.metadata)
+
+    for name in report['created']:
+        click.echo(f"Created {name}")
+    for name in report['rebuilt']:
+        click.echo(f"Rebuilt {name}")
+    for name, duplicates in report['duplicates'].items():
+        click.echo(f"Cannot build unique index {name}, duplicate values:", err=True)
+        for values, ids in duplicates:
+            click.echo(f"  {', '.join(str(value) for value in values)}: rows {', '.join(map(str, ids))}", err=True)
+
+    if report['duplicates']:
+        raise SystemExit(1)
+    if not report['created'] and not report['rebuilt']:
+        click.echo('All indexes exist.')
+
+
+@database_cli.command('rebuild-counters')
+def rebuild_counters():
+    """Recompute the dashboard status counters from the claims (after bulk SQL edits)"""
+    counts = rebuild_status_counts()
+    for status, count in counts.items():
+        click.echo(f"{status:<10}{count:>10}")
+
+
+registrar_cli = AppGroup('registrar', help='Registrar batch issuance.')
+
+
+@registrar_cli.command('import')
+@click.argument('roster', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(ROSTER_FORMATS), default=None,
+              help='Roster format (default: from the file extension, else csv).')
+@click.option('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, show_default=True,
+              help='Rows per INSERT and transaction.')
+def import_claims(roster, fmt, chunk_size):
+    """Import pending claims from a CSV or JSONL roster"""
+    with open(roster, 'rb') as f:
+        try:
+            report = import_roster(f, fmt or roster_format(roster), chunk_size=chunk_size)
+        except RosterError as e:
+            raise click.ClickException(
+                f"{e} (after {e.report['imported']} claims imported up to line {e.report['committed_line']}; "
+                "importing the file again skips them)"
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    for line, error in report['errors']:
+        click.echo(f"line {line}: {error}", err=True)
+    if report['failed'] > len(report['errors']):
+        click.echo(f"... {report['failed'] - len(report['errors'])} more rejected rows", err=True)
+
+    click.echo(f"Read {report['rows']} rows: {report['imported']} imported, "
+               f"{report['skipped']} already existed, {report['failed']} rejected.")
+    if report['failed']:
+        raise SystemExit(1)
+
+
+@registrar_cli.command('confirm-mints')
+@click.option('--timeout', type=int, default=RECEIPT_WAIT_SECONDS, show_default=True,
+              help='Seconds to wait for receipts in total.')
+def confirm_mints(timeout):
+    """Record the outcome of sent minting transactions (claims left in 'minting')"""
+    from app.services.blockchain import BlockchainService
+
+    claims = Claim.query.filter(Claim.status == 'minting').order_by(Claim.id).all()
+    results = confirm_minting(claims, BlockchainService(), timeout=timeout)
+    for claim_id, result in results.items():
+        if result.get('error'):
+            click.echo(f"claim {claim_id}: {result['error']} ({result['tx_hash']})", err=True)
+
+    outcomes = [result['status'] for result in results.values()]
+    click.echo(f"{outcomes.count('minted')} minted, {outcomes.count('approved')} failed, "
+               f"{outcomes.count('minting')} still pending.")
+
+
+def register_commands(app):
+    """Attach all CLI command groups to the app"""
+    app.cli.add_command(storage_cli)
+    app.cli.add_command(signing_cli)
+    app.cli.add_command(database_cli)
+    app.cli.add_command(registrar_cli)
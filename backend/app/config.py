@@ -8,12 +8,27 @@ load_dotenv()
 class Config:
     # Flask settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-fallback'
+    # previous secret keys (comma separated), still accepted for stateless verifier links
+    SECRET_KEY_FALLBACKS = [key for key in (os.environ.get('SECRET_KEY_FALLBACKS') or '').split(',') if key]
+    # 'stored' (random token in VERIFIER_LINK_STORE) or 'stateless' (HMAC signed token)
+    VERIFIER_LINK_MODE = os.environ.get('VERIFIER_LINK_MODE') or 'stored'
+    # seconds HTTP caches may serve /verify/credential/<id>.json before revalidating
+    CREDENTIAL_CACHE_MAX_AGE = int(os.environ.get('CREDENTIAL_CACHE_MAX_AGE') or 60)
 
     # Database settings
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///campuscred.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite: how long a writer waits for the lock, memory-mapped I/O size (app/database.py)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    # PostgreSQL connection pool per app process
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)
 
     # Server settings
     HOST = os.environ.get('HOST') or '127.0.0.1'
     PORT = int(os.environ.get('PORT') or 5000)
-    DEBUG = os.environ.get('FLASK_DEBUG', 'True') == 'True'
\ No newline at end of file
+    DEBUG = os.environ.get('FLASK_DEBUG', 'True') == 'True'
+    # Evidence uploads
+    MAX_EVIDENCE_UPLOAD_SIZE = int(os.environ.get('MAX_EVIDENCE_UPLOAD_SIZE') or 100 * 1024 * 1024)
@@ -0,0 +1,74 @@
+"""
+Database engine configuration
+SQLite (the default) runs in WAL mode so readers do not block the writer and a commit
+only appends to the log; busy_timeout makes a second writer wait for the lock instead of
+failing with 'database is locked'. PostgreSQL gets a bounded connection pool with
+pre-ping, so connections dropped by the server or a proxy are replaced transparently.
+Explicit SQLALCHEMY_ENGINE_OPTIONS in the config win over these defaults.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app import db
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+
+    if url.get_backend_name() == 'sqlite':
+        # SQLAlchemy pools file connections (QueuePool), so the pragmas run once per
+        # connection; the writer lock, not the pool size, is what serialises writes
+        return {
+            'connect_args': {'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000},
+        }
+
+    if url.get_backend_name() == 'postgresql':
+        return {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': 30,
+            # below typical server / load balancer idle timeouts
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+        }
+
+    return {'pool_pre_ping': True}
+
+
+def _is_file_database(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def sqlite_pragmas(config):
+    """PRAGMA statements run on every new SQLite connection"""
+    return [
+        'PRAGMA journal_mode=WAL',
+        # WAL + NORMAL: durable against application crashes, fsync only at checkpoints
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+    ]
+
+
+def init_database(app):
+    """db.init_app with the engine options and SQLite pragmas of this module"""
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    db.init_app(app)
+
+    if not _is_file_database(make_url(app.config['SQLALCHEMY_DATABASE_URI'])):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', set_pragmas)
@@ -6,6 +6,16 @@ import hashlib
 class Claim(db.Model):
     """Model for credential claims submitted by students"""
     __tablename__ = 'claims'
+    # one index per list/lookup the routes run, equality column first then the sort column
+    __table_args__ = (
+        db.Index('ix_claims_status_created_at', 'status', 'created_at'),  # pending queue, status counts
+        db.Index('ix_claims_status_approved_at', 'status', 'approved_at'),  # recently approved, approved this week
+        # minted/revoked list: minted_at is only set on those, walking it newest first stops after the LIMIT
+        db.Index('ix_claims_minted_at', 'minted_at'),
+        db.Index('ix_claims_student_address_created_at', 'student_address', 'created_at'),  # student portal
+        db.Index('ix_claims_created_at', 'created_at'),  # portal without wallet
+        db.Index('ix_claims_student_email_course_code', 'student_email', 'course_code'),  # roster re-import duplicates
+    )
 
     # Primary key
     id = db.Column(db.Integer, primary_key=True)
@@ -22,12 +32,13 @@ class Claim(db.Model):
 
     # File storage (PRIVATE - not on blockchain/IPFS)
     evidence_file_path = db.Column(db.String(500))  # Path to privately stored file
-    evidence_file_hash = db.Column(db.String(64))  # SHA-256 hash of file
+    evidence_file_hash = db.Column(db.String(64), index=True)  # SHA-256 hash of file, /verify/hash/<sha256>
     evidence_file_name = db.Column(db.String(255))  # Original filename
 
     # Status tracking
-    status = db.Column(db.String(20), default='pending')
-    # values: 'pending', 'approved', 'denied', 'minted'
+    # active history: the status counters need the old value also when it was expired by a commit
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)
+    # values: 'pending', 'approved', 'denied', 'minting' (transaction sent), 'minted', 'revoked'
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -40,9 +51,9 @@ class Claim(db.Model):
     approved_by = db.Column(db.String(100))  # Instructor name/ID
 
     # Blockchain data (for Sprint 2)
-    token_id = db.Column(db.Integer)  # NFT token ID
+    token_id = db.Column(db.Integer, index=True, unique=True)  # NFT token ID, one claim per token
     metadata_uri = db.Column(db.String(500))  # IPFS URI to metadata
-    transaction_hash = db.Column(db.String(66))  # Ethereum transaction hash
+    transaction_hash = db.Column(db.String(66), index=True)  # Ethereum transaction hash, /verify/tx/<hash>
 
     def __repr__(self):
         return f'<Claim {self.id}: {self.course_code} - {self.status}>'
@@ -58,4 +69,88 @@ class Claim(db.Model):
             # Read file in chunks to handle large files
             for byte_block in iter(lambda: f.read(4096), b""):
                 sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
\ No newline at end of file
+        return sha256_hash.hexdigest()
+
+
+class EvidenceUpload(db.Model):
+    """Resumable (chunked) evidence upload, attached to a claim once finalized"""
+    __tablename__ = 'evidence_uploads'
+
+    # random upload ID, doubles as the capability to write to the upload
+    id = db.Column(db.String(32), primary_key=True)
+
+    file_name = db.Column(db.String(255), nullable=False)  # Original filename
+    total_size = db.Column(db.BigInteger, nullable=False)  # Announced size in bytes
+    offset = db.Column(db.BigInteger, default=0)  # Bytes received so far
+
+    # where the bytes end up: staging file locally, multipart upload for S3
+    staging_path = db.Column(db.String(500))
+    storage_key = db.Column(db.String(500))  # Final stored path / S3 key
+    s3_upload_id = db.Column(db.String(255))  # S3 multipart upload ID
+    s3_parts = db.Column(db.Text)  # JSON list of completed parts
+
+    file_hash = db.Column(db.String(64))  # SHA-256, set on finalize
+
+    status = db.Column(db.String(20), default='uploading')
+    # values: 'uploading', 'complete', 'attached'
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<EvidenceUpload {self.id}: {self.offset}/{self.total_size} - {self.status}>'
+
+
+class VerifierLink(db.Model):
+    """Time-limited verifier link, shared by all app processes"""
+    __tablename__ = 'verifier_links'
+
+    token = db.Column(db.String(64), primary_key=True)
+    claim_id = db.Column(db.Integer, nullable=False)
+    token_id = db.Column(db.Integer)
+    scopes = db.Column(db.String(50), default='download view')  # space separated
+
+    # unix timestamp; indexed so purging expired links is a range delete
+    expires_at = db.Column(db.Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<VerifierLink claim {self.claim_id} until {self.expires_at}>'
+
+
+class ClaimStatusCount(db.Model):
+    """Number of claims per status, kept current on every flush (see _count_status_changes)"""
+    __tablename__ = 'claim_status_counts'
+
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ClaimStatusCount {self.status}: {self.count}>'
+
+
+@db.event.listens_for(db.Session, 'before_flush')
+def _count_status_changes(session, flush_context, instances):
+    # counter deltas of this flush, written in the same transaction as the claims
+    deltas = {}
+    default_status = Claim.__table__.c.status.default.arg
+    for claim in session.new:
+        if isinstance(claim, Claim):
+            status = claim.status or default_status
+            deltas[status] = deltas.get(status, 0) + 1
+    for claim in session.deleted:
+        if isinstance(claim, Claim):
+            deltas[claim.status] = deltas.get(claim.status, 0) - 1
+    for claim in session.dirty:
+        if isinstance(claim, Claim) and claim not in session.deleted:
+            added, _, removed = db.inspect(claim).attrs.status.history
+            if added and removed and added[0] != removed[0]:
+                deltas[removed[0]] = deltas.get(removed[0], 0) - 1
+                deltas[added[0]] = deltas.get(added[0], 0) + 1
+
+    counts = ClaimStatusCount.__table__
+    for status, delta in deltas.items():
+        if delta:
+            # only existing rows are updated, rebuild_status_counts creates them from the claims
+            session.connection().execute(
+                counts.update().where(counts.c.status == status).values(count=counts.c.count + delta)
+            )
@@ -1,11 +1,22 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, make_response, current_app, get_template_attribute
 from app import db
-from app.models import Claim
+from app.models import Claim, EvidenceUpload
 from app.services.storage import StorageService
+from app.services.chunked_upload import ChunkedUploadService, UploadError, DEFAULT_MAX_UPLOAD_SIZE
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_page, page_size
+from app.services.read_models import PortalClaimRow
 
 bp = Blueprint('student', __name__, url_prefix='/student')
 storage_service = StorageService()
 
+# status tabs of the portal, each one is its own keyset-paginated list
+PORTAL_TABS = {
+    'pending': ('pending',),
+    'approved': ('approved',),
+    'denied': ('denied', 'rejected'),
+    'minted': ('minted',),
+}
+
 
 @bp.route('/portal')
 def portal():
@@ -13,14 +24,71 @@ def portal():
     # get wallet address from session if user connected
     wallet_address = session.get('wallet_address')
 
-    # If wallet connected, filter claims by wallet
-    if wallet_address:
-        claims = Claim.query.filter_by(student_address=wallet_address).order_by(Claim.created_at.desc()).all()
+    # first page of every tab only, more via /student/claims (keyset pagination)
+    rows, next_cursor = keyset_page(_portal_query(wallet_address), limit=DEFAULT_PAGE_SIZE)
+    claims = PortalClaimRow.from_rows(rows)
+
+    status_tabs = {}
+    for tab in PORTAL_TABS:
+        tab_rows, tab_cursor = keyset_page(_portal_query(wallet_address, tab), limit=DEFAULT_PAGE_SIZE)
+        status_tabs[tab] = (PortalClaimRow.from_rows(tab_rows), tab_cursor)
+
+    return render_template('student_portal.html', credentials=claims, wallet=wallet_address,
+                           next_cursor=next_cursor, status_tabs=status_tabs)
+
+
+@bp.route('/claims')
+def list_claims():
+    """
+    Next page of the portal's claim list (infinite scroll)
+    Query: cursor (next_cursor of the previous page), limit, status (tab, default "All")
+    """
+    tab = request.args.get('status')
+    if tab and tab not in PORTAL_TABS:
+        return jsonify({'success': False, 'error': 'Unknown status'}), 400
+
+    try:
+        rows, next_cursor = keyset_page(
+            _portal_query(session.get('wallet_address'), tab),
+            cursor=request.args.get('cursor'),
+            limit=page_size(request.args.get('limit'))
+        )
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    claims = PortalClaimRow.from_rows(rows)
+
+    if tab:
+        status_card = get_template_attribute('_claim_rows.html', 'portal_status_card')
+        html = ''.join(status_card(claim, tab) for claim in claims)
     else:
-        # Show all claims (for demo purposes)
-        claims = Claim.query.order_by(Claim.created_at.desc()).all()
+        card = get_template_attribute('_claim_rows.html', 'portal_claim_card')
+        html = ''.join(card(claim) for claim in claims)
+    return jsonify({
+        'success': True,
+        'claims': [{
+            'id': claim.id,
+            'course_code': claim.course_code,
+            'credential_type': claim.credential_type,
+            'description': claim.description,
+            'status': claim.status,
+            'token_id': claim.token_id,
+            'created_at': claim.created_at.isoformat(),
+        } for claim in claims],
+        'html': html,
+        'next_cursor': next_cursor
+    })
+
 
-    return render_template('student_portal.html', credentials=claims, wallet=wallet_address)
+def _portal_query(wallet_address, tab=None):
+    # read-only rows with the columns the portal shows
+    query = PortalClaimRow.query()
+    if tab:
+        query = query.filter(Claim.status.in_(PORTAL_TABS[tab]))
+    # If wallet connected, filter claims by wallet
+    if wallet_address:
+        return query.filter(Claim.student_address == wallet_address)
+    # Show all claims (for demo purposes)
+    return query
 
 
 @bp.route('/submit-claim', methods=['POST'])
@@ -35,6 +103,7 @@ def submit_claim():
         course_name = request.form.get('course_name', '').strip()
         description = request.form.get('description', '').strip()
         evidence_file = request.files.get('evidence')
+        upload_id = request.form.get('upload_id', '').strip()
 
         # get wallet address from session
         wallet_address = session.get('wallet_address')
@@ -49,6 +118,32 @@ def submit_claim():
             flash('Please enter a valid email address!', 'danger')
             return redirect(url_for('student.portal'))
 
+        # evidence sent earlier through the resumable upload endpoints
+        evidence_upload = None
+        if upload_id:
+            evidence_upload = db.session.get(EvidenceUpload, upload_id)
+            if not evidence_upload or evidence_upload.status != 'complete':
+                flash('Evidence upload not found or not finished, please upload the file again!', 'danger')
+                return redirect(url_for('student.portal'))
+
+        # store and hash the evidence before touching the database, so the claim is
+        # inserted complete in one transaction (one commit per submission)
+        evidence_path = evidence_name = evidence_hash = None
+        stored_path = None
+        if evidence_upload:
+            evidence_path = evidence_upload.storage_key
+            evidence_name = evidence_upload.file_name
+            evidence_hash = evidence_upload.file_hash
+        elif evidence_file and evidence_file.filename:
+            stored_path, evidence_name = storage_service.save_evidence_file(evidence_file)
+
+            if stored_path:
+                evidence_path = stored_path
+                # streaming hash, works the same for S3 objects and (memory-mapped) local files
+                evidence_hash = storage_service.hash_file(stored_path)
+                if not evidence_hash:
+                    flash('Warning: File uploaded but hash could not be computed', 'warning')
+
         # Create claim
         new_claim = Claim(
             student_name=student_name,
@@ -57,41 +152,36 @@ def submit_claim():
             credential_type=credential_type,
             course_code=course_code.upper(),
             description=f"{course_name}: {description}" if course_name else description,
+            evidence_file_path=evidence_path,
+            evidence_file_name=evidence_name,
+            evidence_file_hash=evidence_hash,
             status='pending'
         )
 
+        if evidence_upload:
+            # conditional UPDATE: of two submits racing with the same upload_id only
+            # one sees the row still 'complete', the other attaches nothing
+            uploads_table = EvidenceUpload.__table__
+            attached = db.session.execute(
+                uploads_table.update()
+                .where(uploads_table.c.id == evidence_upload.id,
+                       uploads_table.c.status == 'complete')
+                .values(status='attached')
+            ).rowcount
+            if attached != 1:
+                db.session.rollback()
+                flash('Evidence upload is already attached to a claim, please upload the file again!', 'danger')
+                return redirect(url_for('student.portal'))
+
         db.session.add(new_claim)
-        db.session.commit()
-
-        # Handle file upload
-        if evidence_file and evidence_file.filename:
-            file_path, original_filename = storage_service.save_evidence_file(
-                evidence_file,
-                new_claim.id
-            )
-
-            if file_path:
-                # Compute hash - different method for S3 vs local files
-                if storage_service.use_s3:
-                    # For S3: retrieve file content and compute hash
-                    file_content = storage_service.get_file(file_path)
-                    if file_content:
-                        import hashlib
-                        sha256_hash = hashlib.sha256()
-                        sha256_hash.update(file_content)
-                        file_hash = sha256_hash.hexdigest()
-                    else:
-                        flash('Warning: File uploaded but hash could not be computed', 'warning')
-                        file_hash = None
-                else:
-                    # for our local files we already use existing method
-                    file_hash = Claim.compute_file_hash(file_path)
-
-                # update claim with file info
-                new_claim.evidence_file_path = file_path
-                new_claim.evidence_file_name = original_filename
-                new_claim.evidence_file_hash = file_hash
-                db.session.commit()
+        try:
+            db.session.commit()
+        except Exception:
+            # no claim points at the stored file, do not leave it behind
+            db.session.rollback()
+            if stored_path:
+                storage_service.delete_file(stored_path)
+            raise
 
         success_message = f'Claim submitted successfully! Tracking ID: #{new_claim.id}'
         if wallet_address:
@@ -105,4 +195,108 @@ def submit_claim():
     except Exception as e:
         db.session.rollback()
         flash(f'Error submitting claim: {str(e)}', 'danger')
-        return redirect(url_for('student.portal'))
\ No newline at end of file
+        return redirect(url_for('student.portal'))
+
+
+def _upload_service():
+    return ChunkedUploadService(
+        storage_service,
+        max_size=current_app.config.get('MAX_EVIDENCE_UPLOAD_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+    )
+
+
+def _upload_headers(response, upload):
+    response.headers['Upload-Offset'] = str(upload.offset)
+    response.headers['Upload-Length'] = str(upload.total_size)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@bp.route('/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable evidence upload
+    Expects JSON {"filename": ..., "size": ...}; chunks are then sent with PATCH
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        total_size = int(data.get('size') or 0)
+    except (TypeError, ValueError):
+        total_size = 0
+
+    try:
+        upload = _upload_service().create(data.get('filename'), total_size)
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), e.status_code
+
+    response = jsonify({
+        'success': True,
+        'upload_id': upload.id,
+        'offset': 0,
+        'upload_url': url_for('student.upload_chunk', upload_id=upload.id)
+    })
+    response.status_code = 201
+    response.headers['Location'] = url_for('student.upload_chunk', upload_id=upload.id)
+    return _upload_headers(response, upload)
+
+
+@bp.route('/uploads/<upload_id>', methods=['HEAD'])
+def upload_status(upload_id):
+    """Current offset of an upload, used by the client to resume"""
+    upload = db.session.get(EvidenceUpload, upload_id)
+    if not upload:
+        return make_response('', 404)
+    return _upload_headers(make_response('', 200), upload)
+
+
+@bp.route('/uploads/<upload_id>', methods=['PATCH'])
+def upload_chunk(upload_id):
+    """
+    Append a chunk; the Upload-Offset header must match the bytes received so far
+    """
+    upload = db.session.get(EvidenceUpload, upload_id)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'success': False, 'error': 'Upload-Offset header is required'}), 400
+
+    try:
+        upload = _upload_service().append(upload, offset, request.stream)
+    except UploadError as e:
+        db.session.rollback()
+        if e.status_code >= 500:
+            current_app.logger.error(f"Failed to store chunk of upload {upload_id}: {str(e)}")
+        response = jsonify({'success': False, 'error': str(e)})
+        response.status_code = e.status_code
+        return _upload_headers(response, db.session.get(EvidenceUpload, upload_id))
+
+    return _upload_headers(make_response('', 204), upload)
+
+
+@bp.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Finish an upload, returns the evidence hash to show the student"""
+    upload = db.session.get(EvidenceUpload, upload_id)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+
+    try:
+        upload = _upload_service().finalize(upload)
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to finalize upload {upload_id}: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to store evidence file'}), 500
+
+    return jsonify({
+        'success': True,
+        'upload_id': upload.id,
+        'file_name': upload.file_name,
+        'file_hash': upload.file_hash,
+        'size': upload.total_size
+    })
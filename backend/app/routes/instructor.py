@@ -1,11 +1,18 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, get_template_attribute
 from app import db
 from app.models import Claim
-from datetime import datetime, timedelta
+from datetime import datetime
 from app.routes.auth import instructor_required
+from app.services.claim_stats import adjust_status_count, dashboard_stats
+from app.services.issuance import credential_metadata, issue_credentials
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_page, page_size
+from app.services.read_models import PendingClaimRow, RecentClaimRow
 
 bp = Blueprint('instructor', __name__, url_prefix='/instructor')
 
+# claims per bulk approval request, each minted one is an IPFS upload and a transaction
+MAX_BULK_APPROVE = 500
+
 
 @bp.route('/dashboard')
 @instructor_required
@@ -13,38 +20,74 @@ def dashboard():
     """
     Instructor dashboard - view and manage claims
     """
-    # get all the pending claims
-    pending_claims = Claim.query.filter_by(status='pending').order_by(Claim.created_at.desc()).all()
+    # first page of the pending claims, more via /instructor/pending-claims
+    rows, next_cursor = keyset_page(_pending_query(), limit=DEFAULT_PAGE_SIZE)
+    pending_claims = PendingClaimRow.from_rows(rows)
 
     # recently approved claims
-    approved_claims = Claim.query.filter_by(status='approved').order_by(Claim.approved_at.desc()).limit(5).all()
+    approved_claims = RecentClaimRow.from_rows(
+        RecentClaimRow.query().filter(Claim.status == 'approved').order_by(Claim.approved_at.desc()).limit(5)
+    )
 
     # minted claims (including revoked ones so we can see them)
-    minted_claims = Claim.query.filter(
-        Claim.status.in_(['minted', 'revoked'])
-    ).order_by(Claim.minted_at.desc()).limit(10).all()
-
-    # Calculate statistics
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-    stats = {
-        'total_claims': Claim.query.count(),
-        'pending': Claim.query.filter_by(status='pending').count(),
-        'approved_week': Claim.query.filter(
-            Claim.status == 'approved',
-            Claim.approved_at >= one_week_ago
-        ).count(),
-        'total_minted': Claim.query.filter_by(status='minted').count()
-    }
+    minted_claims = RecentClaimRow.from_rows(
+        RecentClaimRow.query().filter(
+            Claim.status.in_(['minted', 'revoked'])
+        ).order_by(Claim.minted_at.desc()).limit(10)
+    )
+
+    # statistics from the maintained counters instead of COUNTs over the whole table
+    stats = dashboard_stats()
 
     return render_template(
         'instructor_dashboard.html',
         pending_claims=pending_claims,
         approved_claims=approved_claims,
         minted_claims=minted_claims,
-        stats=stats
+        stats=stats,
+        next_cursor=next_cursor
     )
 
 
+@bp.route('/pending-claims')
+@instructor_required
+def pending_claims_page():
+    """
+    Next page of pending claims for the dashboard (infinite scroll)
+    Query: cursor (next_cursor of the previous page), limit
+    """
+    try:
+        rows, next_cursor = keyset_page(
+            _pending_query(),
+            cursor=request.args.get('cursor'),
+            limit=page_size(request.args.get('limit'))
+        )
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    claims = PendingClaimRow.from_rows(rows)
+
+    row = get_template_attribute('_claim_rows.html', 'pending_claim_row')
+    return jsonify({
+        'success': True,
+        'claims': [{
+            'id': claim.id,
+            'student_name': claim.student_name,
+            'student_email': claim.student_email,
+            'credential_type': claim.credential_type,
+            'course_code': claim.course_code,
+            'status': claim.status,
+            'created_at': claim.created_at.isoformat(),
+        } for claim in claims],
+        'html': ''.join(row(claim) for claim in claims),
+        'next_cursor': next_cursor
+    })
+
+
+def _pending_query():
+    # only the columns of the pending table, as read-only rows
+    return PendingClaimRow.query().filter(Claim.status == 'pending')
+
+
 @bp.route('/claim/<int:claim_id>')
 @instructor_required
 def get_claim(claim_id):
@@ -98,19 +141,7 @@ def approve_claim(claim_id):
 
                 # create metadata
                 ipfs_service = IPFSService()
-                metadata = {
-                    "name": f"{claim.course_code} - {claim.credential_type}",
-                    "description": claim.description or f"Credential for {claim.course_code}",
-                    "attributes": [
-                        {"trait_type": "Course Code", "value": claim.course_code},
-                        {"trait_type": "Credential Type", "value": claim.credential_type},
-                        {"trait_type": "Issuer", "value": "CampusCred Pilot"},
-                        {"trait_type": "Student", "value": claim.student_name},
-                        {"trait_type": "Issued Date", "value": claim.approved_at.strftime('%Y-%m-%d')}
-                    ],
-                    "external_url": f"https://campuscred.app/verify/{claim.id}",
-                    "evidence_hash": claim.evidence_file_hash
-                }
+                metadata = credential_metadata(claim)
 
                 # Upload metadata to IPFS
                 current_app.logger.info(f"Uploading metadata to IPFS for claim {claim_id}")
@@ -132,6 +163,9 @@ def approve_claim(claim_id):
                 claim.minted_at = datetime.utcnow()
                 db.session.commit()
 
+                # sign the PDF evidence now so verifier downloads are a plain file serve
+                _presign_evidence(claim)
+
                 return jsonify({
                     'success': True,
                     'message': f'Claim approved and NFT minted! Token ID: {token_id}',
@@ -164,6 +198,118 @@ def approve_claim(claim_id):
         }), 500
 
 
+@bp.route('/bulk-approve', methods=['POST'])
+@instructor_required
+def bulk_approve():
+    """
+    Approve many pending claims at once and mint the credentials of those with a wallet
+    Expects JSON {"claim_ids": [...]} or {"course_code": "..."} (oldest MAX_BULK_APPROVE
+    pending claims of the course per request)
+    """
+    data = request.get_json(silent=True) or {}
+    claim_ids = data.get('claim_ids')
+    course_code = (data.get('course_code') or '').strip().upper()
+
+    if claim_ids is not None:
+        if not isinstance(claim_ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in claim_ids):
+            return jsonify({'success': False, 'error': 'claim_ids must be a list of integers'}), 400
+        claim_ids = list(dict.fromkeys(claim_ids))
+        if not claim_ids:
+            return jsonify({'success': False, 'error': 'No claim IDs provided'}), 400
+        if len(claim_ids) > MAX_BULK_APPROVE:
+            return jsonify({'success': False, 'error': f'At most {MAX_BULK_APPROVE} claims per request'}), 400
+        query = Claim.query.filter(Claim.id.in_(claim_ids))
+    elif course_code:
+        query = Claim.query.filter(Claim.course_code == course_code, Claim.status == 'pending').order_by(
+            Claim.created_at, Claim.id
+        ).limit(MAX_BULK_APPROVE)
+    else:
+        return jsonify({'success': False, 'error': 'Provide claim_ids or course_code'}), 400
+
+    try:
+        claims = query.all()
+        found = {claim.id: claim for claim in claims}
+        results = {}
+
+        # all status transitions in one conditional UPDATE: a claim another request
+        # approved in the meantime is not returned, so it is never minted twice
+        now = datetime.utcnow()
+        claims_table = Claim.__table__
+        approved_ids = set(db.session.execute(
+            claims_table.update()
+            .where(claims_table.c.id.in_([claim.id for claim in claims if claim.status == 'pending']),
+                   claims_table.c.status == 'pending')
+            .values(status='approved', approved_at=now, approved_by='Instructor', updated_at=now)
+            .returning(claims_table.c.id)
+        ).scalars())
+        # Core statement, the flush hook does not see it
+        adjust_status_count('pending', -len(approved_ids))
+        adjust_status_count('approved', len(approved_ids))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk approving claims: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    # the commit expired the loaded claims, they are read back with the new status
+    approved = [claim for claim in claims if claim.id in approved_ids]
+    for claim in claims:
+        if claim.id in approved_ids:
+            results[claim.id] = {'status': 'approved'}
+        else:
+            results[claim.id] = {'status': claim.status, 'error': f'Claim is already {claim.status}'}
+
+    current_app.logger.info(f"Bulk approved {len(approved)} claims")
+
+    # claims without a wallet stay approved until the student connects one
+    with_wallet = [claim for claim in approved if claim.student_address]
+    if with_wallet:
+        from app.services.blockchain import BlockchainService
+        from app.services.ipfs import IPFSService
+        try:
+            results.update(issue_credentials(with_wallet, IPFSService(), BlockchainService()))
+        except Exception as e:
+            # the approvals (and any sent transactions, as 'minting') are already committed
+            db.session.rollback()
+            current_app.logger.error(f"Bulk minting failed: {str(e)}")
+            for claim in with_wallet:
+                results[claim.id] = {'status': claim.status, 'tx_hash': claim.transaction_hash, 'error': str(e)}
+
+    # evidence of the minted claims is signed on its first download (no per-claim pre-signing here)
+    order = claim_ids if claim_ids is not None else [claim.id for claim in claims]
+    report = []
+    for claim_id in order:
+        result = results[claim_id] if claim_id in found else {'status': None, 'error': 'Claim not found'}
+        report.append({'id': claim_id, **result})
+
+    response = {
+        'success': True,
+        'approved': len(approved),
+        'minted': sum(1 for result in report if result['status'] == 'minted'),
+        # sent, receipt still outstanding: confirmed later with `flask registrar confirm-mints`
+        'minting': sum(1 for result in report if result['status'] == 'minting'),
+        'results': report
+    }
+    if claim_ids is None:
+        # pending claims of the course beyond this request's limit
+        response['remaining'] = Claim.query.filter(
+            Claim.course_code == course_code, Claim.status == 'pending'
+        ).count()
+    return jsonify(response)
+
+
+def _presign_evidence(claim):
+    # best effort: on failure the evidence is signed on its first download instead
+    try:
+        from app.services.signed_evidence import SignedEvidenceCache, is_signable
+        if not is_signable(claim):
+            return
+        from app.routes.verify import storage_service, evidence_signer
+        SignedEvidenceCache(storage_service, evidence_signer()).ensure_signed(claim)
+    except Exception as sign_error:
+        current_app.logger.warning(f"Pre-signing evidence for claim {claim.id} failed: {str(sign_error)}")
+
+
 @bp.route('/reject/<int:claim_id>', methods=['POST'])
 @instructor_required
 def reject_claim(claim_id):
@@ -0,0 +1,58 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.routes.auth import instructor_required
+from app.services.roster_import import ROSTER_FORMATS, RosterError, import_roster, roster_format
+
+bp = Blueprint('registrar', __name__, url_prefix='/registrar')
+
+
+@bp.route('/import', methods=['POST'])
+@instructor_required
+def import_claims():
+    """
+    Bulk import claims from a roster (CSV with header row or JSONL)
+    Send the file as multipart field 'roster', or as the raw request body with
+    Content-Type text/csv or application/x-ndjson; ?format=csv|jsonl overrides
+    """
+    roster = request.files.get('roster')
+    if roster:
+        stream = roster.stream
+        fmt = roster_format(roster.filename)
+    elif request.content_length:
+        # raw body, read as a stream instead of loading it whole
+        stream = request.stream
+        fmt = 'jsonl' if 'ndjson' in (request.mimetype or '') else 'csv'
+    else:
+        return jsonify({'success': False, 'error': 'No roster file provided'}), 400
+
+    fmt = request.args.get('format', fmt)
+    if fmt not in ROSTER_FORMATS:
+        return jsonify({'success': False, 'error': f"Unsupported format, use one of: {', '.join(ROSTER_FORMATS)}"}), 400
+
+    try:
+        report = import_roster(stream, fmt)
+    except RosterError as e:
+        # earlier chunks stay committed; importing the file again skips them
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'imported': e.report['imported'],
+            'committed_line': e.report['committed_line'],
+        }), 400
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Roster import failed: {e}")
+        return jsonify({'success': False, 'error': 'Import failed'}), 500
+
+    current_app.logger.info(
+        f"Roster import: {report['imported']} claims imported, {report['skipped']} already existed, "
+        f"{report['failed']} rows rejected"
+    )
+    return jsonify({
+        'success': True,
+        'rows': report['rows'],
+        'imported': report['imported'],
+        'skipped': report['skipped'],
+        'failed': report['failed'],
+        'errors': [{'line': line, 'error': error} for line, error in report['errors']],
+    })
@@ -1,21 +1,43 @@
 from flask import Blueprint, render_template, request, jsonify, current_app
 from app.models import Claim
 from app.services.blockchain import BlockchainService
-from flask import send_file
+from flask import Response, send_file, stream_with_context
+from werkzeug.utils import secure_filename
 from app.services.storage import StorageService
 from app.services.pdf_signer import PDFSignerService
 from app.services.ipfs import IPFSService
+from app.services.signed_evidence import SignedEvidenceCache, is_signable, signature_manifest
+from app.services.evidence_bundle import json_chunks, stream_chunks, stream_zip
+from app.services.signing_pool import SigningPool, SigningQueueFull
+from app.services.signature_verifier import verify_evidence
+from app.services.verifier_links import create_link_store
+from app.services.read_models import PublicCredentialRow
+from app.services.link_tokens import SCOPES as LINK_SCOPES, LinkTokenError, LinkTokenSigner, is_stateless
+import hashlib
 import io
+import json
+import re
 import secrets
 import time
 
 bp = Blueprint('verify', __name__, url_prefix='/verify')
 
-# store temporary verifier links, for production we can use Redis or database (speak with customer)
-verifier_links = {}
+SHA256_PATTERN = re.compile(r'[0-9a-f]{64}')
+TX_HASH_PATTERN = re.compile(r'0x[0-9a-f]{64}')
+
+# temporary verifier links, shared between app processes (VERIFIER_LINK_STORE)
+verifier_links = create_link_store()
 
 storage_service = StorageService()
 pdf_signer = PDFSignerService()
+# optional worker processes for signing (PDF_SIGNING_POOL_SIZE), None = sign in the request thread
+signing_pool = SigningPool.from_env(pdf_signer)
+
+
+def evidence_signer():
+    """Signer used for evidence PDFs: the process pool if configured"""
+    return signing_pool if signing_pool is not None else pdf_signer
+
 
 @bp.route('/', endpoint='verify_home')
 def verify_home():
@@ -27,45 +49,57 @@ def verify_home():
 def verify_credential(token_id):
 
     # Verify credential by token ID. We only show public information no PII!
+    return _render_public_credential(lambda: _lookup_credential(token_id))
+
+
+@bp.route('/hash/<evidence_hash>')
+def verify_by_hash(evidence_hash):
+    """Verify the credential a file was submitted for, by the file's SHA-256"""
+    evidence_hash = evidence_hash.lower()
+    if not SHA256_PATTERN.fullmatch(evidence_hash):
+        return render_template('verify.html', error='Not a valid SHA-256 hash', show_private=False)
+
+    def lookup():
+        # indexed on evidence_file_hash
+        claim = (Claim.query
+                 .filter_by(evidence_file_hash=evidence_hash, status='minted')
+                 .order_by(Claim.minted_at.desc())
+                 .first())
+        if not claim:
+            return None, None, 'No credential found for this evidence hash'
+        return _check_on_chain(claim)
 
-    try:
-        # query database for claim
-        claim = Claim.query.filter_by(token_id=token_id, status='minted').first()
+    return _render_public_credential(lookup)
+
+
+@bp.route('/tx/<tx_hash>')
+def verify_by_transaction(tx_hash):
+    """Verify the credential minted by a transaction (e.g. from an Etherscan link)"""
+    tx_hash = tx_hash.lower()
+    if not tx_hash.startswith('0x'):
+        tx_hash = '0x' + tx_hash
+    if not TX_HASH_PATTERN.fullmatch(tx_hash):
+        return render_template('verify.html', error='Not a valid transaction hash', show_private=False)
 
+    def lookup():
+        # indexed on transaction_hash
+        claim = Claim.query.filter_by(transaction_hash=tx_hash, status='minted').first()
         if not claim:
-            return render_template('verify.html',
-                                   error=f'Credential with Token ID {token_id} not found',
-                                   show_private=False)
+            return None, None, 'No credential found for this transaction'
+        return _check_on_chain(claim)
+
+    return _render_public_credential(lookup)
 
-        # verify on the blockchain
-        try:
-            blockchain_service = BlockchainService()
-            verification_data = blockchain_service.verify_credential(token_id)
-
-            if not verification_data.get('exists'):
-                return render_template('verify.html',
-                                       error=f'Credential not found on blockchain',
-                                       show_private=False)
-        except Exception as blockchain_error:
-            current_app.logger.error(f"Blockchain verification error: {str(blockchain_error)}")
-            # continue with database data even if blockchain check fails
-            verification_data = {'exists': True, 'blockchain_error': str(blockchain_error)}
+
+def _render_public_credential(lookup):
+    """verify.html with the public data of the credential found by lookup()"""
+    try:
+        claim, verification_data, error = lookup()
+        if error:
+            return render_template('verify.html', error=error, show_private=False)
 
         # public credential data (NO PII)
-        credential_data = {
-            'token_id': token_id,
-            'course_code': claim.course_code,
-            'credential_type': claim.credential_type,
-            'description': claim.description,
-            'issued_at': claim.minted_at.strftime('%B %d, %Y') if claim.minted_at else 'Unknown',
-            'owner_address': verification_data.get('owner', claim.student_address),
-            'is_revoked': verification_data.get('is_revoked', False),
-            'transaction_hash': claim.transaction_hash,
-            'metadata_uri': claim.metadata_uri,
-            'evidence_hash': claim.evidence_file_hash,
-            'issuer': 'CampusCred Pilot - DTU',
-            'etherscan_url': f'https://sepolia.etherscan.io/tx/{claim.transaction_hash}' if claim.transaction_hash else None
-        }
+        credential_data = _public_credential_data(claim, verification_data)
 
         return render_template('verify.html',
                                credential=credential_data,
@@ -79,6 +113,184 @@ def verify_credential(token_id):
                                show_private=False)
 
 
+@bp.route('/credential/<int:token_id>.json')
+def verify_credential_json(token_id):
+    """
+    Public credential data as JSON, cacheable by browsers and CDNs
+    The strong ETag changes when the claim is updated or its revocation status changes,
+    a matching If-None-Match is answered with 304 Not Modified.
+    """
+    try:
+        claim, verification_data, error = _lookup_credential(token_id)
+        if error:
+            response = jsonify({'success': False, 'error': error})
+            response.status_code = 404
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        credential_data = _public_credential_data(claim, verification_data)
+        response = jsonify({'success': True, 'credential': credential_data})
+
+        if verification_data.get('blockchain_error'):
+            # unconfirmed on chain, must not be served from a cache later
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+
+        response.set_etag(_credential_etag(claim, credential_data))
+        max_age = current_app.config.get('CREDENTIAL_CACHE_MAX_AGE', 60)
+        # short lifetime: a revocation has to reach verifiers quickly, afterwards caches revalidate
+        response.headers['Cache-Control'] = f'public, max-age={max_age}, must-revalidate'
+        return response.make_conditional(request)
+
+    except Exception as e:
+        current_app.logger.error(f"Verification error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to verify credential'}), 500
+
+
+def _lookup_credential(token_id):
+    """
+    Minted claim of a token ID, checked on chain
+
+    Returns:
+        (claim, verification_data, None) or (None, None, error message)
+    """
+    # query database for claim
+    claim = Claim.query.filter_by(token_id=token_id, status='minted').first()
+
+    if not claim:
+        return None, None, f'Credential with Token ID {token_id} not found'
+
+    return _check_on_chain(claim)
+
+
+def _check_on_chain(claim):
+    """
+    Returns:
+        (claim, verification_data, None) or (None, None, error message)
+    """
+    # verify on the blockchain
+    try:
+        blockchain_service = BlockchainService()
+        verification_data = blockchain_service.verify_credential(claim.token_id)
+
+        if not verification_data.get('exists'):
+            return None, None, 'Credential not found on blockchain'
+    except Exception as blockchain_error:
+        current_app.logger.error(f"Blockchain verification error: {str(blockchain_error)}")
+        # continue with database data even if blockchain check fails
+        verification_data = {'exists': True, 'blockchain_error': str(blockchain_error)}
+
+    return claim, verification_data, None
+
+
+def _credential_etag(claim, credential_data):
+    # everything the public data depends on: the claim row (updated_at moves on every
+    # change) and the on-chain state (revocation, owner)
+    updated_at = claim.updated_at.isoformat() if claim.updated_at else ''
+    state = f"{claim.id}:{updated_at}:{credential_data['is_revoked']}:{credential_data['owner_address']}"
+    return hashlib.sha256(state.encode()).hexdigest()[:32]
+
+
+def _public_credential_data(claim, verification_data):
+    """Credential data anyone may see (no PII), with the on-chain owner and revocation status"""
+    return {
+        'token_id': claim.token_id,
+        'course_code': claim.course_code,
+        'credential_type': claim.credential_type,
+        'description': claim.description,
+        'issued_at': claim.minted_at.strftime('%B %d, %Y') if claim.minted_at else 'Unknown',
+        'owner_address': verification_data.get('owner', claim.student_address),
+        'is_revoked': verification_data.get('is_revoked', False),
+        'transaction_hash': claim.transaction_hash,
+        'metadata_uri': claim.metadata_uri,
+        'evidence_hash': claim.evidence_file_hash,
+        'issuer': 'CampusCred Pilot - DTU',
+        'etherscan_url': f'https://sepolia.etherscan.io/tx/{claim.transaction_hash}' if claim.transaction_hash else None
+    }
+
+
+# token IDs per bulk verification request
+MAX_BULK_TOKEN_IDS = 200
+
+
+@bp.route('/credentials', methods=['POST'])
+def verify_credentials():
+    """
+    Bulk verification for employers: POST {"token_ids": [1, 2, ...]}
+    All credentials are loaded with one query and checked with one batched chain read.
+    The result list is streamed, one credential at a time.
+    """
+    data = request.get_json(silent=True) or {}
+    token_ids = data.get('token_ids')
+    if not isinstance(token_ids, list) or not token_ids:
+        return jsonify({'success': False, 'error': 'token_ids must be a non-empty list'}), 400
+    if len(token_ids) > MAX_BULK_TOKEN_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_BULK_TOKEN_IDS} token IDs per request'}), 400
+    if not all(isinstance(token_id, int) and not isinstance(token_id, bool) and token_id >= 0
+               for token_id in token_ids):
+        return jsonify({'success': False, 'error': 'token_ids must be non-negative integers'}), 400
+
+    token_ids = list(dict.fromkeys(token_ids))
+
+    try:
+        # read-only rows with just the public columns
+        claims = {
+            claim.token_id: claim
+            for claim in PublicCredentialRow.from_rows(
+                PublicCredentialRow.query().filter(Claim.token_id.in_(token_ids), Claim.status == 'minted')
+            )
+        }
+
+        # chain reads only for credentials we issued
+        chain_results = {}
+        blockchain_error = None
+        if claims:
+            try:
+                chain_results = BlockchainService().verify_credentials(list(claims))
+            except Exception as e:
+                current_app.logger.error(f"Blockchain verification error: {str(e)}")
+                # continue with database data even if blockchain check fails
+                blockchain_error = str(e)
+    except Exception as e:
+        current_app.logger.error(f"Bulk verification error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to verify credentials'}), 500
+
+    return Response(
+        stream_with_context(_bulk_verification_json(token_ids, claims, chain_results, blockchain_error)),
+        mimetype='application/json'
+    )
+
+
+def _bulk_verification_result(token_id, claim, verification_data, blockchain_error):
+    if not claim:
+        return {'token_id': token_id, 'verified': False, 'error': f'Credential with Token ID {token_id} not found'}
+
+    if blockchain_error:
+        verification_data = {'exists': True, 'blockchain_error': blockchain_error}
+    if not verification_data or not verification_data.get('exists'):
+        return {'token_id': token_id, 'verified': False, 'error': 'Credential not found on blockchain'}
+
+    result = {
+        'token_id': token_id,
+        'verified': not blockchain_error,
+        'credential': _public_credential_data(claim, verification_data),
+    }
+    if blockchain_error:
+        result['blockchain_error'] = blockchain_error
+    return result
+
+
+def _bulk_verification_json(token_ids, claims, chain_results, blockchain_error):
+    # one JSON document, written credential by credential in request order
+    yield f'{{"success": true, "count": {len(token_ids)}, "credentials": ['
+    for index, token_id in enumerate(token_ids):
+        result = _bulk_verification_result(
+            token_id, claims.get(token_id), chain_results.get(token_id), blockchain_error
+        )
+        yield (',' if index else '') + json.dumps(result)
+    yield ']}'
+
+
 @bp.route('/generate-verifier-link/<int:token_id>', methods=['POST'])
 def generate_verifier_link(token_id):
 
@@ -98,25 +310,38 @@ def generate_verifier_link(token_id):
         if claim.student_address and claim.student_address.lower() != wallet_address:
             return jsonify({'success': False, 'error': 'Only credential owner can generate verifier links'}), 403
 
-        # generate secure token
-        verifier_token = secrets.token_urlsafe(32)
+        # what the link may be used for, default everything
+        scopes = data.get('scopes') or list(LINK_SCOPES)
+        if not isinstance(scopes, list) or not scopes or not set(scopes) <= set(LINK_SCOPES):
+            return jsonify({'success': False, 'error': f'scopes must be a list of {", ".join(LINK_SCOPES)}'}), 400
 
-        # store token with expiry (i have simply made it for 15 minutes, speak with customer about options etc.)
+        # token with expiry (i have simply made it for 15 minutes, speak with customer about options etc.)
         expiry_time = time.time() + (15 * 60)
-        verifier_links[verifier_token] = {
-            'token_id': token_id,
-            'claim_id': claim.id,
-            'expires_at': expiry_time
-        }
 
-        # clean up expired links
-        _cleanup_expired_links()
+        if current_app.config.get('VERIFIER_LINK_MODE') == 'stateless':
+            # self-contained signed token, nothing to store
+            verifier_token = LinkTokenSigner.from_config(current_app.config).issue(
+                claim.id, token_id, expiry_time, scopes
+            )
+        else:
+            # generate secure token
+            verifier_token = secrets.token_urlsafe(32)
+            verifier_links.put(verifier_token, {
+                'token_id': token_id,
+                'claim_id': claim.id,
+                'expires_at': expiry_time,
+                'scopes': scopes
+            })
+
+            # clean up expired links (only touches the expired ones)
+            verifier_links.purge_expired()
 
         verifier_url = f'/verify/private/{verifier_token}'
 
         return jsonify({
             'success': True,
             'verifier_url': verifier_url,
+            'scopes': sorted(scopes),
             'expires_in': 900  # 15 minutes in seconds
         })
 
@@ -131,19 +356,15 @@ def view_private_credential(verifier_token):
     # view credential with PII using timelimited verifier link
 
     try:
-        # check if token exists and is valid!
-        if verifier_token not in verifier_links:
+        # check if token exists and is valid, and the expiry also
+        link_data, link_error = _resolve_link(verifier_token, 'view')
+        if link_error == 'expired':
             return render_template('verify.html',
-                                   error='Invalid or expired verifier link',
+                                   error='This verifier link has expired (15 minutes)',
                                    show_private=False)
-
-        link_data = verifier_links[verifier_token]
-
-        # check the expiry also
-        if time.time() > link_data['expires_at']:
-            del verifier_links[verifier_token]
+        if link_error:
             return render_template('verify.html',
-                                   error='This verifier link has expired (15 minutes)',
+                                   error=LINK_ERRORS[link_error],
                                    show_private=False)
 
         # thereafter we can get claim data
@@ -155,27 +376,11 @@ def view_private_credential(verifier_token):
                                    show_private=False)
 
         #  FULL credential data including PII
-        credential_data = {
-            'token_id': claim.token_id,
-            'course_code': claim.course_code,
-            'credential_type': claim.credential_type,
-            'description': claim.description,
-            'issued_at': claim.minted_at.strftime('%B %d, %Y') if claim.minted_at else 'Unknown',
-            'owner_address': claim.student_address,
-            'transaction_hash': claim.transaction_hash,
-            'metadata_uri': claim.metadata_uri,
-            'evidence_hash': claim.evidence_file_hash,
-            'issuer': 'CampusCred Pilot - DTU',
-            # PII (only shown via verifier link)
-            'student_name': claim.student_name,
-            'student_email': claim.student_email,
-            'evidence_file_name': claim.evidence_file_name,
-            'claim_id': claim.id,
-            'has_evidence': bool(claim.evidence_file_path),
-            'etherscan_url': f'https://sepolia.etherscan.io/tx/{claim.transaction_hash}' if claim.transaction_hash else None,
-            # time remaining
-            'expires_in': int(link_data['expires_at'] - time.time())
-        }
+        credential_data = _private_credential_data(claim)
+        # time remaining
+        credential_data['expires_in'] = int(link_data['expires_at'] - time.time())
+        # PDFs are downloaded with an embedded signature, other files get a manifest
+        credential_data['evidence_is_pdf'] = is_signable(claim)
 
         return render_template('verify.html',
                                credential=credential_data,
@@ -190,13 +395,85 @@ def view_private_credential(verifier_token):
                                show_private=False)
 
 
-def _cleanup_expired_links():
-    """Remove expired verifier links"""
-    current_time = time.time()
-    expired_tokens = [token for token, data in verifier_links.items()
-                      if current_time > data['expires_at']]
-    for token in expired_tokens:
-        del verifier_links[token]
+def _private_credential_data(claim):
+    """Credential data including PII, only for holders of a verifier link"""
+    return {
+        'token_id': claim.token_id,
+        'course_code': claim.course_code,
+        'credential_type': claim.credential_type,
+        'description': claim.description,
+        'issued_at': claim.minted_at.strftime('%B %d, %Y') if claim.minted_at else 'Unknown',
+        'owner_address': claim.student_address,
+        'transaction_hash': claim.transaction_hash,
+        'metadata_uri': claim.metadata_uri,
+        'evidence_hash': claim.evidence_file_hash,
+        'issuer': 'CampusCred Pilot - DTU',
+        # PII (only shown via verifier link)
+        'student_name': claim.student_name,
+        'student_email': claim.student_email,
+        'evidence_file_name': claim.evidence_file_name,
+        'claim_id': claim.id,
+        'has_evidence': bool(claim.evidence_file_path),
+        'etherscan_url': f'https://sepolia.etherscan.io/tx/{claim.transaction_hash}' if claim.transaction_hash else None,
+    }
+
+
+LINK_ERRORS = {
+    'invalid': 'Invalid or expired verifier link',
+    'expired': 'Verifier link has expired',
+    'scope': 'This verifier link does not allow this action',
+}
+
+
+def _resolve_link(verifier_token, scope):
+    """
+    Check a verifier link for one scope ('view' or 'download')
+    Stateless tokens are checked by their MAC alone, others are looked up in the store
+
+    Returns:
+        (link_data, None) or (None, 'invalid' | 'expired' | 'scope')
+    """
+    if is_stateless(verifier_token):
+        try:
+            return LinkTokenSigner.from_config(current_app.config).validate(verifier_token, scope), None
+        except LinkTokenError as e:
+            return None, e.reason
+
+    link_data = verifier_links.get(verifier_token)
+    if link_data is None:
+        return None, 'invalid'
+
+    #check if expired
+    if time.time() > link_data['expires_at']:
+        verifier_links.delete(verifier_token)
+        return None, 'expired'
+    if scope not in link_data['scopes']:
+        return None, 'scope'
+    return link_data, None
+
+
+def _link_claim_id(verifier_token):
+    """Claim id of a verifier link that allows downloads, None if not valid"""
+    link_data, _ = _resolve_link(verifier_token, 'download')
+    return link_data['claim_id'] if link_data else None
+
+
+def _evidence_claim_for_link(verifier_token):
+    """
+    Claim whose evidence a verifier link gives access to
+
+    Returns:
+        (claim, None) or (None, error response)
+    """
+    #verify toekn first
+    link_data, link_error = _resolve_link(verifier_token, 'download')
+    if link_error:
+        return None, (jsonify({'error': LINK_ERRORS[link_error]}), 403)
+
+    claim = Claim.query.get(link_data['claim_id'])
+    if not claim or not claim.evidence_file_path:
+        return None, (jsonify({'error': 'Evidence file not found'}), 404)
+    return claim, None
 
 
 @bp.route('/download-evidence/<verifier_token>')
@@ -206,52 +483,249 @@ def download_evidence(verifier_token):
     Only accessible with time-limited verifier links
     """
     try:
-        #verify toekn first
-        if verifier_token not in verifier_links:
-            return jsonify({'error': 'Invalid or expired verifier link'}), 403
-
-        link_data = verifier_links[verifier_token]
-
-        #check if expired
-        if time.time() > link_data['expires_at']:
-            del verifier_links[verifier_token]
-            return jsonify({'error': 'Verifier link has expired'}), 403
-
-
-        claim = Claim.query.get(link_data['claim_id'])
-        if not claim or not claim.evidence_file_path:
-            return jsonify({'error': 'Evidence file not found'}), 404
-
-        file_content = storage_service.get_file(claim.evidence_file_path)
-
-        if not file_content:
-            return jsonify({'error': 'Failed to retrieve file'}), 500
+        claim, error_response = _evidence_claim_for_link(verifier_token)
+        if error_response:
+            return error_response
 
         #determine PDF siggning
         is_pdf = claim.evidence_file_name.lower().endswith('.pdf')
 
-        if is_pdf:
-            #sign the PDF before we send
-            try:
-                metadata = {
-                    'title': f'{claim.course_code} - {claim.student_name}',
-                    'subject': f'Academic Credential Evidence - Token #{claim.token_id}'
-                }
-                file_content = pdf_signer.sign_pdf(file_content, metadata)
-                current_app.logger.info(f"PDF signed for claim {claim.id}")
-            except Exception as sign_error:
-                current_app.logger.warning(f"Failed to sign PDF: {str(sign_error)}, sending unsigned")
+        if not is_pdf:
+            # nothing to sign, stream straight from storage (memory-mapped locally)
+            file_stream = storage_service.open_evidence(claim.evidence_file_path)
+            if file_stream is None:
+                return jsonify({'error': 'Failed to retrieve file'}), 500
+
+            return send_file(
+                file_stream,
+                mimetype='application/octet-stream',
+                as_attachment=True,
+                download_name=claim.evidence_file_name
+            )
+
+        # signed PDFs are produced once and then served from storage
+        signed_cache = SignedEvidenceCache(storage_service, evidence_signer())
+        signed_stream = signed_cache.open_signed(claim)
+        if signed_stream is not None:
+            return send_file(
+                signed_stream,
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=claim.evidence_file_name
+            )
+
+        #sign the PDF before we send
+        try:
+            file_content = signed_cache.sign(claim)
+            if not file_content:
+                return jsonify({'error': 'Failed to retrieve file'}), 500
+            current_app.logger.info(f"PDF signed for claim {claim.id}")
+        except SigningQueueFull:
+            # back-pressure: tell the client to come back instead of queueing without bound
+            current_app.logger.warning(f"Signing queue full, rejecting download for claim {claim.id}")
+            return jsonify({'error': 'Evidence signing is busy, please retry shortly'}), 503, {'Retry-After': '5'}
+        except Exception as sign_error:
+            current_app.logger.warning(f"Failed to sign PDF: {str(sign_error)}, sending unsigned")
+            file_content = storage_service.get_file(claim.evidence_file_path)
+            if not file_content:
+                return jsonify({'error': 'Failed to retrieve file'}), 500
 
         #send the file
-        mimetype = 'application/pdf' if is_pdf else 'application/octet-stream'
-
         return send_file(
             io.BytesIO(file_content),
-            mimetype=mimetype,
+            mimetype='application/pdf',
             as_attachment=True,
             download_name=claim.evidence_file_name
         )
 
     except Exception as e:
         current_app.logger.error(f"Error downloading evidence: {str(e)}")
-        return jsonify({'error': 'Failed to download evidence'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to download evidence'}), 500
+
+
+@bp.route('/download-evidence/<verifier_token>/signature')
+def download_evidence_signature(verifier_token):
+    """
+    Detached signature manifest for non-PDF evidence
+    Verifiers check the file hash against SHA-256 of the downloaded evidence and the
+    signature against the manifest's signed fields (claim, token, file name and hash)
+    """
+    try:
+        claim, error_response = _evidence_claim_for_link(verifier_token)
+        if error_response:
+            return error_response
+
+        if is_signable(claim):
+            # the download is a signed copy, its bytes differ from the stored file
+            return jsonify({'error': 'PDF evidence carries an embedded signature, no manifest is issued'}), 400
+
+        manifest = signature_manifest(storage_service, pdf_signer, claim)
+        if manifest is None:
+            return jsonify({'error': 'Failed to retrieve file'}), 500
+
+        response = jsonify(manifest)
+        response.headers['Content-Disposition'] = f'attachment; filename="{claim.evidence_file_name}.sig.json"'
+        return response
+
+    except Exception as e:
+        current_app.logger.error(f"Error creating evidence signature: {str(e)}")
+        return jsonify({'error': 'Failed to sign evidence'}), 500
+
+
+# verifier links per bundle request, keeps a single response bounded
+MAX_BUNDLE_LINKS = 50
+
+
+@bp.route('/evidence-bundle')
+def download_evidence_bundle():
+    """
+    ZIP of the signed evidence, credential metadata, on-chain status and signing
+    certificate for one or more verifier links: /verify/evidence-bundle?token=...&token=...
+    The archive is streamed while it is built (chunked transfer, no size known upfront).
+    """
+    tokens = list(dict.fromkeys(request.args.getlist('token')))
+    if not tokens:
+        return jsonify({'error': 'No verifier links given'}), 400
+    if len(tokens) > MAX_BUNDLE_LINKS:
+        return jsonify({'error': f'At most {MAX_BUNDLE_LINKS} verifier links per bundle'}), 400
+
+    # validate everything before streaming starts, the status code cannot change afterwards
+    claim_ids = {}
+    invalid_tokens = []
+    for token in tokens:
+        claim_id = _link_claim_id(token)
+        if claim_id is None:
+            invalid_tokens.append(token)
+        else:
+            # the student's PII needs a link that may also 'view' the credential
+            viewable = _resolve_link(token, 'view')[0] is not None
+            claim_ids[claim_id] = claim_ids.get(claim_id, False) or viewable
+
+    if not claim_ids:
+        return jsonify({'error': 'Invalid or expired verifier link'}), 403
+
+    claims = Claim.query.filter(Claim.id.in_(list(claim_ids))).order_by(Claim.id).all()
+
+    response = Response(
+        stream_with_context(stream_zip(_bundle_entries(claims, claim_ids, invalid_tokens))),
+        mimetype='application/zip'
+    )
+    response.headers['Content-Disposition'] = 'attachment; filename="campuscred-evidence.zip"'
+    return response
+
+
+def _bundle_entries(claims, viewable, invalid_tokens):
+    # (name, chunks, compress) for stream_zip, produced lazily while the archive is sent;
+    # viewable: claim id -> whether a link for it has the 'view' scope
+    yield 'certificate.json', json_chunks(pdf_signer.get_certificate_info()), True
+    yield 'certificate.pem', [pdf_signer.certificate_pem().encode()], True
+
+    try:
+        blockchain_service = BlockchainService()
+    except Exception as blockchain_error:
+        current_app.logger.error(f"Blockchain unavailable for evidence bundle: {str(blockchain_error)}")
+        blockchain_service = None
+
+    for claim in claims:
+        folder = f"{claim.token_id}_{secure_filename(claim.course_code or '')}"
+        yield f'{folder}/metadata.json', json_chunks(_bundle_metadata(claim, viewable[claim.id])), True
+        yield f'{folder}/verification.json', json_chunks(_chain_status(blockchain_service, claim)), True
+
+        if claim.evidence_file_path:
+            file_name = secure_filename(claim.evidence_file_name or '') or 'evidence'
+            yield f'{folder}/{file_name}', _bundle_evidence_chunks(claim), False
+            if not is_signable(claim):
+                # PDFs carry an embedded signature, other types get the detached manifest
+                yield f'{folder}/{file_name}.sig.json', _bundle_manifest_chunks(claim), True
+
+    if invalid_tokens:
+        yield 'errors.json', json_chunks({'invalid_or_expired_links': invalid_tokens}), True
+
+
+# fields of _private_credential_data that a download-only link must not disclose
+PII_FIELDS = ('student_name', 'student_email')
+
+
+def _bundle_metadata(claim, show_private):
+    metadata = _private_credential_data(claim)
+    if not show_private:
+        for field in PII_FIELDS:
+            del metadata[field]
+    return metadata
+
+
+def _chain_status(blockchain_service, claim):
+    if blockchain_service is None or claim.token_id is None:
+        return {'exists': None, 'error': 'Blockchain verification unavailable'}
+    try:
+        return blockchain_service.verify_credential(claim.token_id)
+    except Exception as blockchain_error:
+        current_app.logger.error(f"Blockchain verification error: {str(blockchain_error)}")
+        return {'exists': None, 'error': str(blockchain_error)}
+
+
+def _bundle_evidence_chunks(claim):
+    if not is_signable(claim):
+        file_stream = storage_service.open_evidence(claim.evidence_file_path)
+        if file_stream is not None:
+            yield from stream_chunks(file_stream)
+        return
+
+    signed_cache = SignedEvidenceCache(storage_service, evidence_signer())
+    signed_stream = signed_cache.open_signed(claim)
+    if signed_stream is not None:
+        yield from stream_chunks(signed_stream)
+        return
+
+    try:
+        content = signed_cache.sign(claim)
+    except Exception as sign_error:
+        current_app.logger.warning(f"Failed to sign PDF for bundle: {str(sign_error)}, adding unsigned")
+        content = storage_service.get_file(claim.evidence_file_path)
+    if content:
+        yield content
+
+
+def _bundle_manifest_chunks(claim):
+    manifest = signature_manifest(storage_service, pdf_signer, claim)
+    yield from json_chunks(manifest or {'error': 'Failed to retrieve file'})
+
+
+@bp.route('/signature', methods=['POST'])
+def verify_signature():
+    """
+    Check a downloaded evidence file: a signed PDF, or any file plus its signature manifest
+    Form fields: file (required), manifest (optional .sig.json file)
+    """
+    try:
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+
+        manifest = None
+        manifest_file = request.files.get('manifest')
+        if manifest_file and manifest_file.filename:
+            try:
+                manifest = json.load(manifest_file.stream)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Signature manifest is not valid JSON'}), 400
+            if not isinstance(manifest, dict):
+                return jsonify({'success': False, 'error': 'Signature manifest is not valid JSON'}), 400
+
+        result = verify_evidence(pdf_signer, upload.stream, manifest)
+        claim = result.pop('claim')
+
+        result['credential'] = {
+            'token_id': claim.token_id,
+            'course_code': claim.course_code,
+            'credential_type': claim.credential_type,
+            'status': claim.status,
+            'issued_at': claim.minted_at.isoformat() if claim.minted_at else None,
+            'transaction_hash': claim.transaction_hash,
+        } if claim else None
+
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        current_app.logger.error(f"Error verifying signature: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to verify signature'}), 500
@@ -5,8 +5,33 @@ handle minting, verification, and on-chain queries.
 from web3 import Web3
 import json
 import os
+import time
 from flask import current_app
 
+# Multicall3 is deployed at the same address on mainnet, Sepolia and most other chains
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL3_ABI = [
+    {
+        "inputs": [{"components": [
+            {"internalType": "address", "name": "target", "type": "address"},
+            {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+            {"internalType": "bytes", "name": "callData", "type": "bytes"}
+        ], "internalType": "struct Multicall3.Call3[]", "name": "calls", "type": "tuple[]"}],
+        "name": "aggregate3",
+        "outputs": [{"components": [
+            {"internalType": "bool", "name": "success", "type": "bool"},
+            {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+        ], "internalType": "struct Multicall3.Result[]", "name": "returnData", "type": "tuple[]"}],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+# calls per aggregate3 request, keeps a single eth_call well below RPC gas/size limits
+MULTICALL_BATCH_SIZE = 300
+
+# the reads of one credential check and their return types
+_CREDENTIAL_CALLS = (('ownerOf', 'address'), ('tokenURI', 'string'), ('isRevoked', 'bool'))
+
 
 class BlockchainService:
     # handle blockchain interactions for minting NFTs
@@ -16,6 +41,7 @@ class BlockchainService:
         self.contract = None
         self.contract_address = None
         self.deployer_account = None
+        self.multicall = None
 
     def initialize(self):
         # start web3 connection and contract
@@ -124,12 +150,7 @@ class BlockchainService:
         ).estimate_gas({'from': self.deployer_account.address})
 
         # Calculate fees
-        latest_block = self.w3.eth.get_block('latest')
-        base_fee = latest_block['baseFeePerGas']
-        max_priority_fee = self.w3.to_wei(2, 'gwei')
-        max_fee = base_fee * 2 + max_priority_fee
-
-        current_app.logger.info(f"Gas pricing - Max fee: {self.w3.from_wei(max_fee, 'gwei')} gwei")
+        max_fee, max_priority_fee = self._fee_params()
 
         # Build transaction
         txn = self.contract.functions.mint(
@@ -156,22 +177,122 @@ class BlockchainService:
         if receipt['status'] != 1:
             raise Exception("Transaction failed")
 
-        # Parse logs to get token ID
-        token_id = None
+        # token_id stays None if the Transfer event was not found, 0 is a real token ID
+        # and token_id is unique per claim
+        token_id = self._token_id_from_receipt(receipt)
+
+        return token_id, tx_hash.hex()
+
+    def send_credentials(self, mints):
+        """
+        Send the mint transactions of many credentials without waiting for them: all are
+        signed with consecutive nonces and sent back to back, so the batch is included in
+        a few blocks instead of one confirmation per credential (see confirm_mints)
+
+        Args:
+            mints: list of (recipient_address, metadata_uri)
+
+        Returns:
+            list aligned with mints of (tx_hash, error); error is None if the node accepted it
+        """
+        if not self.w3 or not self.contract:
+            self.initialize()
+
+        if not self.deployer_account:
+            raise ValueError("Deployer private key not configured")
+        if not mints:
+            return []
+
+        sender = self.deployer_account.address
+        # 'pending' counts transactions of this account still in the mempool
+        nonce = self.w3.eth.get_transaction_count(sender, 'pending')
+        max_fee, max_priority_fee = self._fee_params()
+
+        # one estimate for the batch, with the longest URI (the string is stored on-chain)
+        recipient, longest_uri = max(mints, key=lambda mint: len(mint[1]))
+        gas = int(self.contract.functions.mint(
+            Web3.to_checksum_address(recipient), longest_uri
+        ).estimate_gas({'from': sender}) * 1.2)
+
+        results = []
+        for recipient, metadata_uri in mints:
+            try:
+                txn = self.contract.functions.mint(
+                    Web3.to_checksum_address(recipient),
+                    metadata_uri
+                ).build_transaction({
+                    'from': sender,
+                    'nonce': nonce,
+                    'gas': gas,
+                    'maxFeePerGas': max_fee,
+                    'maxPriorityFeePerGas': max_priority_fee,
+                    'chainId': 11155111  # Sepolia chain ID
+                })
+                signed_txn = self.w3.eth.account.sign_transaction(txn, self.deployer_account.key)
+                tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            except Exception as e:
+                # not sent, so the nonce is still free for the next mint
+                results.append((None, str(e)))
+                continue
+            nonce += 1
+            results.append((tx_hash.hex(), None))
+
+        current_app.logger.info(f"Sent {sum(1 for tx_hash, _ in results if tx_hash)} minting transactions")
+        return results
+
+    def confirm_mints(self, tx_hashes, timeout=60):
+        """
+        Outcome of sent mint transactions, waiting at most timeout seconds for all of them
+        together; receipts checked after the time is up are only looked up, not waited for
+
+        Returns:
+            list aligned with tx_hashes of (token_id, error), or None where the
+            transaction has no receipt yet
+        """
+        if not self.w3 or not self.contract:
+            self.initialize()
+
+        deadline = time.monotonic() + timeout
+        results = []
+        for tx_hash in tx_hashes:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=remaining)
+                else:
+                    receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except Exception as e:
+                # not mined yet (or the node did not answer), ask again later
+                current_app.logger.info(f"No receipt yet for {tx_hash}: {str(e)}")
+                results.append(None)
+                continue
+            if receipt['status'] != 1:
+                results.append((None, "Transaction failed"))
+            else:
+                results.append((self._token_id_from_receipt(receipt), None))
+        return results
+
+    def _fee_params(self):
+        # EIP-1559 fees: (max fee, max priority fee) in wei
+        latest_block = self.w3.eth.get_block('latest')
+        base_fee = latest_block['baseFeePerGas']
+        max_priority_fee = self.w3.to_wei(2, 'gwei')
+        max_fee = base_fee * 2 + max_priority_fee
+
+        current_app.logger.info(f"Gas pricing - Max fee: {self.w3.from_wei(max_fee, 'gwei')} gwei")
+        return max_fee, max_priority_fee
+
+    def _token_id_from_receipt(self, receipt):
+        # token ID from the Transfer event of the mint, None if it is missing
         for log in receipt['logs']:
             try:
                 if log['address'].lower() == self.contract_address.lower():
                     if len(log['topics']) >= 3:
-                        token_id = int(log['topics'][3].hex(), 16)
-                        break
+                        return int(log['topics'][3].hex(), 16)
             except Exception as e:
                 current_app.logger.warning(f"Error parsing log: {str(e)}")
                 continue
-
-        if token_id is None:
-            token_id = 0 # Fallback
-
-        return token_id, tx_hash.hex()
+        return None
 
     def revoke_credential(self, token_id):
 
@@ -246,6 +367,63 @@ class BlockchainService:
                 'error': str(e)
             }
 
+    def verify_credentials(self, token_ids):
+        """
+        Verify many credentials with batched reads: ownerOf, tokenURI and isRevoked of
+        all tokens go through Multicall3 aggregate3, one eth_call per MULTICALL_BATCH_SIZE calls
+
+        Returns:
+            dict token_id -> the same result verify_credential gives for it
+        """
+        if not self.w3 or not self.contract:
+            self.initialize()
+
+        token_ids = list(dict.fromkeys(token_ids))
+        try:
+            return self._multicall_credentials(token_ids)
+        except Exception as e:
+            # e.g. no Multicall3 on this chain, check the tokens one by one
+            current_app.logger.warning(f"Multicall verification failed, falling back to single calls: {str(e)}")
+            return {token_id: self.verify_credential(token_id) for token_id in token_ids}
+
+    def _multicall_credentials(self, token_ids):
+        if self.multicall is None:
+            self.multicall = self.w3.eth.contract(
+                address=Web3.to_checksum_address(os.getenv('MULTICALL3_ADDRESS') or MULTICALL3_ADDRESS),
+                abi=MULTICALL3_ABI
+            )
+
+        target = self.contract.address
+        calls = [
+            (target, True, self.contract.encodeABI(fn_name=fn_name, args=[token_id]))
+            for token_id in token_ids
+            for fn_name, _ in _CREDENTIAL_CALLS
+        ]
+        returned = []
+        for start in range(0, len(calls), MULTICALL_BATCH_SIZE):
+            returned.extend(self.multicall.functions.aggregate3(calls[start:start + MULTICALL_BATCH_SIZE]).call())
+
+        results = {}
+        per_token = len(_CREDENTIAL_CALLS)
+        for index, token_id in enumerate(token_ids):
+            values = {}
+            for (fn_name, output_type), (success, data) in zip(
+                    _CREDENTIAL_CALLS, returned[index * per_token:(index + 1) * per_token]):
+                if not success:
+                    # ownerOf reverts for tokens that were never minted
+                    results[token_id] = {'exists': False, 'error': f'{fn_name} reverted'}
+                    break
+                values[fn_name] = self.w3.codec.decode([output_type], data)[0]
+            else:
+                results[token_id] = {
+                    'exists': True,
+                    'owner': Web3.to_checksum_address(values['ownerOf']),
+                    'token_uri': values['tokenURI'],
+                    'is_revoked': values['isRevoked'],
+                    'token_id': token_id
+                }
+        return results
+
     def get_balance(self, address):
         if not self.w3:
             self.initialize()
@@ -0,0 +1,284 @@
+"""
+Resumable (chunked) evidence uploads
+tus-like protocol: create an upload, PATCH chunks at the current offset, finalize.
+Chunks are hashed as they arrive; with S3 they are streamed into multipart upload parts,
+locally they are appended to a staging file that is moved into storage on finalize.
+One request at a time works on an upload (flock on the staging file).
+"""
+import os
+import json
+import fcntl
+import uuid
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from botocore.exceptions import BotoCoreError, ClientError
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.utils import secure_filename
+
+from app import db
+from app.models import EvidenceUpload
+from app.services.storage import CHUNK_SIZE
+
+# S3 requires parts of at least 5 MiB (except the last one)
+S3_PART_SIZE = 8 * 1024 * 1024
+
+DEFAULT_MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
+# running SHA-256 per upload: {upload_id: (offset, hasher)}
+# hash state cannot be stored in the DB, so if a chunk was handled by another worker
+# (or the server restarted) the finished file is hashed once more on finalize instead
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """Upload request that cannot be served, carries the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _take_hasher(upload):
+    # the running hash is only usable if it covers exactly the bytes received so far
+    with _hashers_lock:
+        state = _hashers.pop(upload.id, None)
+    if state and state[0] == upload.offset:
+        return state[1]
+    return None
+
+
+def _put_hasher(upload, hasher):
+    with _hashers_lock:
+        _hashers[upload.id] = (upload.offset, hasher)
+
+
+@contextmanager
+def _s3_errors():
+    # S3 failures (error responses, connection problems) are worth a retry by the client
+    try:
+        yield
+    except (BotoCoreError, ClientError) as e:
+        raise UploadError(f'Evidence storage is unavailable, retry from the current offset ({e})', 503) from e
+
+
+@contextmanager
+def _staging_lock(upload):
+    """
+    Exclusive lock on the upload's staging file, for one chunk or finalize at a time
+
+    flock locks belong to the open file, so they also exclude other threads and worker
+    processes; a client retrying a PATCH while the first one still streams gets a 409.
+    The lock goes away with the process if a worker dies mid-chunk.
+    """
+    try:
+        staging = open(upload.staging_path, 'r+b')
+    except FileNotFoundError:
+        # moved into storage by a finalize that just finished
+        raise UploadError('Upload is already finalized', 409) from None
+    with staging:
+        try:
+            fcntl.flock(staging.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Another request for this upload is in progress, retry shortly', 409) from None
+        # the row as committed by whoever held the lock before us
+        db.session.refresh(upload)
+        yield staging
+
+
+class ChunkedUploadService:
+    """Create, resume and finalize chunked uploads on top of StorageService"""
+
+    def __init__(self, storage, max_size=DEFAULT_MAX_UPLOAD_SIZE):
+        self.storage = storage
+        self.max_size = max_size
+        self.staging_dir = os.path.join(storage.base_path, '.uploads')
+
+    def create(self, filename, total_size):
+        """
+        Start a new upload
+
+        Args:
+            filename: original file name (extension must be allowed)
+            total_size: announced size in bytes
+
+        Returns:
+            EvidenceUpload
+        """
+        original_filename = secure_filename(filename or '')
+        if not self.storage.allowed_file(original_filename):
+            raise UploadError('File type not allowed')
+        if not total_size or total_size <= 0:
+            raise UploadError('Upload size is required')
+        if total_size > self.max_size:
+            raise UploadError(f'File is larger than the maximum of {self.max_size} bytes', 413)
+
+        upload = EvidenceUpload(
+            id=uuid.uuid4().hex,
+            file_name=original_filename,
+            total_size=total_size,
+            offset=0,
+            status='uploading'
+        )
+
+        if self.storage.use_s3:
+            file_extension = original_filename.rsplit('.', 1)[1].lower()
+            upload.storage_key = f'evidence/upload_{upload.id}.{file_extension}'
+            with _s3_errors():
+                upload.s3_upload_id = self.storage.start_multipart_upload(upload.storage_key, original_filename)
+            upload.s3_parts = '[]'
+
+        os.makedirs(self.staging_dir, exist_ok=True)
+        upload.staging_path = os.path.join(self.staging_dir, f'{upload.id}.part')
+        open(upload.staging_path, 'wb').close()
+
+        db.session.add(upload)
+        db.session.commit()
+
+        _put_hasher(upload, hashlib.sha256())
+        return upload
+
+    def append(self, upload, offset, stream):
+        """
+        Append a chunk at the given offset
+
+        If the client disconnects mid-chunk, the bytes received so far are kept so the
+        upload can resume from the new offset.
+
+        Returns:
+            EvidenceUpload with the new offset
+        """
+        if upload.status != 'uploading' or not upload.staging_path:
+            raise UploadError('Upload is already finalized', 409)
+
+        with _staging_lock(upload) as staging:
+            if upload.status != 'uploading':
+                raise UploadError('Upload is already finalized', 409)
+            if offset != upload.offset:
+                raise UploadError(f'Offset mismatch, upload is at {upload.offset}', 409)
+
+            hasher = _take_hasher(upload)
+            parts = json.loads(upload.s3_parts) if upload.s3_upload_id else []
+
+            # staging only holds what is not in S3 yet; drop bytes of a chunk whose commit failed
+            expected_staged = upload.offset - sum(part['Size'] for part in parts)
+
+            received = 0
+            disconnected = False
+            staging.truncate(expected_staged)
+            staging.seek(expected_staged)
+            try:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    if upload.offset + received + len(chunk) > upload.total_size:
+                        staging.truncate(expected_staged)
+                        raise UploadError('Chunk goes past the announced upload size', 413)
+                    staging.write(chunk)
+                    if hasher:
+                        hasher.update(chunk)
+                    received += len(chunk)
+            except ClientDisconnected:
+                disconnected = True
+            staging.flush()
+
+            if upload.s3_upload_id:
+                # on failure nothing is committed: the offset stays, the client resends the chunk
+                with _s3_errors():
+                    parts = self._flush_parts(upload, parts)
+                upload.s3_parts = json.dumps(parts)
+
+            # committed while holding the lock, the next chunk sees the new offset
+            upload.offset += received
+            db.session.commit()
+
+        if hasher:
+            _put_hasher(upload, hasher)
+        if disconnected:
+            raise UploadError('Connection lost during chunk, resume from the current offset', 400)
+        return upload
+
+    def _flush_parts(self, upload, parts, final=False):
+        # move full parts from the staging file into the S3 multipart upload
+        staged_size = os.path.getsize(upload.staging_path)
+        if staged_size < S3_PART_SIZE and not final:
+            return parts
+
+        with open(upload.staging_path, 'rb') as staging:
+            while True:
+                data = staging.read(S3_PART_SIZE)
+                if not data or (len(data) < S3_PART_SIZE and not final):
+                    break
+                part = self.storage.upload_part(upload.storage_key, upload.s3_upload_id, len(parts) + 1, data)
+                part['Size'] = len(data)
+                parts.append(part)
+            remainder = data
+
+        # keep the tail (smaller than a part) for the next chunk
+        with open(upload.staging_path, 'wb') as staging:
+            staging.write(remainder)
+        return parts
+
+    def finalize(self, upload):
+        """
+        Complete an upload once all bytes are received: store the file and set its hash
+
+        Returns:
+            EvidenceUpload with status 'complete'
+        """
+        if upload.status == 'complete':
+            return upload
+        if upload.status != 'uploading' or not upload.staging_path:
+            raise UploadError('Upload is already attached to a claim', 409)
+
+        with _staging_lock(upload):
+            if upload.status == 'complete':
+                return upload
+            if upload.status != 'uploading':
+                raise UploadError('Upload is already attached to a claim', 409)
+            if upload.offset != upload.total_size:
+                raise UploadError(f'Upload incomplete: {upload.offset} of {upload.total_size} bytes', 409)
+
+            hasher = _take_hasher(upload)
+
+            if upload.s3_upload_id:
+                with _s3_errors():
+                    parts = self._flush_parts(upload, json.loads(upload.s3_parts), final=True)
+                if not parts:
+                    raise UploadError('Upload is empty')
+                # the staging file no longer holds these parts, record them before completing
+                upload.s3_parts = json.dumps(parts)
+                db.session.commit()
+                with _s3_errors():
+                    self.storage.complete_multipart_upload(
+                        upload.storage_key,
+                        upload.s3_upload_id,
+                        [{'PartNumber': part['PartNumber'], 'ETag': part['ETag']} for part in parts]
+                    )
+                os.remove(upload.staging_path)
+            else:
+                file_extension = upload.file_name.rsplit('.', 1)[1].lower()
+                stored_path, _ = self.storage.adopt_local_file(
+                    upload.staging_path,
+                    f'upload_{upload.id}.{file_extension}',
+                    upload.file_name
+                )
+                if not stored_path:
+                    raise UploadError('Failed to store evidence file', 500)
+                upload.storage_key = stored_path
+
+            upload.file_hash = hasher.hexdigest() if hasher else self.storage.hash_file(upload.storage_key)
+            upload.staging_path = None
+            upload.status = 'complete'
+            db.session.commit()
+            return upload
+
+    def discard(self, upload):
+        """Throw away an unfinished upload (staging data and S3 multipart upload)"""
+        if upload.s3_upload_id and upload.status == 'uploading':
+            self.storage.abort_multipart_upload(upload.storage_key, upload.s3_upload_id)
+        if upload.staging_path and os.path.exists(upload.staging_path):
+            os.remove(upload.staging_path)
+        with _hashers_lock:
+            _hashers.pop(upload.id, None)
+        db.session.delete(upload)
@@ -0,0 +1,68 @@
+"""
+Claim statistics for the instructor dashboard
+Per-status totals come from the claim_status_counts table, which every flush keeps in
+step with the claims (app.models._count_status_changes), so reading them costs the same
+at a hundred claims as at millions. rebuild_status_counts recomputes the table with one
+grouped aggregate: on first use, and after writes that bypass the ORM session.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app import db
+from app.models import Claim, ClaimStatusCount
+
+STATUSES = ('pending', 'approved', 'denied', 'minting', 'minted', 'revoked')
+
+
+def rebuild_status_counts():
+    """
+    Recompute all counters from the claims table
+
+    Returns:
+        dict status -> count
+    """
+    counts = dict.fromkeys(STATUSES, 0)
+    counts.update(
+        db.session.query(Claim.status, func.count()).filter(Claim.status.isnot(None)).group_by(Claim.status).all()
+    )
+
+    ClaimStatusCount.query.delete()
+    db.session.add_all(ClaimStatusCount(status=status, count=count) for status, count in counts.items())
+    db.session.commit()
+    return counts
+
+
+def adjust_status_count(status, delta):
+    """
+    Move a counter by delta in the current transaction, for claims written with Core
+    statements (bulk imports) that the flush hook does not see
+    """
+    counts = ClaimStatusCount.__table__
+    # like the flush hook: a missing row is left to rebuild_status_counts
+    db.session.execute(counts.update().where(counts.c.status == status).values(count=counts.c.count + delta))
+
+
+def status_counts():
+    """Claims per status, dict status -> count"""
+    counts = dict(db.session.query(ClaimStatusCount.status, ClaimStatusCount.count).all())
+    if not counts.keys() >= set(STATUSES):
+        # counters were never initialised (new table on an existing database), or a
+        # status was added since
+        counts = rebuild_status_counts()
+    return counts
+
+
+def dashboard_stats(now=None):
+    counts = status_counts()
+    one_week_ago = (now or datetime.utcnow()) - timedelta(days=7)
+    return {
+        'total_claims': sum(counts.values()),
+        'pending': counts.get('pending', 0),
+        # time window, so not a counter: range scan on (status, approved_at), bounded by a week of approvals
+        'approved_week': Claim.query.filter(
+            Claim.status == 'approved',
+            Claim.approved_at >= one_week_ago
+        ).count(),
+        'total_minted': counts.get('minted', 0)
+    }
@@ -0,0 +1,75 @@
+"""
+Streaming ZIP archives of credential evidence
+The archive is produced while it is sent: entries are read in chunks and written through
+zipfile into an unseekable sink that the response generator drains after every write, so
+neither the evidence files nor the archive are ever held in memory as a whole.
+"""
+import io
+import json
+import time
+import zipfile
+
+from app.services.storage import CHUNK_SIZE
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only target without seek/tell, zipfile then writes data descriptors instead of seeking back"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def json_chunks(data):
+    return [json.dumps(data, indent=2, default=str).encode()]
+
+
+def stream_chunks(stream):
+    """Read an open file-like object in chunks and close it"""
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            yield chunk
+    finally:
+        stream.close()
+
+
+def stream_zip(entries):
+    """
+    Build a ZIP archive incrementally
+
+    Args:
+        entries: iterable of (name, chunks, compress); chunks is an iterable of bytes.
+            Both are consumed lazily, one entry at a time. Already compressed
+            content (PDFs, images) should be stored with compress=False.
+
+    Yields:
+        bytes: the archive, piece by piece
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for name, chunks, compress in entries:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with archive.open(info, 'w') as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # central directory
+    yield sink.drain()
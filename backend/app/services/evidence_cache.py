@@ -0,0 +1,165 @@
+"""
+Local disk cache for S3 evidence objects
+Keeps recently downloaded objects on local disk, bounded by total size with LRU eviction.
+Entries are keyed by S3 key + ETag so a changed object is never served stale.
+"""
+import os
+import re
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+# cache file names: <sha256 of s3 key>_<etag without quotes>
+_ENTRY_NAME = re.compile(r'^([0-9a-f]{64})_([0-9A-Za-z\-]+)$')
+
+
+class EvidenceCache:
+    """Size-bounded LRU cache of S3 objects on local disk"""
+
+    def __init__(self, cache_dir, max_bytes, revalidate_after=3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # entries validated more recently than this are served without asking S3
+        self.revalidate_after = revalidate_after
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key hash -> {'etag', 'size', 'validated_at'}, oldest first
+        self._total_bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes_served': 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_existing()
+
+    def _load_existing(self):
+        # rebuild the index from disk after a restart, least recently used first
+        found = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                match = _ENTRY_NAME.match(entry.name)
+                if match and entry.is_file():
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, match.group(1), match.group(2), stat.st_size))
+
+        for _, key_hash, etag, size in sorted(found):
+            # an object rewritten with a new ETag leaves an older copy behind, drop it
+            if key_hash in self._entries:
+                self._remove(key_hash)
+            self._entries[key_hash] = {'etag': etag, 'size': size, 'validated_at': 0}
+            self._total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def _key_hash(s3_key):
+        return hashlib.sha256(s3_key.encode()).hexdigest()
+
+    @staticmethod
+    def _clean_etag(etag):
+        return etag.strip('"')
+
+    def _path(self, key_hash, etag):
+        return os.path.join(self.cache_dir, f"{key_hash}_{etag}")
+
+    def lookup(self, s3_key):
+        """
+        Find the cached copy of an object
+
+        Returns:
+            (path, etag, fresh) or None; fresh means it may be served without revalidating
+        """
+        key_hash = self._key_hash(s3_key)
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if not entry:
+                return None
+            fresh = time.time() - entry['validated_at'] < self.revalidate_after
+            return self._path(key_hash, entry['etag']), f'"{entry["etag"]}"', fresh
+
+    def record_hit(self, s3_key, revalidated=False):
+        """Mark a cached object as used (and confirmed current by S3 if revalidated)"""
+        key_hash = self._key_hash(s3_key)
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if not entry:
+                return
+            self._entries.move_to_end(key_hash)
+            if revalidated:
+                entry['validated_at'] = time.time()
+            self._stats['hits'] += 1
+            self._stats['bytes_served'] += entry['size']
+
+    def store(self, s3_key, etag, body, size=None):
+        """
+        Stream an S3 body into the cache
+
+        Returns:
+            str: path of the cached file, or None if the object is too large to cache
+        """
+        with self._lock:
+            self._stats['misses'] += 1
+        if size is not None and size > self.max_bytes:
+            return None
+
+        key_hash = self._key_hash(s3_key)
+        etag = self._clean_etag(etag)
+
+        # write to a temp file first so readers never see a partial object
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp_')
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: body.read(1024 * 1024), b''):
+                    f.write(chunk)
+                    written += len(chunk)
+            if written > self.max_bytes:
+                os.remove(tmp_path)
+                return None
+
+            final_path = self._path(key_hash, etag)
+            with self._lock:
+                if key_hash in self._entries:
+                    self._remove(key_hash)
+                os.replace(tmp_path, final_path)
+                self._entries[key_hash] = {'etag': etag, 'size': written, 'validated_at': time.time()}
+                self._total_bytes += written
+                self._evict()
+            return final_path
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def invalidate(self, s3_key):
+        """Drop an object from the cache (e.g. after it was deleted in S3)"""
+        with self._lock:
+            key_hash = self._key_hash(s3_key)
+            if key_hash in self._entries:
+                self._remove(key_hash)
+
+    def _remove(self, key_hash):
+        # caller holds the lock
+        entry = self._entries.pop(key_hash)
+        self._total_bytes -= entry['size']
+        try:
+            os.remove(self._path(key_hash, entry['etag']))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        # caller holds the lock, drop least recently used entries until we fit
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def stats(self):
+        """Cache metrics for this process"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,151 @@
+"""
+Garbage collection of private evidence files
+Removes evidence of denied claims once the retention window has passed, stored
+files that no claim row points to (e.g. left behind by failed submissions),
+abandoned resumable uploads and signed PDFs that no claim would be served anymore
+(evidence gone or changed, claim data changed, or made with a rotated-out key).
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app import db
+from app.models import Claim, EvidenceUpload
+from app.services.chunked_upload import ChunkedUploadService
+from app.services.signed_evidence import artifact_name, is_signable
+
+
+def _referenced_names():
+    # evidence file names are unique (claim id + timestamp), so compare by name:
+    # it matches regardless of legacy flat paths vs. sharded paths
+    rows = db.session.query(Claim.evidence_file_path).filter(Claim.evidence_file_path.isnot(None))
+    return {os.path.basename(path) for (path,) in rows.yield_per(5000)}
+
+
+def _current_artifact_names(key_fingerprint, exclude_ids=()):
+    # names of the signed PDFs the download route would serve right now
+    rows = db.session.query(
+        Claim.id, Claim.course_code, Claim.student_name, Claim.token_id,
+        Claim.evidence_file_path, Claim.evidence_file_name, Claim.evidence_file_hash
+    ).filter(Claim.evidence_file_path.isnot(None))
+    return {artifact_name(row, key_fingerprint) for row in rows.yield_per(5000)
+            if row.id not in exclude_ids and is_signable(row)}
+
+
+def find_garbage(storage, retention_days=30, orphan_grace_hours=24, now=None, key_fingerprint=None):
+    """
+    Collect the evidence that may be deleted
+
+    Args:
+        storage: StorageService holding the evidence
+        retention_days: keep evidence of denied claims for this long after the decision
+        orphan_grace_hours: ignore unreferenced files younger than this (submission in flight)
+        key_fingerprint: fingerprint of the current signing key; signed PDFs are only
+            collected when it is given
+
+    Returns:
+        dict with 'denied' [(claim_id, path)], 'orphaned' and 'stale_artifacts'
+        [(path, size_bytes)] and 'stale_uploads'
+    """
+    now = now or datetime.utcnow()
+    retention_cutoff = now - timedelta(days=retention_days)
+    orphan_cutoff = now - timedelta(hours=orphan_grace_hours)
+
+    denied = (
+        db.session.query(Claim.id, Claim.evidence_file_path)
+        .filter(
+            Claim.status == 'denied',
+            Claim.updated_at < retention_cutoff,
+            Claim.evidence_file_path.isnot(None)
+        )
+        .order_by(Claim.id)
+        .all()
+    )
+
+    referenced = _referenced_names()
+    orphaned = [
+        (path, size)
+        for path, size, modified_at in storage.list_evidence_files()
+        if os.path.basename(path) not in referenced and modified_at < orphan_cutoff
+    ]
+
+    # upload sessions nobody touched within the grace period (their finished files,
+    # if never attached to a claim, are picked up as orphans above)
+    stale_uploads = EvidenceUpload.query.filter(EvidenceUpload.updated_at < orphan_cutoff).all()
+
+    stale_artifacts = []
+    if key_fingerprint:
+        # denied claims past retention lose their evidence in this run, so their PDFs go too
+        current = _current_artifact_names(key_fingerprint, exclude_ids={claim_id for claim_id, _ in denied})
+        stale_artifacts = [
+            (path, size)
+            for path, name, size, modified_at in storage.list_artifacts()
+            if name not in current and modified_at < orphan_cutoff
+        ]
+
+    return {
+        'denied': [(claim_id, path) for claim_id, path in denied],
+        'orphaned': orphaned,
+        'stale_artifacts': stale_artifacts,
+        'stale_uploads': stale_uploads,
+    }
+
+
+def collect_garbage(storage, retention_days=30, orphan_grace_hours=24, dry_run=False,
+                    batch_size=1000, workers=8, now=None, key_fingerprint=None):
+    """
+    Delete garbage evidence in batches
+
+    Returns:
+        dict report: counts, bytes of orphaned files and the paths that failed to delete
+    """
+    garbage = find_garbage(storage, retention_days, orphan_grace_hours, now=now, key_fingerprint=key_fingerprint)
+    denied, orphaned = garbage['denied'], garbage['orphaned']
+    stale_artifacts = garbage['stale_artifacts']
+    stale_uploads = garbage['stale_uploads']
+
+    report = {
+        'dry_run': dry_run,
+        'denied_claims': len(denied),
+        'orphaned_files': len(orphaned),
+        'stale_uploads': len(stale_uploads),
+        'orphaned_bytes': sum(size for _, size in orphaned),
+        'stale_artifacts': len(stale_artifacts),
+        'deleted': 0,
+        'failed': [],
+        'paths': [path for _, path in denied] + [path for path, _ in orphaned + stale_artifacts],
+    }
+    if dry_run:
+        return report
+
+    for start in range(0, len(denied), batch_size):
+        batch = denied[start:start + batch_size]
+        deleted, failed = storage.delete_files([path for _, path in batch], batch_size=batch_size, workers=workers)
+        # already-missing files count as gone, the claim should not point at them anymore
+        failed_set = set(path for path in failed if storage.file_exists(path))
+
+        cleared_ids = [claim_id for claim_id, path in batch if path not in failed_set]
+        if cleared_ids:
+            db.session.execute(
+                update(Claim).where(Claim.id.in_(cleared_ids)).values(evidence_file_path=None)
+            )
+            db.session.commit()
+
+        report['deleted'] += len(deleted)
+        report['failed'].extend(failed_set)
+
+    # orphans and stale signed PDFs have no claim row to update
+    orphan_paths = [path for path, _ in orphaned + stale_artifacts]
+    for start in range(0, len(orphan_paths), batch_size):
+        deleted, failed = storage.delete_files(orphan_paths[start:start + batch_size],
+                                               batch_size=batch_size, workers=workers)
+        report['deleted'] += len(deleted)
+        report['failed'].extend(failed)
+
+    upload_service = ChunkedUploadService(storage)
+    for upload in stale_uploads:
+        upload_service.discard(upload)
+    db.session.commit()
+
+    return report
@@ -0,0 +1,156 @@
+"""
+Credential issuance for approved claims
+Builds the NFT metadata of a claim, pins it to IPFS and mints the token. Bulk approval
+runs the pipeline batched: the metadata of all claims is pinned in parallel, then all
+mint transactions go out together (BlockchainService.send_credentials). The sent claims
+are committed as 'minting' with their transaction hash before any receipt is awaited, so
+a crash or timeout afterwards cannot lose a sent transaction; confirm_minting later moves
+them to 'minted' (or back to 'approved' if the transaction failed).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from app import db
+
+# parallel Pinata uploads, each one is an HTTPS round trip
+PIN_WORKERS = 8
+# total time a request waits for mint receipts, the rest is left to `registrar confirm-mints`
+RECEIPT_WAIT_SECONDS = 60
+
+
+def credential_metadata(claim):
+    """ERC-721 metadata JSON of an approved claim"""
+    return {
+        "name": f"{claim.course_code} - {claim.credential_type}",
+        "description": claim.description or f"Credential for {claim.course_code}",
+        "attributes": [
+            {"trait_type": "Course Code", "value": claim.course_code},
+            {"trait_type": "Credential Type", "value": claim.credential_type},
+            {"trait_type": "Issuer", "value": "CampusCred Pilot"},
+            {"trait_type": "Student", "value": claim.student_name},
+            {"trait_type": "Issued Date", "value": claim.approved_at.strftime('%Y-%m-%d')}
+        ],
+        "external_url": f"https://campuscred.app/verify/{claim.id}",
+        "evidence_hash": claim.evidence_file_hash
+    }
+
+
+def pin_metadata(ipfs_service, claims, workers=PIN_WORKERS):
+    """
+    Upload the metadata of many claims to IPFS in parallel
+
+    Returns:
+        dict claim_id -> (metadata_uri, error)
+    """
+    app = current_app._get_current_object()
+    jobs = [(claim.id, credential_metadata(claim)) for claim in claims]
+
+    def pin(job):
+        claim_id, metadata = job
+        # IPFSService logs through current_app, worker threads need their own context
+        with app.app_context():
+            try:
+                return claim_id, (ipfs_service.upload_json(metadata, pin_name=f"Claim-{claim_id}"), None)
+            except Exception as e:
+                return claim_id, (None, str(e))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(pin, jobs))
+
+
+def issue_credentials(claims, ipfs_service, blockchain_service, receipt_wait=RECEIPT_WAIT_SECONDS):
+    """
+    Pin and mint the credentials of approved claims that have a wallet
+
+    Returns:
+        dict claim_id -> {'status', 'token_id', 'tx_hash', 'error'}; claims that could not
+        be pinned or sent stay approved with the error, claims whose receipt did not
+        arrive within receipt_wait seconds stay 'minting'
+    """
+    results = {}
+    pinned = pin_metadata(ipfs_service, claims)
+
+    to_mint = []
+    for claim in claims:
+        metadata_uri, error = pinned[claim.id]
+        if error:
+            results[claim.id] = {'status': 'approved', 'error': f"IPFS upload failed: {error}"}
+        else:
+            to_mint.append((claim, metadata_uri))
+
+    try:
+        sent = blockchain_service.send_credentials(
+            [(claim.student_address, metadata_uri) for claim, metadata_uri in to_mint]
+        )
+    except Exception as e:
+        # nothing was sent (no connection, no deployer key, gas estimate reverted)
+        current_app.logger.error(f"Batch minting failed: {str(e)}")
+        sent = [(None, str(e))] * len(to_mint)
+
+    minting = []
+    for (claim, metadata_uri), (tx_hash, error) in zip(to_mint, sent):
+        if error:
+            current_app.logger.error(f"Minting error for claim {claim.id}: {error}")
+            results[claim.id] = {'status': 'approved', 'error': error}
+            continue
+        claim.status = 'minting'
+        claim.transaction_hash = tx_hash
+        claim.metadata_uri = metadata_uri
+        minting.append(claim)
+
+    # record the sent transactions before waiting for anything
+    sent_hashes = [(claim.id, claim.transaction_hash) for claim in minting]
+    sent_log = ', '.join(f"claim {claim_id}: {tx_hash}" for claim_id, tx_hash in sent_hashes)
+    try:
+        db.session.commit()
+    except Exception as e:
+        # the transactions are on their way regardless, the log is the only record left
+        current_app.logger.error(f"Could not record sent minting transactions ({sent_log}): {str(e)}")
+        db.session.rollback()
+        for claim_id, tx_hash in sent_hashes:
+            results[claim_id] = {'status': 'approved', 'tx_hash': tx_hash,
+                                 'error': f"Transaction sent but not recorded: {str(e)}"}
+        return results
+    if sent_hashes:
+        current_app.logger.info(f"Recorded minting transactions: {sent_log}")
+
+    results.update(confirm_minting(minting, blockchain_service, timeout=receipt_wait))
+    return results
+
+
+def confirm_minting(claims, blockchain_service, timeout=RECEIPT_WAIT_SECONDS):
+    """
+    Check the receipts of claims in 'minting' and store the outcome (one commit)
+
+    Returns:
+        dict claim_id -> {'status', 'token_id', 'tx_hash', 'error'}
+    """
+    results = {}
+    if not claims:
+        return results
+
+    receipts = blockchain_service.confirm_mints([claim.transaction_hash for claim in claims], timeout=timeout)
+
+    now = datetime.utcnow()
+    for claim, outcome in zip(claims, receipts):
+        tx_hash = claim.transaction_hash
+        if outcome is None:
+            results[claim.id] = {'status': 'minting', 'tx_hash': tx_hash}
+            continue
+        token_id, error = outcome
+        if error:
+            # reverted, nothing was minted: back to approved with the error
+            current_app.logger.error(f"Minting transaction {tx_hash} of claim {claim.id} failed: {error}")
+            claim.status = 'approved'
+            claim.transaction_hash = None
+            results[claim.id] = {'status': 'approved', 'tx_hash': tx_hash, 'error': error}
+        else:
+            claim.status = 'minted'
+            claim.token_id = token_id
+            claim.minted_at = now
+            results[claim.id] = {'status': 'minted', 'token_id': token_id, 'tx_hash': tx_hash}
+
+    db.session.commit()
+    return results
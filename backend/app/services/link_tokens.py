@@ -0,0 +1,113 @@
+"""
+Stateless verifier link tokens
+A token carries the claim ID, token ID, expiry and scopes, authenticated with an HMAC
+under the app's SECRET_KEY. Validating one is a constant-time MAC check with no storage
+lookup, so links work on every worker and survive restarts.
+
+Format: v1.<key id>.<base64url payload>.<base64url mac>
+Old secrets listed in SECRET_KEY_FALLBACKS keep validating tokens after a key rotation.
+Stored (random) tokens never contain a '.', which is how the two kinds are told apart.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+VERSION = 'v1'
+SCOPES = ('view', 'download')
+
+
+class LinkTokenError(Exception):
+    """Token that must not be accepted; reason is 'invalid', 'expired' or 'scope'"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def is_stateless(token):
+    return '.' in token
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _signing_key(secret):
+    # derived key, so link MACs never use SECRET_KEY directly (it also signs sessions)
+    if isinstance(secret, str):
+        secret = secret.encode()
+    return hashlib.sha256(b'campuscred-verifier-link:' + secret).digest()
+
+
+def _key_id(key):
+    return hashlib.sha256(key).hexdigest()[:8]
+
+
+class LinkTokenSigner:
+    """Issue and check tokens; the first secret signs, all of them verify"""
+
+    def __init__(self, secret, fallbacks=()):
+        keys = [_signing_key(secret)] + [_signing_key(old) for old in fallbacks if old]
+        self._signing_key = keys[0]
+        self._keys = {_key_id(key): key for key in reversed(keys)}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['SECRET_KEY'], config.get('SECRET_KEY_FALLBACKS') or ())
+
+    @staticmethod
+    def _mac(key, message):
+        return hmac.new(key, message.encode('ascii'), hashlib.sha256).digest()
+
+    def issue(self, claim_id, token_id, expires_at, scopes=SCOPES):
+        """
+        Returns:
+            str: token valid until expires_at (unix time) for the given scopes
+        """
+        payload = json.dumps(
+            {'c': claim_id, 't': token_id, 'e': int(expires_at), 's': sorted(scopes)},
+            separators=(',', ':')
+        ).encode()
+        message = f"{VERSION}.{_key_id(self._signing_key)}.{_b64encode(payload)}"
+        return f"{message}.{_b64encode(self._mac(self._signing_key, message))}"
+
+    def validate(self, token, scope, now=None):
+        """
+        Check a token for one scope
+
+        Returns:
+            dict with 'claim_id', 'token_id', 'expires_at' and 'scopes'
+
+        Raises:
+            LinkTokenError
+        """
+        try:
+            version, key_id, payload, mac = token.split('.')
+        except ValueError:
+            raise LinkTokenError('invalid')
+
+        key = self._keys.get(key_id)
+        if version != VERSION or key is None:
+            raise LinkTokenError('invalid')
+
+        try:
+            expected = self._mac(key, f"{version}.{key_id}.{payload}")
+            if not hmac.compare_digest(expected, _b64decode(mac)):
+                raise LinkTokenError('invalid')
+            data = json.loads(_b64decode(payload))
+        except (ValueError, UnicodeEncodeError):
+            raise LinkTokenError('invalid')
+
+        now = time.time() if now is None else now
+        if now > data['e']:
+            raise LinkTokenError('expired')
+        if scope not in data['s']:
+            raise LinkTokenError('scope')
+
+        return {'claim_id': data['c'], 'token_id': data['t'], 'expires_at': data['e'], 'scopes': data['s']}
@@ -0,0 +1,356 @@
+"""
+Incremental-update PDF signatures (adbe.pkcs7.detached, as used by PAdES)
+The original bytes are left untouched: a signature dictionary, an invisible signature
+field, the updated catalog/page/info objects and a new xref section are appended after
+them. The CMS signature covers the whole file except the /Contents placeholder, so any
+change made after signing is detectable.
+"""
+import io
+import os
+import re
+import hashlib
+from datetime import datetime
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, TextStringObject
+)
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa, utils
+
+# bytes reserved for the DER encoded CMS structure (certificate + signature)
+SIGNATURE_SIZE = 8192
+
+# fixed width so the real values can be patched in without moving any offsets
+_BYTE_RANGE_PLACEHOLDER = b'[0 0000000000 0000000000 0000000000]'
+_BYTE_RANGE = re.compile(rb'/ByteRange\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*\]')
+_STARTXREF = re.compile(rb'startxref\s+(\d+)')
+
+# how far before the signature placeholder the /ByteRange may start
+_TAIL_MARGIN = 64 * 1024
+
+# annotation flags: Print (4) + Locked (128)
+_WIDGET_FLAGS = 132
+
+
+class SignatureError(Exception):
+    """PDF that cannot be signed, or a signature that cannot be parsed"""
+
+
+def pdf_date(moment):
+    return moment.strftime("D:%Y%m%d%H%M%S+00'00'")
+
+
+def _serialize(obj):
+    stream = io.BytesIO()
+    obj.write_to_stream(stream, None)
+    return stream.getvalue()
+
+
+def _copy(dictionary):
+    # dict.items keeps indirect references as they are instead of resolving them
+    return DictionaryObject(dict.items(dictionary))
+
+
+def _last_startxref(data):
+    # startxref sits right before the final %%EOF, no need to scan the whole file
+    matches = list(_STARTXREF.finditer(data, max(0, len(data) - 2048)))
+    if not matches:
+        raise SignatureError('No startxref found, not a valid PDF')
+    return int(matches[-1].group(1))
+
+
+def _first_page_ref(catalog):
+    # walk down the first kids only instead of flattening the whole page tree
+    node_ref = catalog.raw_get('/Pages')
+    node = node_ref.get_object()
+    while '/Kids' in node:
+        kids = node['/Kids']
+        if not kids:
+            raise SignatureError('PDF has no pages')
+        node_ref = kids[0]
+        node = node_ref.get_object()
+    return node_ref
+
+
+class PreparedSignature:
+    """PDF with the incremental update appended and an empty /Contents placeholder"""
+
+    def __init__(self, buffer, contents_start, contents_end):
+        self.buffer = buffer
+        self.contents_start = contents_start
+        self.contents_end = contents_end
+
+    def signed_data(self):
+        """The bytes covered by /ByteRange (everything except the placeholder)"""
+        return bytes(self.buffer[:self.contents_start]) + bytes(self.buffer[self.contents_end:])
+
+    def embed(self, cms_der):
+        """Write the DER encoded CMS signature into the placeholder and return the signed PDF"""
+        hex_signature = cms_der.hex().encode('ascii')
+        if len(hex_signature) > 2 * SIGNATURE_SIZE:
+            raise SignatureError(f'Signature of {len(cms_der)} bytes does not fit the reserved space')
+        start = self.contents_start + 1
+        self.buffer[start:start + len(hex_signature)] = hex_signature
+        return bytes(self.buffer)
+
+
+def prepare_signature(pdf_content, info, signer_name, reason, signing_time=None):
+    """
+    Append the signature objects to a PDF as an incremental update
+
+    Only the catalog, the first page and the document info are rewritten (as new
+    revisions appended at the end), so the cost does not depend on the page count.
+
+    Args:
+        pdf_content: original PDF bytes
+        info: document info entries to set, e.g. {'/Title': '...'}
+        signer_name: /Name of the signature
+        reason: /Reason of the signature
+
+    Returns:
+        PreparedSignature
+    """
+    data = bytes(pdf_content)
+    reader = PdfReader(io.BytesIO(data))
+    if reader.is_encrypted:
+        raise SignatureError('Encrypted PDFs cannot be signed')
+
+    trailer = reader.trailer
+    size = int(trailer['/Size'])
+    prev_xref = _last_startxref(data)
+
+    root_ref = trailer.raw_get('/Root')
+    catalog = root_ref.get_object()
+    page_ref = _first_page_ref(catalog)
+    page = page_ref.get_object()
+
+    sig_ref = IndirectObject(size, 0, reader)
+    widget_ref = IndirectObject(size + 1, 0, reader)
+    info_ref = IndirectObject(size + 2, 0, reader)
+
+    widget = DictionaryObject({
+        NameObject('/Type'): NameObject('/Annot'),
+        NameObject('/Subtype'): NameObject('/Widget'),
+        NameObject('/FT'): NameObject('/Sig'),
+        NameObject('/T'): TextStringObject(f'CampusCredSignature{size}'),
+        NameObject('/V'): sig_ref,
+        NameObject('/F'): NumberObject(_WIDGET_FLAGS),
+        NameObject('/Rect'): ArrayObject([NumberObject(0)] * 4),
+        NameObject('/P'): page_ref,
+    })
+
+    new_page = _copy(page)
+    new_page[NameObject('/Annots')] = ArrayObject(list(page.get('/Annots') or []) + [widget_ref])
+
+    acroform = _copy(catalog['/AcroForm']) if '/AcroForm' in catalog else DictionaryObject()
+    acroform[NameObject('/Fields')] = ArrayObject(list(acroform.get('/Fields') or []) + [widget_ref])
+    acroform[NameObject('/SigFlags')] = NumberObject(3)  # signatures exist, append only
+    new_catalog = _copy(catalog)
+    new_catalog[NameObject('/AcroForm')] = acroform
+
+    new_info = _copy(trailer['/Info']) if '/Info' in trailer else DictionaryObject()
+    for key, value in info.items():
+        new_info[NameObject(key)] = TextStringObject(value)
+
+    signing_time = signing_time or datetime.utcnow()
+    sig_body = (
+        b'<< /Type /Sig /Filter /Adobe.PPKLite /SubFilter /adbe.pkcs7.detached'
+        b' /ByteRange ' + _BYTE_RANGE_PLACEHOLDER +
+        b' /Contents <' + b'0' * (2 * SIGNATURE_SIZE) + b'>'
+        b' /M ' + _serialize(TextStringObject(pdf_date(signing_time))) +
+        b' /Name ' + _serialize(TextStringObject(signer_name)) +
+        b' /Reason ' + _serialize(TextStringObject(reason)) +
+        b' >>'
+    )
+
+    out = bytearray(data)
+    if not out.endswith(b'\n'):
+        out.extend(b'\n')
+    offsets = {}
+
+    def write_object(ref, body):
+        offsets[ref.idnum] = (len(out), ref.generation)
+        out.extend(b'%d %d obj\n' % (ref.idnum, ref.generation))
+        body_start = len(out)
+        out.extend(body)
+        out.extend(b'\nendobj\n')
+        return body_start
+
+    sig_start = write_object(sig_ref, sig_body)
+    byte_range_at = sig_start + sig_body.index(_BYTE_RANGE_PLACEHOLDER)
+    contents_start = sig_start + sig_body.index(b'/Contents <') + len(b'/Contents ')
+    contents_end = contents_start + 2 * SIGNATURE_SIZE + 2
+
+    write_object(widget_ref, _serialize(widget))
+    write_object(info_ref, _serialize(new_info))
+    write_object(page_ref, _serialize(new_page))
+    write_object(root_ref, _serialize(new_catalog))
+
+    xref_offset = len(out)
+    out.extend(b'xref\n')
+    numbers = sorted(offsets)
+    run_start = 0
+    for index in range(1, len(numbers) + 1):
+        # one subsection per run of consecutive object numbers
+        if index == len(numbers) or numbers[index] != numbers[index - 1] + 1:
+            run = numbers[run_start:index]
+            out.extend(b'%d %d\n' % (run[0], len(run)))
+            for number in run:
+                out.extend(b'%010d %05d n\r\n' % offsets[number])
+            run_start = index
+
+    new_trailer = DictionaryObject({
+        NameObject('/Size'): NumberObject(size + 3),
+        NameObject('/Root'): root_ref,
+        NameObject('/Info'): info_ref,
+        NameObject('/Prev'): NumberObject(prev_xref),
+    })
+    if '/ID' in trailer:
+        new_trailer[NameObject('/ID')] = trailer.raw_get('/ID')
+    out.extend(b'trailer\n' + _serialize(new_trailer) + b'\nstartxref\n' + str(xref_offset).encode() + b'\n%%EOF\n')
+
+    byte_range = b'[0 %010d %010d %010d]' % (contents_start, contents_end, len(out) - contents_end)
+    out[byte_range_at:byte_range_at + len(byte_range)] = byte_range
+
+    return PreparedSignature(out, contents_start, contents_end)
+
+
+def _der_item(data, pos):
+    # (tag, content start, content end) of the DER element at pos
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        count = length & 0x7f
+        length = int.from_bytes(data[pos:pos + count], 'big')
+        pos += count
+    return tag, pos, pos + length
+
+
+def _der_children(data, start, end):
+    pos = start
+    while pos < end:
+        tag, content_start, content_end = _der_item(data, pos)
+        yield tag, pos, content_start, content_end
+        pos = content_end
+
+
+def parse_cms(der):
+    """
+    Minimal CMS SignedData reader: embedded certificates and the first signer's signature
+
+    Returns:
+        dict with 'certificates' (list of DER bytes), 'signature' (bytes) and
+        'signed_attributes' (True if the signer used signed attributes)
+    """
+    try:
+        _, start, end = _der_item(der, 0)
+        content = list(_der_children(der, start, end))[1]  # [0] EXPLICIT content
+        _, signed_start, signed_end = _der_item(der, content[2])
+
+        certificates, sets = [], []
+        for tag, pos, content_start, content_end in _der_children(der, signed_start, signed_end):
+            if tag == 0xA0:
+                certificates = [der[item[1]:item[3]] for item in _der_children(der, content_start, content_end)]
+            elif tag == 0x31:
+                sets.append((content_start, content_end))
+
+        # digestAlgorithms and signerInfos are both SETs, signerInfos comes last
+        _, _, signer_start, signer_end = next(_der_children(der, *sets[-1]))
+        signature, signed_attributes = None, False
+        for tag, _, content_start, content_end in _der_children(der, signer_start, signer_end):
+            if tag == 0xA0:
+                signed_attributes = True
+            elif tag == 0x04:
+                signature = der[content_start:content_end]
+    except (IndexError, StopIteration) as e:
+        raise SignatureError(f'Malformed CMS signature: {e}')
+
+    if signature is None:
+        raise SignatureError('CMS signature has no signer')
+    return {'certificates': certificates, 'signature': signature, 'signed_attributes': signed_attributes}
+
+
+def read_signature(fileobj):
+    """
+    Find the last signature of a PDF without reading the whole document
+
+    Args:
+        fileobj: seekable binary file
+
+    Returns:
+        dict with 'cms' (DER bytes), 'byte_range' (4 ints), 'covers_whole_document' and
+        'tail' (the end of the file, holds the signed info), or None if the PDF is not signed
+    """
+    size = fileobj.seek(0, os.SEEK_END)
+    # the signature dictionary sits in the last incremental update
+    tail_start = max(0, size - 2 * SIGNATURE_SIZE - _TAIL_MARGIN)
+    fileobj.seek(tail_start)
+    tail = fileobj.read()
+
+    at = tail.rfind(b'/ByteRange')
+    if at < 0:
+        return None
+    match = _BYTE_RANGE.match(tail, at)
+    if not match:
+        raise SignatureError('Malformed /ByteRange')
+
+    start1, length1, start2, length2 = (int(value) for value in match.groups())
+    if start1 != 0 or length1 >= start2 or start2 + length2 > size:
+        raise SignatureError('/ByteRange does not match the document')
+
+    fileobj.seek(length1)
+    contents = fileobj.read(start2 - length1)
+    if contents[:1] != b'<' or contents[-1:] != b'>':
+        raise SignatureError('/ByteRange does not match the signature contents')
+    try:
+        cms = bytes.fromhex(contents[1:-1].decode('ascii'))
+    except ValueError:
+        raise SignatureError('Signature contents are not valid hex')
+    # drop the zero padding of the placeholder
+    _, _, cms_end = _der_item(cms, 0)
+
+    return {
+        'cms': cms[:cms_end],
+        'byte_range': (start1, length1, start2, length2),
+        # anything appended after signing (another incremental update) is not covered
+        'covers_whole_document': start2 + length2 == size,
+        'tail': tail[:start2 + length2 - tail_start],
+    }
+
+
+def digest_byte_range(fileobj, byte_range, chunk_size=1024 * 1024):
+    """SHA-256 over the signed parts of the file, read in chunks"""
+    digest = hashlib.sha256()
+    start1, length1, start2, length2 = byte_range
+    for offset, length in ((start1, length1), (start2, length2)):
+        fileobj.seek(offset)
+        while length > 0:
+            chunk = fileobj.read(min(chunk_size, length))
+            if not chunk:
+                raise SignatureError('File is shorter than its /ByteRange')
+            digest.update(chunk)
+            length -= len(chunk)
+    return digest.digest()
+
+
+def signed_info(tail, key):
+    """Value of a CampusCred document info entry written by the signer, or None"""
+    matches = list(re.finditer(rb'/' + key.encode() + rb'\s*\(([^)]*)\)', tail))
+    return matches[-1].group(1).decode('latin-1') if matches else None
+
+
+def verify_signature(public_key, signature, digest):
+    """Check a raw CMS signature (no signed attributes) against the SHA-256 digest of the byte ranges"""
+    try:
+        if isinstance(public_key, rsa.RSAPublicKey):
+            public_key.verify(signature, digest, padding.PKCS1v15(), utils.Prehashed(hashes.SHA256()))
+        elif isinstance(public_key, ec.EllipticCurvePublicKey):
+            public_key.verify(signature, digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+        else:
+            return False
+    except InvalidSignature:
+        return False
+    return True
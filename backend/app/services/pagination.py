@@ -0,0 +1,75 @@
+"""
+Keyset (cursor) pagination for claim lists
+Pages are ordered newest first by (created_at, id). The cursor is the position of the
+last row of a page, and the next page continues strictly below it. Every page is then
+one index range read, however deep the page, unlike OFFSET, which reads and discards
+all earlier rows. Rows inserted meanwhile do not shift or repeat entries.
+"""
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from app.models import Claim
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(claim):
+    position = f"{claim.created_at.isoformat()}|{claim.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        (created_at, id)
+
+    Raises:
+        ValueError: not a cursor issued by encode_cursor
+    """
+    try:
+        position = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, claim_id = position.split('|')
+        return datetime.fromisoformat(created_at), int(claim_id)
+    except (TypeError, UnicodeDecodeError) as e:
+        raise ValueError('invalid cursor') from e
+
+
+def page_size(value):
+    """Requested page size clamped to 1..MAX_PAGE_SIZE, default for missing or bad input"""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+
+
+def keyset_page(query, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of a claim query, newest first
+
+    Args:
+        query: Claim query (or a read_models projection query) with the filters
+            of the list, without ordering; must include created_at and id
+        cursor: next_cursor of the previous page, None for the first page
+        limit: rows per page
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: invalid cursor
+    """
+    if cursor:
+        created_at, claim_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Claim.created_at < created_at,
+            and_(Claim.created_at == created_at, Claim.id < claim_id)
+        ))
+
+    # one extra row tells whether another page follows
+    claims = query.order_by(Claim.created_at.desc(), Claim.id.desc()).limit(limit + 1).all()
+    if len(claims) > limit:
+        return claims[:limit], encode_cursor(claims[limit - 1])
+    return claims, None
@@ -4,14 +4,86 @@ Signs PDFs with digital signatures for authenticity verification
 """
 import os
 from datetime import datetime, timedelta
-from PyPDF2 import PdfReader, PdfWriter
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa, padding, utils
+from cryptography.hazmat.primitives.serialization import pkcs7
 from cryptography.hazmat.backends import default_backend
 from cryptography import x509
 from cryptography.x509.oid import NameOID
+import hashlib
 import io
 
+from app.services.pades import (
+    SignatureError, digest_byte_range, parse_cms, pdf_date, prepare_signature, read_signature,
+    signed_info, verify_signature
+)
+
+
+# signing key types; each must embed PDF signatures (PKCS#7/CMS in cryptography only
+# supports RSA and EC keys) as well as sign detached manifests
+KEY_TYPES = ('rsa', 'ec-p256')
+
+SIGNATURE_ALGORITHMS = {
+    'rsa': 'RSASSA-PSS-SHA256',
+    'ec-p256': 'ECDSA-P256-SHA256',
+}
+
+
+def generate_private_key(key_type):
+    if key_type == 'rsa':
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    if key_type == 'ec-p256':
+        return ec.generate_private_key(ec.SECP256R1(), default_backend())
+    raise ValueError(f"Unknown signing key type '{key_type}', expected one of {', '.join(KEY_TYPES)}")
+
+
+def key_type_of(key):
+    """Key type name of a private or public key"""
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return 'rsa'
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        return 'ec-p256'
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return 'ed25519'
+    raise ValueError(f'Unsupported signing key {type(key).__name__}')
+
+
+def _pss_padding():
+    return padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+
+def verify_digest_signature(public_key, digest, signature):
+    """Check a sign_digest signature with a public key, True if it matches"""
+    try:
+        key_type = key_type_of(public_key)
+        if key_type == 'rsa':
+            public_key.verify(signature, digest, _pss_padding(), utils.Prehashed(hashes.SHA256()))
+        elif key_type == 'ec-p256':
+            public_key.verify(signature, digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+        else:
+            # Ed25519 certificates retired before it was dropped as a signing key type
+            public_key.verify(signature, digest)
+    except (InvalidSignature, ValueError):
+        return False
+    return True
+
+
+def _write_atomically(path, content):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def public_key_fingerprint(public_key):
+    # SHA-256 of the DER encoded public key
+    public_der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(public_der).hexdigest()
+
 
 def _safe_log(level, message):
     # log safely whether or not we're in app context
@@ -28,12 +100,28 @@ class PDFSignerService:
     def __init__(self):
         self.private_key = None
         self.certificate = None
+        # rsa or ec-p256; an existing key file keeps its own type until rotated
+        self.key_type = (os.getenv('PDF_SIGNING_KEY_TYPE') or 'rsa').lower()
+        if self.key_type not in KEY_TYPES:
+            raise ValueError(f"Unsupported PDF_SIGNING_KEY_TYPE '{self.key_type}', "
+                             f"expected one of {', '.join(KEY_TYPES)}")
+        # fingerprint -> certificate of the current and all retired keys
+        self.verification_certificates = {}
         self._load_or_generate_keys()
+        self._load_retired_certificates()
 
     def _load_or_generate_keys(self):
         #load existing signing keys or generate new ones. These are in env gets generated to local storage and used
         key_path = os.getenv('PDF_SIGNING_KEY_PATH', 'app/private_storage/signing_key.pem')
         cert_path = os.getenv('PDF_SIGNING_CERT_PATH', 'app/private_storage/signing_cert.pem')
+        # kept so signing worker processes can load the same key
+        self.key_path = os.path.abspath(key_path)
+        self.cert_path = os.path.abspath(cert_path)
+        # certificates of rotated keys, so signatures made before a rotation still verify
+        self.retired_cert_dir = (
+            os.getenv('PDF_SIGNING_RETIRED_CERTS_DIR')
+            or os.path.join(os.path.dirname(self.cert_path), 'retired_signing_certs')
+        )
 
         # Try to load existing keys
         if os.path.exists(key_path) and os.path.exists(cert_path):
@@ -49,6 +137,19 @@ class PDFSignerService:
                         cert_file.read(),
                         backend=default_backend()
                     )
+                loaded_type = key_type_of(self.private_key)
+                if loaded_type not in KEY_TYPES:
+                    # e.g. Ed25519: PDFs would be served unsigned, replace the key but
+                    # keep its certificate so manifests it signed still verify
+                    _safe_log('warning', f"Signing key is {loaded_type}, which cannot sign PDFs; "
+                                         f"retiring it for a new {self.key_type} key")
+                    self._retire_certificate()
+                    self._generate_signing_keys(key_path, cert_path)
+                    return
+                if loaded_type != self.key_type:
+                    _safe_log('warning', f"Signing key is {loaded_type}, not the configured {self.key_type}; "
+                                         f"run 'flask signing rotate-key' to switch")
+                self.key_type = loaded_type
                 _safe_log('info', "Loaded existing signing keys")
                 return
             except Exception as e:
@@ -58,14 +159,10 @@ class PDFSignerService:
         self._generate_signing_keys(key_path, cert_path)
 
     def _generate_signing_keys(self, key_path, cert_path):
-        """Generate new RSA signing keys and self-signed certificate"""
+        """Generate new signing keys (of self.key_type) and self-signed certificate"""
         try:
             #generate private key
-            self.private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=2048,
-                backend=default_backend()
-            )
+            self.private_key = generate_private_key(self.key_type)
 
             #generate self-signed certificate
             subject = issuer = x509.Name([
@@ -88,64 +185,129 @@ class PDFSignerService:
                 datetime.utcnow()
             ).not_valid_after(
                 datetime.utcnow() + timedelta(days=3650)
-            ).sign(self.private_key, hashes.SHA256(), default_backend())
+            ).sign(
+                self.private_key, hashes.SHA256(), default_backend()
+            )
 
-            # Save keys
+            # Save keys (replace atomically, other processes may be loading them)
             os.makedirs(os.path.dirname(key_path), exist_ok=True)
 
-            with open(key_path, 'wb') as f:
-                f.write(self.private_key.private_bytes(
-                    encoding=serialization.Encoding.PEM,
-                    format=serialization.PrivateFormat.PKCS8,
-                    encryption_algorithm=serialization.NoEncryption()
-                ))
-
-            with open(cert_path, 'wb') as f:
-                f.write(self.certificate.public_bytes(serialization.Encoding.PEM))
+            _write_atomically(key_path, self.private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ))
+            _write_atomically(cert_path, self.certificate.public_bytes(serialization.Encoding.PEM))
 
-            _safe_log('info', "Generated new signing keys and certificate")
+            _safe_log('info', f"Generated new {self.key_type} signing keys and certificate")
 
         except Exception as e:
             _safe_log('error', f"Failed to generate signing keys: {str(e)}")
             raise
 
+    def _load_retired_certificates(self):
+        self.verification_certificates = {self.key_fingerprint: self.certificate}
+        self._public_keys = {}
+        if not os.path.isdir(self.retired_cert_dir):
+            return
+        for name in sorted(os.listdir(self.retired_cert_dir)):
+            if not name.endswith('.pem'):
+                continue
+            try:
+                with open(os.path.join(self.retired_cert_dir, name), 'rb') as cert_file:
+                    certificate = x509.load_pem_x509_certificate(cert_file.read(), default_backend())
+                self.verification_certificates.setdefault(
+                    public_key_fingerprint(certificate.public_key()), certificate
+                )
+            except Exception as e:
+                _safe_log('warning', f"Skipping retired signing certificate {name}: {str(e)}")
+
+    def rotate_key(self, key_type=None):
+        """
+        Retire the current key and switch to a freshly generated one
+
+        The retired certificate is kept for verification; its private key is replaced.
+        Other processes pick up the new key when they restart.
+
+        Args:
+            key_type: type of the new key, default the current type
+
+        Returns:
+            str: fingerprint of the retired key
+        """
+        new_type = (key_type or self.key_type).lower()
+        # fail on an unsupported type before retiring anything
+        if new_type not in KEY_TYPES:
+            raise ValueError(f"Unsupported signing key type '{new_type}', expected one of {', '.join(KEY_TYPES)}")
+
+        retired_fingerprint = self._retire_certificate()
+        self.key_type = new_type
+        self._generate_signing_keys(self.key_path, self.cert_path)
+        self._load_retired_certificates()
+        _safe_log('info', f"Rotated signing key {retired_fingerprint[:16]} -> {self.key_fingerprint[:16]}")
+        return retired_fingerprint
+
+    def _retire_certificate(self):
+        # keep the current certificate for verification, returns its fingerprint
+        fingerprint = public_key_fingerprint(self.certificate.public_key())
+        os.makedirs(self.retired_cert_dir, exist_ok=True)
+        _write_atomically(
+            os.path.join(self.retired_cert_dir, f'{fingerprint}.pem'),
+            self.certificate.public_bytes(serialization.Encoding.PEM)
+        )
+        return fingerprint
+
     def sign_pdf(self, pdf_content, metadata=None):
-        #Sign the PDF document with digital signature
-        try:
-            # read PDF
-            pdf_reader = PdfReader(io.BytesIO(pdf_content))
-            pdf_writer = PdfWriter()
+        """
+        Sign a PDF with an embedded byte-range signature (adbe.pkcs7.detached)
+
+        The signature and metadata are appended as an incremental update, the original
+        bytes are not rewritten. Only hashing the document grows with its size.
 
-            # copy all pages
-            for page in pdf_reader.pages:
-                pdf_writer.add_page(page)
+        Args:
+            pdf_content: original PDF bytes
+            metadata: optional dict with 'title', 'subject', 'claim_id' and 'evidence_hash'
 
-            # add metadata to it (authentication method)
+        Returns:
+            bytes: signed PDF
+        """
+        try:
+            now = datetime.utcnow()
+            info = {
+                '/Author': 'CampusCred System',
+                '/Creator': 'CampusCred PDF Signer',
+                '/Producer': 'CampusCred',
+                '/ModDate': pdf_date(now),
+            }
             if metadata:
-                pdf_writer.add_metadata({
-                    '/Title': metadata.get('title', 'Signed Document'),
-                    '/Author': 'CampusCred System',
-                    '/Subject': metadata.get('subject', 'Academic Credential'),
-                    '/Creator': 'CampusCred PDF Signer',
-                    '/Producer': 'CampusCred',
-                    '/CreationDate': datetime.utcnow().strftime('D:%Y%m%d%H%M%S'),
-                })
-
-            # write PDF
-            output_buffer = io.BytesIO()
-            pdf_writer.write(output_buffer)
-            signed_content = output_buffer.getvalue()
-
-            # compute the signature over the PDF
-            signature = self.private_key.sign(
-                signed_content,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
+                info['/Title'] = metadata.get('title', 'Signed Document')
+                info['/Subject'] = metadata.get('subject', 'Academic Credential')
+                # lets a verifier find the claim the document belongs to
+                if metadata.get('claim_id') is not None:
+                    info['/CampusCredClaimId'] = str(metadata['claim_id'])
+                if metadata.get('evidence_hash'):
+                    info['/CampusCredEvidenceHash'] = metadata['evidence_hash']
+
+            prepared = prepare_signature(
+                pdf_content,
+                info,
+                signer_name='CampusCred Document Signer',
+                reason='Academic credential evidence issued by CampusCred',
+                signing_time=now
             )
 
+            # no signed attributes: the CMS signature is directly over the byte ranges
+            cms = pkcs7.PKCS7SignatureBuilder().set_data(
+                prepared.signed_data()
+            ).add_signer(
+                self.certificate, self.private_key, hashes.SHA256()
+            ).sign(serialization.Encoding.DER, [
+                pkcs7.PKCS7Options.DetachedSignature,
+                pkcs7.PKCS7Options.NoAttributes,
+                pkcs7.PKCS7Options.Binary,
+            ])
+            signed_content = prepared.embed(cms)
+
             _safe_log('info', "PDF signed successfully")
             return signed_content
 
@@ -153,6 +315,109 @@ class PDFSignerService:
             _safe_log('error', f"Failed to sign PDF: {str(e)}")
             raise
 
+    def verify_pdf(self, pdf_content):
+        """
+        Check the embedded signature of a PDF signed by sign_pdf
+
+        Only the signature and the tail of the file are read into memory; the signed
+        byte ranges are hashed in chunks.
+
+        Args:
+            pdf_content: PDF bytes or a seekable binary file
+
+        Returns:
+            dict with 'valid' (signature matches and was made with a current or retired key),
+            'covers_whole_document' (nothing was appended after signing), 'key_fingerprint'
+            of the signing certificate, the signed 'claim_id' and 'evidence_hash', and 'error'
+        """
+        fileobj = io.BytesIO(pdf_content) if isinstance(pdf_content, (bytes, bytearray)) else pdf_content
+        result = {'valid': False, 'covers_whole_document': False, 'key_fingerprint': None,
+                  'claim_id': None, 'evidence_hash': None, 'error': None}
+        try:
+            found = read_signature(fileobj)
+            if not found:
+                result['error'] = 'PDF is not signed'
+                return result
+
+            cms = parse_cms(found['cms'])
+            if cms['signed_attributes'] or not cms['certificates']:
+                result['error'] = 'Unsupported signature format'
+                return result
+
+            certificate = x509.load_der_x509_certificate(cms['certificates'][0], default_backend())
+            result['key_fingerprint'] = public_key_fingerprint(certificate.public_key())
+            result['covers_whole_document'] = found['covers_whole_document']
+
+            # only keys we issued count, the certificate inside the PDF just names which one
+            public_key = self.public_key_for(result['key_fingerprint'])
+            if public_key is None:
+                result['error'] = 'Signed with an unknown key'
+            elif not verify_signature(public_key, cms['signature'], digest_byte_range(fileobj, found['byte_range'])):
+                result['error'] = 'Signature does not match the document'
+            else:
+                result['valid'] = True
+                claim_id = signed_info(found['tail'], 'CampusCredClaimId')
+                result['claim_id'] = int(claim_id) if claim_id and claim_id.isdigit() else None
+                result['evidence_hash'] = signed_info(found['tail'], 'CampusCredEvidenceHash')
+        except (SignatureError, ValueError) as e:
+            result['error'] = str(e)
+        return result
+
+    def sign_digest(self, digest):
+        """
+        Detached signature over a precomputed SHA-256 digest
+
+        The caller hashes the file in a streaming pass, so any evidence type of any
+        size can be signed without loading it into memory.
+
+        Args:
+            digest: 32 byte SHA-256 digest
+
+        Returns:
+            bytes: raw signature (see signature_algorithm)
+        """
+        if self.key_type == 'rsa':
+            return self.private_key.sign(digest, _pss_padding(), utils.Prehashed(hashes.SHA256()))
+        return self.private_key.sign(digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+
+    def verify_digest(self, digest, signature, key_fingerprint=None):
+        """
+        Check a signature made by sign_digest
+
+        Args:
+            key_fingerprint: key that made the signature (current or retired), default the current key
+
+        Returns:
+            bool: True if it matches
+        """
+        public_key = self.public_key_for(key_fingerprint or self.key_fingerprint)
+        if public_key is None:
+            return False
+        return verify_digest_signature(public_key, digest, signature)
+
+    def public_key_for(self, key_fingerprint):
+        """Public key of a current or retired signing key, None if the fingerprint is unknown"""
+        public_key = self._public_keys.get(key_fingerprint)
+        if public_key is None:
+            certificate = self.verification_certificates.get(key_fingerprint)
+            if certificate is None:
+                return None
+            public_key = self._public_keys[key_fingerprint] = certificate.public_key()
+        return public_key
+
+    @property
+    def signature_algorithm(self):
+        # algorithm of sign_digest signatures, written into signature manifests
+        return SIGNATURE_ALGORITHMS[self.key_type]
+
+    @property
+    def key_fingerprint(self):
+        # SHA-256 of the public key, identifies which key produced a signature
+        return public_key_fingerprint(self.private_key.public_key())
+
+    def certificate_pem(self):
+        return self.certificate.public_bytes(serialization.Encoding.PEM).decode()
+
     def get_certificate_info(self):
         if not self.certificate:
             return None
@@ -0,0 +1,70 @@
+"""
+Read-only projections of claims for list views
+A list page only shows a handful of columns, but loading Claim entities fetches every
+column (including the description / instructor_notes Text columns) and registers each
+object in the session's identity map with change tracking. These row types select just
+the columns a list renders and hold them in __slots__ objects: no per-row __dict__, no
+session state, nothing to flush. Use the ORM entity when a claim is going to be changed.
+"""
+from sqlalchemy import func
+
+from app import db
+from app.models import Claim
+
+
+class ClaimRow:
+    """Base of the projections; the field names in __slots__ are Claim attributes"""
+    __slots__ = ()
+    # SQL expressions for fields that are not loaded as the plain column
+    expressions = {}
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.id}>'
+
+    @classmethod
+    def columns(cls):
+        return [
+            cls.expressions[name].label(name) if name in cls.expressions else getattr(Claim, name)
+            for name in cls.__slots__
+        ]
+
+    @classmethod
+    def query(cls):
+        """Query over the projected columns; filter and order it like a Claim query"""
+        return db.session.query(*cls.columns())
+
+    @classmethod
+    def from_rows(cls, rows):
+        return [cls(*row) for row in rows]
+
+
+class PendingClaimRow(ClaimRow):
+    """Row of the dashboard's pending table (_claim_rows.pending_claim_row)"""
+    __slots__ = ('id', 'student_name', 'student_email', 'credential_type', 'course_code',
+                 'description', 'status', 'created_at')
+    # the table only shows the first 50 characters
+    expressions = {'description': func.substr(Claim.description, 1, 50)}
+
+
+class RecentClaimRow(ClaimRow):
+    """Dashboard's recently approved and minted lists"""
+    __slots__ = ('id', 'course_code', 'student_name', 'student_email', 'token_id', 'status')
+
+
+class PortalClaimRow(ClaimRow):
+    """Student portal cards and status tabs"""
+    __slots__ = ('id', 'course_code', 'credential_type', 'description', 'status', 'token_id',
+                 'transaction_hash', 'instructor_notes', 'created_at', 'approved_at', 'updated_at')
+
+
+class PublicCredentialRow(ClaimRow):
+    """Fields of the public credential data (bulk verification), no PII"""
+    __slots__ = ('id', 'token_id', 'course_code', 'credential_type', 'description', 'student_address',
+                 'transaction_hash', 'metadata_uri', 'evidence_file_hash', 'minted_at')
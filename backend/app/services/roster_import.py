@@ -0,0 +1,223 @@
+"""
+Bulk claim import from a registrar roster
+A roster is a CSV file with a header row or a JSONL file (one object per line) with the
+columns student_name, student_email, wallet_address, course_code, credential_type and
+optionally description. The file is read as a stream and validated row by row; valid
+rows are inserted as pending claims with one executemany INSERT per chunk, invalid rows
+are reported by line number and skipped. Rows whose student already has a claim for the
+same course and credential type are skipped too, so a roster can be imported again after
+a failed or interrupted run.
+"""
+import csv
+import io
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from app import db
+from app.models import Claim
+from app.services.claim_stats import adjust_status_count
+
+ROSTER_FORMATS = ('csv', 'jsonl')
+REQUIRED_FIELDS = ('student_name', 'student_email', 'course_code', 'credential_type')
+CREDENTIAL_TYPES = ('micro-credential', 'course-completion', 'diploma')
+
+DEFAULT_CHUNK_SIZE = 5000
+# the report keeps the first errors only, a wrong file must not produce a huge response
+MAX_REPORTED_ERRORS = 1000
+
+WALLET_PATTERN = re.compile(r'^0x[0-9a-fA-F]{40}$')
+# column lengths of the claims table
+MAX_LENGTHS = {
+    'student_name': Claim.__table__.c.student_name.type.length,
+    'student_email': Claim.__table__.c.student_email.type.length,
+    'course_code': Claim.__table__.c.course_code.type.length,
+}
+
+
+class RosterError(ValueError):
+    """A roster that cannot be read to the end; report holds what was committed before"""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+def roster_format(filename, default='csv'):
+    """Roster format from the file extension (.csv, .jsonl/.ndjson)"""
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    return default
+
+
+def _text_stream(stream):
+    # binary uploads are decoded lazily; utf-8-sig drops the BOM spreadsheet exports add
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+
+def iter_roster(stream, fmt='csv'):
+    """
+    Rows of a roster file
+
+    Yields:
+        (line_number, row dict or None, error or None)
+    """
+    text = _text_stream(stream)
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            # line of the row's last physical line, quoted fields may span several
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'invalid JSON'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'expected a JSON object'
+            continue
+        yield line_number, row, None
+
+
+def validate_row(row):
+    """
+    Check one roster row and turn it into claim column values
+
+    Returns:
+        (values, None) or (None, error message)
+    """
+    values = {field: str(row.get(field) or '').strip() for field in REQUIRED_FIELDS}
+
+    missing = [field for field in REQUIRED_FIELDS if not values[field]]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+
+    if '@' not in values['student_email']:
+        return None, 'invalid email address'
+
+    for field, max_length in MAX_LENGTHS.items():
+        if len(values[field]) > max_length:
+            return None, f"{field} longer than {max_length} characters"
+
+    if values['credential_type'] not in CREDENTIAL_TYPES:
+        return None, f"unknown credential_type '{values['credential_type']}'"
+
+    wallet = str(row.get('wallet_address') or '').strip()
+    if wallet and not WALLET_PATTERN.match(wallet):
+        return None, 'invalid wallet_address'
+
+    values['course_code'] = values['course_code'].upper()
+    # emails are case-insensitive, store one spelling so re-imports find the claim
+    values['student_email'] = values['student_email'].lower()
+    # sessions hold lowercase addresses, the student portal matches on equality
+    values['student_address'] = wallet.lower() or None
+    values['description'] = str(row.get('description') or '').strip() or None
+    return values, None
+
+
+def _claim_key(values):
+    return values['student_email'], values['course_code'], values['credential_type']
+
+
+def _insert_chunk(rows):
+    """
+    Insert a chunk of validated rows, skipping claims that already exist
+
+    Returns:
+        number of claims inserted
+    """
+    # one lookup per chunk; a repeated row inside the chunk keeps its first occurrence
+    new_rows = {}
+    for values in rows:
+        new_rows.setdefault(_claim_key(values), values)
+    existing = db.session.execute(
+        select(Claim.student_email, Claim.course_code, Claim.credential_type)
+        .where(Claim.student_email.in_({values['student_email'] for values in rows}))
+    )
+    for key in existing:
+        new_rows.pop(tuple(key), None)
+
+    if new_rows:
+        # Core table INSERT: a plain DBAPI executemany, no ORM bulk path or RETURNING; it
+        # skips the ORM flush, so the pending counter is moved in the same transaction
+        db.session.execute(insert(Claim.__table__), list(new_rows.values()))
+        adjust_status_count('pending', len(new_rows))
+    db.session.commit()
+    return len(new_rows)
+
+
+def import_roster(stream, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert the valid rows of a roster as pending claims
+
+    Args:
+        stream: binary or text file object
+        fmt: 'csv' or 'jsonl'
+        chunk_size: rows per INSERT and transaction
+
+    Returns:
+        dict with 'rows' (read), 'imported', 'skipped' (claim already exists), 'failed',
+        'errors' [(line, message)] (at most MAX_REPORTED_ERRORS) and 'committed_line'
+        (last line covered by a committed chunk)
+
+    Raises:
+        ValueError: unknown format
+        RosterError: undecodable or malformed file; chunks committed before the bad line
+            stay imported, the error's report says how far the import got
+    """
+    if fmt not in ROSTER_FORMATS:
+        raise ValueError(f"unsupported roster format '{fmt}'")
+
+    report = {'rows': 0, 'imported': 0, 'skipped': 0, 'failed': 0, 'errors': [], 'committed_line': 0}
+    # one timestamp for the whole import instead of a default call per row
+    now = datetime.utcnow()
+    chunk = []
+
+    def flush(line_number):
+        imported = _insert_chunk(chunk)
+        report['imported'] += imported
+        report['skipped'] += len(chunk) - imported
+        report['committed_line'] = line_number
+        chunk.clear()
+
+    line_number = 0
+    try:
+        for line_number, row, error in iter_roster(stream, fmt):
+            report['rows'] += 1
+            if row is not None:
+                values, error = validate_row(row)
+            if error:
+                report['failed'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append((line_number, error))
+                continue
+
+            values.update(status='pending', created_at=now, updated_at=now)
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                flush(line_number)
+
+        if chunk:
+            flush(line_number)
+        report['committed_line'] = line_number
+    except UnicodeDecodeError:
+        db.session.rollback()
+        raise RosterError('roster is not UTF-8 encoded', report) from None
+    except csv.Error as e:
+        db.session.rollback()
+        raise RosterError(f"malformed CSV: {e}", report) from e
+
+    return report
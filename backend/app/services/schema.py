@@ -0,0 +1,75 @@
+"""
+Index migration for existing databases
+db.create_all() only creates missing tables, so indexes added to the models later never
+reach a database that already has the table. sync_indexes compares the indexes declared
+on the models with the ones in the database, creates the missing ones and rebuilds those
+whose columns or uniqueness changed. A unique index is only built once the column has
+no duplicate values; duplicates are reported instead and the old index is left alone.
+"""
+from sqlalchemy import func, inspect, select
+
+
+def find_duplicates(connection, table, columns):
+    """
+    Rows that would violate a unique index over columns
+
+    Returns:
+        list of (values tuple, [primary keys])
+    """
+    key_columns = [table.c[name] for name in columns]
+    primary_key = list(table.primary_key.columns)[0]
+
+    duplicated = (
+        select(*key_columns)
+        .where(*[column.isnot(None) for column in key_columns])
+        .group_by(*key_columns)
+        .having(func.count() > 1)
+    )
+    duplicates = []
+    for values in connection.execute(duplicated):
+        rows = connection.execute(
+            select(primary_key)
+            .where(*[column == value for column, value in zip(key_columns, values)])
+            .order_by(primary_key)
+        )
+        duplicates.append((tuple(values), [row[0] for row in rows]))
+    return duplicates
+
+
+def sync_indexes(engine, metadata):
+    """
+    Bring the indexes of existing tables in line with the models
+
+    Returns:
+        dict with 'created' and 'rebuilt' index names and 'duplicates'
+        {index name: find_duplicates result} for unique indexes that could not be built
+    """
+    report = {'created': [], 'rebuilt': [], 'duplicates': {}}
+    inspector = inspect(engine)
+
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index['name']: index for index in inspector.get_indexes(table.name)}
+
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                columns = [column.name for column in index.columns]
+                current = existing.get(index.name)
+                if current and current['column_names'] == columns and bool(current['unique']) == bool(index.unique):
+                    continue
+
+                if index.unique:
+                    duplicates = find_duplicates(connection, table, columns)
+                    if duplicates:
+                        report['duplicates'][index.name] = duplicates
+                        continue
+
+                if current:
+                    connection.exec_driver_sql(f'DROP INDEX {index.name}')
+                    report['rebuilt'].append(index.name)
+                else:
+                    report['created'].append(index.name)
+                index.create(bind=connection)
+
+    return report
@@ -0,0 +1,100 @@
+"""
+Verification of downloaded evidence
+A recipient uploads a signed PDF, or any evidence file together with its signature
+manifest. The file is hashed in a streaming pass and checked against the signing
+certificates the signer already holds in memory (current and retired keys). The claim
+is then loaded by primary key and must have recorded the same evidence hash.
+"""
+import base64
+import hashlib
+
+from app import db
+from app.models import Claim
+from app.services.signed_evidence import manifest_digest
+from app.services.storage import CHUNK_SIZE
+
+
+def _stream_sha256(fileobj):
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify_manifest(signer, fileobj, manifest):
+    result = {
+        'valid': False,
+        'method': 'manifest',
+        'covers_whole_document': True,
+        'key_fingerprint': manifest.get('key_fingerprint'),
+        'claim_id': manifest.get('claim_id'),
+        'evidence_hash': None,
+        'error': None,
+    }
+
+    if manifest.get('version') != 2:
+        # the signature covers the fields of MANIFEST_SIGNED_FIELDS (version 2)
+        result['error'] = 'Unsupported signature manifest version'
+        return result
+
+    file_hash = _stream_sha256(fileobj)
+    result['evidence_hash'] = file_hash
+    if manifest.get('hash_algorithm') != 'sha256' or manifest.get('file_hash') != file_hash:
+        result['error'] = 'File does not match the signature manifest'
+        return result
+
+    try:
+        signature = base64.b64decode(manifest.get('signature') or '', validate=True)
+    except ValueError:
+        result['error'] = 'Signature is not valid base64'
+        return result
+
+    if signer.public_key_for(result['key_fingerprint']) is None:
+        result['error'] = 'Signed with an unknown key'
+    elif not signer.verify_digest(manifest_digest(manifest), signature, result['key_fingerprint']):
+        result['error'] = 'Signature does not match the file'
+    else:
+        result['valid'] = True
+    return result
+
+
+def _matching_claim(result):
+    # the claim must also have recorded the evidence hash the signature covers
+    try:
+        claim_id = int(result.get('claim_id'))
+    except (TypeError, ValueError):
+        return None
+    claim = db.session.get(Claim, claim_id)
+    if not claim or not claim.evidence_file_hash or claim.evidence_file_hash != result.get('evidence_hash'):
+        return None
+    return claim
+
+
+def verify_evidence(signer, fileobj, manifest=None):
+    """
+    Verify a downloaded evidence file
+
+    Args:
+        signer: PDFSignerService holding the verification certificates
+        fileobj: seekable binary file (e.g. an uploaded file's stream)
+        manifest: parsed signature manifest for a detached signature, None for a signed PDF
+
+    Returns:
+        dict with 'valid', 'method' ('pdf' or 'manifest'), 'key_fingerprint', 'current_key',
+        'covers_whole_document', 'claim_id', 'evidence_hash', 'error' and the matching 'claim'
+        (None if no claim recorded this evidence)
+    """
+    if manifest is None:
+        result = signer.verify_pdf(fileobj)
+        result['method'] = 'pdf'
+        # a later incremental update can change what a PDF reader shows
+        if result['valid'] and not result['covers_whole_document']:
+            result['valid'] = False
+            result['error'] = 'Document was changed after signing'
+    else:
+        result = _verify_manifest(signer, fileobj, manifest)
+
+    result['current_key'] = result['key_fingerprint'] == signer.key_fingerprint
+    result['claim'] = _matching_claim(result) if result['valid'] else None
+    return result
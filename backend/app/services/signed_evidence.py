@@ -0,0 +1,135 @@
+"""
+Sign-once cache for PDF evidence
+A signed PDF only depends on the evidence file, the signing metadata and the signing key,
+so it is produced once (at mint time, or on the first download) and stored via StorageService.
+Later downloads are a plain file serve.
+
+Evidence of other types gets a detached signature manifest (signature_manifest).
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+
+def signing_metadata(claim):
+    """Metadata written into the signed PDF for a claim"""
+    return {
+        'title': f'{claim.course_code} - {claim.student_name}',
+        'subject': f'Academic Credential Evidence - Token #{claim.token_id}',
+        'claim_id': claim.id,
+        'evidence_hash': claim.evidence_file_hash,
+    }
+
+
+# manifest fields covered by the signature (version 2); the rest is informational
+MANIFEST_SIGNED_FIELDS = ('version', 'claim_id', 'token_id', 'file_name', 'hash_algorithm',
+                          'file_hash', 'key_fingerprint', 'signed_at')
+
+
+def manifest_digest(manifest):
+    """SHA-256 of the canonical JSON of a manifest's signed fields, the bytes a v2 signature covers"""
+    payload = {field: manifest.get(field) for field in MANIFEST_SIGNED_FIELDS}
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).digest()
+
+
+def signature_manifest(storage, signer, claim):
+    """
+    Detached signature for non-PDF evidence
+
+    The file is hashed in one streaming pass, then the claim id, token id, file name and
+    file hash are signed together (manifest_digest), so memory use does not depend on the
+    file size and a manifest cannot be pointed at another claim. PDFs are served with an
+    embedded signature (different bytes than the stored file) and get no manifest.
+
+    Returns:
+        dict manifest, or None if the evidence cannot be read
+    """
+    file_hash = storage.hash_file(claim.evidence_file_path)
+    if not file_hash:
+        return None
+
+    manifest = {
+        'version': 2,
+        'claim_id': claim.id,
+        'token_id': claim.token_id,
+        'file_name': claim.evidence_file_name,
+        'hash_algorithm': 'sha256',
+        'file_hash': file_hash,
+        'key_fingerprint': signer.key_fingerprint,
+        'signed_at': datetime.utcnow().isoformat() + 'Z',
+    }
+    signature = signer.sign_digest(manifest_digest(manifest))
+    manifest.update({
+        # False means the stored file no longer matches what was recorded at submission
+        'matches_recorded_hash': file_hash == claim.evidence_file_hash,
+        'signature_algorithm': signer.signature_algorithm,
+        'signature': base64.b64encode(signature).decode(),
+        'certificate': signer.certificate_pem(),
+    })
+    return manifest
+
+
+def artifact_name(claim, key_fingerprint):
+    """Name of the signed PDF of a claim under the given key, None without an evidence hash"""
+    if not claim.evidence_file_hash:
+        return None
+    material = json.dumps({
+        'evidence': claim.evidence_file_hash,
+        'metadata': signing_metadata(claim),
+        'key': key_fingerprint,
+    }, sort_keys=True)
+    return f"{hashlib.sha256(material.encode()).hexdigest()}.pdf"
+
+
+def is_signable(claim):
+    return bool(claim.evidence_file_path) and (claim.evidence_file_name or '').lower().endswith('.pdf')
+
+
+class SignedEvidenceCache:
+    """Look up or produce the signed version of a claim's PDF evidence"""
+
+    def __init__(self, storage, signer):
+        self.storage = storage
+        self.signer = signer
+
+    def artifact_name(self, claim):
+        """
+        Cache key: evidence hash + signing metadata + key fingerprint
+        Returns None if the evidence has no hash (then the result cannot be cached safely)
+        """
+        return artifact_name(claim, self.signer.key_fingerprint)
+
+    def open_signed(self, claim):
+        """Stream of the already signed PDF, or None if it was not produced yet"""
+        name = self.artifact_name(claim)
+        return self.storage.open_artifact(name) if name else None
+
+    def sign(self, claim):
+        """
+        Sign the evidence and store the result
+
+        Returns:
+            bytes: signed PDF, or None if the evidence could not be read
+        """
+        content = self.storage.get_file(claim.evidence_file_path)
+        if not content:
+            return None
+
+        signed_content = self.signer.sign_pdf(content, signing_metadata(claim))
+
+        name = self.artifact_name(claim)
+        if name:
+            self.storage.save_artifact(name, signed_content)
+        return signed_content
+
+    def ensure_signed(self, claim):
+        """Pre-sign at mint time so the first download is already a cache hit"""
+        if not is_signable(claim):
+            return False
+        stream = self.open_signed(claim)
+        if stream is not None:
+            stream.close()
+            return True
+        return self.sign(claim) is not None
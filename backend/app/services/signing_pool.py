@@ -0,0 +1,125 @@
+"""
+Process pool for PDF signing
+Parsing and signing PDFs is CPU bound and holds the GIL, so it is moved off the request
+thread into a small pool of worker processes. Each worker loads the signing key once.
+The number of queued + running jobs is bounded: when the pool is saturated new jobs are
+refused right away (SigningQueueFull) instead of piling up behind slow requests.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# signer of the worker process, created once by _init_worker
+_worker_signer = None
+
+
+class SigningQueueFull(Exception):
+    """All signing slots are taken, the caller should retry later"""
+
+
+def _init_worker(key_path, cert_path):
+    global _worker_signer
+    os.environ['PDF_SIGNING_KEY_PATH'] = key_path
+    os.environ['PDF_SIGNING_CERT_PATH'] = cert_path
+    from app.services.pdf_signer import PDFSignerService
+    _worker_signer = PDFSignerService()
+
+
+def _sign_in_worker(pdf_content, metadata):
+    return _worker_signer.sign_pdf(pdf_content, metadata)
+
+
+def _mp_context():
+    # fork would copy locks and open DB/S3 connections of the web process into the workers;
+    # forkserver/spawn start clean and do not re-run the app entry point for every worker
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class SigningPool:
+    """Drop-in for PDFSignerService.sign_pdf that signs in worker processes"""
+
+    def __init__(self, signer, workers, max_queue=None, timeout=60):
+        """
+        Args:
+            signer: PDFSignerService of this process (key paths, fingerprint, certificate)
+            workers: number of worker processes
+            max_queue: signing jobs allowed in flight (running + waiting), default 4 per worker
+            timeout: seconds to wait for a signed result
+        """
+        self.signer = signer
+        self.workers = workers
+        self.max_queue = max_queue or workers * 4
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, signer):
+        """Pool configured by PDF_SIGNING_POOL_SIZE (0 = sign in the request thread), or None"""
+        workers = int(os.getenv('PDF_SIGNING_POOL_SIZE') or 0)
+        if workers <= 0:
+            return None
+        return cls(
+            signer,
+            workers,
+            max_queue=int(os.getenv('PDF_SIGNING_QUEUE_LIMIT') or 0) or None,
+            timeout=float(os.getenv('PDF_SIGNING_TIMEOUT') or 60)
+        )
+
+    def _get_executor(self):
+        # started on first use so importing the routes does not spawn processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_mp_context(),
+                    initializer=_init_worker,
+                    initargs=(self.signer.key_path, self.signer.cert_path)
+                )
+            return self._executor
+
+    def sign_pdf(self, pdf_content, metadata=None):
+        """
+        Sign a PDF in a worker process
+
+        Raises:
+            SigningQueueFull: if max_queue jobs are already in flight
+        """
+        if not self._slots.acquire(blocking=False):
+            raise SigningQueueFull(f'{self.max_queue} signing jobs already in flight')
+
+        try:
+            future = self._get_executor().submit(_sign_in_worker, pdf_content, metadata)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the job really finished, also if we stop waiting for it
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # a worker died (e.g. killed for memory), start a fresh pool for the next job
+            with self._lock:
+                self._executor = None
+            raise
+
+    @property
+    def key_fingerprint(self):
+        return self.signer.key_fingerprint
+
+    def verify_pdf(self, pdf_content):
+        return self.signer.verify_pdf(pdf_content)
+
+    def get_certificate_info(self):
+        return self.signer.get_certificate_info()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait)
@@ -1,8 +1,23 @@
 import os
+import re
+import mmap
+import shutil
+import hashlib
+import tempfile
+import io
+import uuid
 from werkzeug.utils import secure_filename
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from botocore.exceptions import ClientError
+from app.services.evidence_cache import EvidenceCache
+
+# zstandard is optional, evidence is stored uncompressed without it
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
 
 #import for safe logging
 try:
@@ -25,6 +40,25 @@ def _safe_log(level, message):
         print(f"[{level.upper()}] {message}")
 
 
+# evidence files written by save_evidence_file, used to tell them apart from keys etc.
+EVIDENCE_FILE_PATTERN = re.compile(r'^(claim_\d+_\d{8}_\d{6}|upload_[0-9a-f]{32})\.\w+(\.zst)?$')
+
+# derived files (signed PDFs, ...) live next to the evidence under this prefix
+ARTIFACT_PREFIX = 'signed/'
+# artifact names (sha256 cache keys) and leftovers of interrupted local writes
+ARTIFACT_FILE_PATTERN = re.compile(r'^([0-9a-f]{64}\.pdf|\.tmp_\w+)$')
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+S3_DELETE_BATCH = 1000
+
+# chunk size for streaming reads (hashing S3 objects)
+CHUNK_SIZE = 1024 * 1024
+
+# formats that usually shrink, images are already compressed and stored as-is
+COMPRESSIBLE_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
+COMPRESSED_SUFFIX = '.zst'
+
+
 class StorageService:
     """
     Handle private file storage for evidence uploads
@@ -36,9 +70,19 @@ class StorageService:
         self.base_path = base_path
         self.allowed_extensions = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'txt'}
 
+        # optional zstd compression of stored evidence (EVIDENCE_COMPRESSION=zstd)
+        self.compression_enabled = os.getenv('EVIDENCE_COMPRESSION', '').lower() == 'zstd'
+        self.compression_level = int(os.getenv('EVIDENCE_COMPRESSION_LEVEL', 3))
+        if self.compression_enabled and zstd is None:
+            _safe_log('warning', "EVIDENCE_COMPRESSION=zstd but zstandard is not installed, storing raw files")
+            self.compression_enabled = False
+
         # Check if S3 is configured
         self.use_s3 = self._check_s3_config()
 
+        # local read-through cache for S3 objects (see _init_s3_cache)
+        self.s3_cache = None
+
         if self.use_s3:
             self._init_s3_client()
         else:
@@ -64,6 +108,23 @@ class StorageService:
         except Exception as e:
             _safe_log('error', f"Failed to initialize S3 client: {str(e)}")
             self.use_s3 = False
+            return
+
+        self._init_s3_cache()
+
+    def _init_s3_cache(self):
+        # disk cache for downloaded evidence, S3_CACHE_MAX_BYTES=0 turns it off
+        max_bytes = int(os.getenv('S3_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+        if max_bytes <= 0:
+            return
+        try:
+            self.s3_cache = EvidenceCache(
+                os.getenv('S3_CACHE_DIR', 'app/s3_cache'),
+                max_bytes,
+                revalidate_after=int(os.getenv('S3_CACHE_REVALIDATE_SECONDS', 3600))
+            )
+        except Exception as e:
+            _safe_log('warning', f"S3 cache disabled: {str(e)}")
 
     def allowed_file(self, filename):
        #check first if file extension is allowed to be uploaded
@@ -71,27 +132,161 @@ class StorageService:
             return False
         return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
 
-    def save_evidence_file(self, file, claim_id):
+    def save_evidence_file(self, file, claim_id=None):
         # save uploaded evidence file privately (local or S3) fallback
+        # without a claim id (claim not inserted yet) the file gets a random upload key
         if not file or not self.allowed_file(file.filename):
             return None, None
 
         original_filename = secure_filename(file.filename)
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         file_extension = original_filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"claim_{claim_id}_{timestamp}.{file_extension}"
-
-        if self.use_s3:
-            return self._save_to_s3(file, unique_filename, original_filename)
+        if claim_id is None:
+            unique_filename = f"upload_{uuid.uuid4().hex}.{file_extension}"
         else:
-            return self._save_locally(file, unique_filename, original_filename)
+            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+            unique_filename = f"claim_{claim_id}_{timestamp}.{file_extension}"
+
+        return self.save_stream(file, unique_filename, original_filename)
+
+    def save_stream(self, file, unique_filename, original_filename):
+        """
+        Store a file object under unique_filename (local or S3), compressing it if enabled
+
+        Returns:
+            (stored_path, original_filename) or (None, None)
+        """
+        file_extension = unique_filename.rsplit('.', 1)[1].lower()
+
+        # store the compressed copy instead when it is actually smaller
+        compressed = self._compress_upload(file, file_extension)
+        if compressed is not None:
+            file = compressed
+            unique_filename += COMPRESSED_SUFFIX
+
+        try:
+            if self.use_s3:
+                return self._save_to_s3(file, unique_filename, original_filename)
+            else:
+                return self._save_locally(file, unique_filename, original_filename)
+        finally:
+            if compressed is not None:
+                compressed.close()
+
+    def adopt_local_file(self, source_path, unique_filename, original_filename):
+        """
+        Move a finished local file (e.g. a chunked upload staging file) into storage
+
+        Uncompressed local storage is a plain rename; otherwise the file goes through save_stream.
+        Returns:
+            (stored_path, original_filename) or (None, None)
+        """
+        file_extension = unique_filename.rsplit('.', 1)[1].lower()
+        compress = self.compression_enabled and file_extension in COMPRESSIBLE_EXTENSIONS
+
+        if not self.use_s3 and not compress:
+            shard_dir = self._shard_dir(unique_filename)
+            os.makedirs(shard_dir, exist_ok=True)
+            file_path = os.path.join(shard_dir, unique_filename)
+            shutil.move(source_path, file_path)
+            return file_path, original_filename
+
+        with open(source_path, 'rb') as f:
+            stored = self.save_stream(f, unique_filename, original_filename)
+        if stored[0]:
+            os.remove(source_path)
+        return stored
+
+    def _compress_upload(self, file, file_extension):
+        """
+        Compress an upload into a temporary file
+
+        Returns:
+            file object positioned at 0, or None when compression is off or does not pay off
+        """
+        if not self.compression_enabled or file_extension not in COMPRESSIBLE_EXTENSIONS:
+            return None
+
+        source = getattr(file, 'stream', file)
+        if not hasattr(source, 'read'):
+            return None
+
+        # small files stay in memory, big ones spill to disk
+        spooled = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        compressor = zstd.ZstdCompressor(level=self.compression_level)
+        read_size, written_size = compressor.copy_stream(source, spooled)
+
+        if written_size >= read_size:
+            spooled.close()
+            source.seek(0)
+            return None
+
+        spooled.seek(0)
+        return spooled
+
+    @staticmethod
+    def is_compressed(file_path):
+        # compressed evidence is stored with a .zst suffix on top of the original extension
+        return bool(file_path) and file_path.endswith(COMPRESSED_SUFFIX)
+
+    @staticmethod
+    def _decompress(content):
+        return zstd.ZstdDecompressor().stream_reader(io.BytesIO(content)).read()
+
+    def _shard_dir(self, unique_filename, root=None):
+        # two level hashed directory (ab/cd/) so no single directory grows huge
+        digest = hashlib.sha256(unique_filename.encode()).hexdigest()
+        return os.path.join(root or self.base_path, digest[:2], digest[2:4])
 
     def _save_locally(self, file, unique_filename, original_filename):
-        #save file to local storage in directory func
-        file_path = os.path.join(self.base_path, unique_filename)
-        file.save(file_path)
+        #save file to local storage in its shard directory
+        shard_dir = self._shard_dir(unique_filename)
+        os.makedirs(shard_dir, exist_ok=True)
+        file_path = os.path.join(shard_dir, unique_filename)
+        if hasattr(file, 'save'):
+            file.save(file_path)
+        else:
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(file, f, CHUNK_SIZE)
         return file_path, original_filename
 
+    def _resolve_local_path(self, file_path):
+        # paths stored before sharding point at the flat directory, look in the shard too
+        if not file_path:
+            return None
+        if os.path.exists(file_path):
+            return file_path
+        sharded_path = os.path.join(self._shard_dir(os.path.basename(file_path)), os.path.basename(file_path))
+        if os.path.exists(sharded_path):
+            return sharded_path
+        return None
+
+    def shard_existing_files(self, dry_run=False):
+        """
+        Move evidence files from the flat base directory into the sharded layout
+
+        Returns:
+            list of (old_path, new_path) tuples for every file moved (or to be moved on dry run)
+        """
+        moves = []
+        if self.use_s3 or not os.path.isdir(self.base_path):
+            return moves
+
+        with os.scandir(self.base_path) as entries:
+            for entry in entries:
+                if not entry.is_file() or not EVIDENCE_FILE_PATTERN.match(entry.name):
+                    continue
+
+                shard_dir = self._shard_dir(entry.name)
+                new_path = os.path.join(shard_dir, entry.name)
+                if not dry_run:
+                    os.makedirs(shard_dir, exist_ok=True)
+                    shutil.move(entry.path, new_path)
+                moves.append((os.path.join(self.base_path, entry.name), new_path))
+
+        if moves and not dry_run:
+            _safe_log('info', f"Moved {len(moves)} evidence files into sharded layout")
+        return moves
+
     def _save_to_s3(self, file, unique_filename, original_filename):
         # save file to S3 aws
         try:
@@ -117,40 +312,388 @@ class StorageService:
     def get_file(self, file_path):
         # retrieve the file content (from local or S3 whaever is used)
         if self.use_s3 and file_path.startswith('evidence/'):
-            return self._get_from_s3(file_path)
+            content = self._get_from_s3(file_path)
         else:
-            return self._get_locally(file_path)
+            content = self._get_locally(file_path)
+
+        if content is not None and self.is_compressed(file_path):
+            return self._decompress_safely(content)
+        return content
+
+    def _decompress_safely(self, content):
+        if zstd is None:
+            _safe_log('error', "Evidence is zstd-compressed but zstandard is not installed")
+            return None
+        try:
+            return self._decompress(content)
+        except zstd.ZstdError as e:
+            _safe_log('error', f"Failed to decompress evidence: {str(e)}")
+            return None
 
     def _get_locally(self, file_path):
         #get file from local
         try:
-            if os.path.exists(file_path):
-                with open(file_path, 'rb') as f:
+            local_path = self._resolve_local_path(file_path)
+            if local_path:
+                with open(local_path, 'rb') as f:
                     return f.read()
         except Exception as e:
             _safe_log('error', f"Failed to read local file: {str(e)}")
         return None
 
-    def _get_from_s3(self, s3_key):
-      # Get file from S3
+    def _map_locally(self, local_path):
+        # read-only memory map of a local file, pages are loaded lazily by the OS
+        with open(local_path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def open_evidence(self, file_path):
+        """
+        Open a stored file for streaming without reading it all into memory
+
+        Local files are memory-mapped, S3 objects are returned as the streaming body,
+        compressed evidence is decompressed on the fly while reading.
+        Returns a readable binary file-like object or None
+        """
+        raw_stream = self._open_raw(file_path)
+        if raw_stream is None or not self.is_compressed(file_path):
+            return raw_stream
+
+        if zstd is None:
+            _safe_log('error', "Evidence is zstd-compressed but zstandard is not installed")
+            raw_stream.close()
+            return None
+        return zstd.ZstdDecompressor().stream_reader(raw_stream, read_size=CHUNK_SIZE)
+
+    def _open_raw(self, file_path):
+        # stored bytes as-is (still compressed for .zst files)
+        if self.use_s3 and file_path.startswith('evidence/'):
+            try:
+                return self._open_s3_object(file_path)
+            except (ClientError, OSError) as e:
+                _safe_log('error', f"Failed to open S3 object: {str(e)}")
+                return None
+
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            return response['Body'].read()
+            local_path = self._resolve_local_path(file_path)
+            if not local_path:
+                return None
+            if os.path.getsize(local_path) == 0:
+                # empty files cannot be memory-mapped
+                return open(local_path, 'rb')
+            return self._map_locally(local_path)
+        except Exception as e:
+            _safe_log('error', f"Failed to open local file: {str(e)}")
+            return None
+
+    def hash_file(self, file_path):
+        """
+        Compute SHA-256 of a stored file without loading it into a bytes object
+
+        Returns:
+            str: hex digest, or None if the file cannot be read
+        """
+        sha256_hash = hashlib.sha256()
+
+        # compressed files are hashed over the decompressed stream, i.e. the original upload
+        if (self.use_s3 and file_path.startswith('evidence/')) or self.is_compressed(file_path):
+            body = self.open_evidence(file_path)
+            if body is None:
+                return None
+            try:
+                for chunk in iter(lambda: body.read(CHUNK_SIZE), b''):
+                    sha256_hash.update(chunk)
+            finally:
+                body.close()
+            return sha256_hash.hexdigest()
+
+        try:
+            local_path = self._resolve_local_path(file_path)
+            if not local_path:
+                return None
+            if os.path.getsize(local_path) > 0:
+                # hashlib reads straight from the mapping and releases the GIL
+                with self._map_locally(local_path) as mapped:
+                    sha256_hash.update(mapped)
+            return sha256_hash.hexdigest()
+        except Exception as e:
+            _safe_log('error', f"Failed to hash local file: {str(e)}")
+            return None
+
+    def _artifact_local_path(self, name):
+        return os.path.join(self._shard_dir(name, root=os.path.join(self.base_path, 'signed')), name)
+
+    def save_artifact(self, name, content):
+        """
+        Store a derived file (e.g. a signed PDF) that can be served again later
+
+        Returns:
+            str: stored path / S3 key, or None on failure
+        """
+        if self.use_s3:
+            s3_key = f"{ARTIFACT_PREFIX}{name}"
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=content,
+                    ServerSideEncryption='AES256'
+                )
+                return s3_key
+            except ClientError as e:
+                _safe_log('error', f"Failed to store artifact in S3: {str(e)}")
+                return None
+
+        file_path = self._artifact_local_path(name)
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # write then rename, a concurrent reader never sees half a file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.tmp_')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, file_path)
+            return file_path
+        except OSError as e:
+            _safe_log('error', f"Failed to store artifact locally: {str(e)}")
+            return None
+
+    def open_artifact(self, name):
+        """
+        Open a stored artifact for streaming (memory-mapped / from the S3 cache)
+
+        Returns:
+            readable binary file-like object, or None if there is no such artifact
+        """
+        if self.use_s3:
+            s3_key = f"{ARTIFACT_PREFIX}{name}"
+            try:
+                return self._open_s3_object(s3_key)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in ('NoSuchKey', '404'):
+                    _safe_log('error', f"Failed to open artifact in S3: {str(e)}")
+                return None
+
+        file_path = self._artifact_local_path(name)
+        if not os.path.exists(file_path):
+            return None
+        return self._map_locally(file_path)
+
+    def start_multipart_upload(self, s3_key, original_filename):
+        # begin an S3 multipart upload, returns its upload ID
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            ServerSideEncryption='AES256',
+            Metadata={'original-filename': original_filename}
+        )
+        return response['UploadId']
+
+    def upload_part(self, s3_key, upload_id, part_number, body):
+        # upload one part (at least 5 MiB except the last), returns the part record
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def complete_multipart_upload(self, s3_key, upload_id, parts):
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+        _safe_log('info', f"Multipart upload completed: {s3_key}")
+
+    def abort_multipart_upload(self, s3_key, upload_id):
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id)
         except ClientError as e:
+            _safe_log('error', f"Failed to abort multipart upload: {str(e)}")
+
+    def _get_from_s3(self, s3_key):
+      # Get file from S3 (served from the local cache when we have a current copy)
+        try:
+            with self._open_s3_object(s3_key) as f:
+                return f.read()
+        except (ClientError, OSError) as e:
             _safe_log('error', f"Failed to download from S3: {str(e)}")
             return None
 
+    def _open_s3_object(self, s3_key):
+        """
+        Readable stream of an S3 object, from the cache when it holds a copy
+
+        The cached file can be evicted between lookup and open, by another thread or by
+        another worker sharing cache_dir (each process keeps its own byte budget); the
+        entry is then dropped and the object read from S3 directly.
+        """
+        cached_path = self._fetch_through_cache(s3_key)
+        if cached_path:
+            try:
+                return open(cached_path, 'rb')
+            except OSError as e:
+                _safe_log('warning', f"Cached copy of {s3_key} vanished, reading from S3: {str(e)}")
+                self.s3_cache.invalidate(s3_key)
+        return self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)['Body']
+
+    def _fetch_through_cache(self, s3_key):
+        """
+        Make sure the cache holds the current version of an S3 object
+
+        Returns:
+            str: local path of the cached copy, or None if caching is off / object too large
+        """
+        if not self.s3_cache:
+            return None
+
+        cached = self.s3_cache.lookup(s3_key)
+        if cached:
+            cached_path, etag, fresh = cached
+            if fresh and os.path.exists(cached_path):
+                self.s3_cache.record_hit(s3_key)
+                return cached_path
+            try:
+                # conditional GET, S3 answers 304 without a body if our copy is current
+                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key, IfNoneMatch=etag)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') in ('304', 'NotModified') and os.path.exists(cached_path):
+                    self.s3_cache.record_hit(s3_key, revalidated=True)
+                    return cached_path
+                raise
+        else:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+
+        return self.s3_cache.store(s3_key, response['ETag'], response['Body'], size=response.get('ContentLength'))
+
+    def cache_stats(self):
+        # hit/miss metrics of the S3 read-through cache (None when not caching)
+        return self.s3_cache.stats() if self.s3_cache else None
+
+    def _is_s3_key(self, file_path):
+        return self.use_s3 and file_path.startswith(('evidence/', ARTIFACT_PREFIX))
+
     def delete_file(self, file_path):
         # delete a file (for claim rejection cleanup)
-        if self.use_s3 and file_path.startswith('evidence/'):
+        if self._is_s3_key(file_path):
             return self._delete_from_s3(file_path)
         else:
             return self._delete_locally(file_path)
 
+    def delete_files(self, file_paths, batch_size=S3_DELETE_BATCH, workers=8):
+        """
+        Delete many files at once: S3 keys with batched DeleteObjects calls,
+        local files with parallel unlinks
+
+        Returns:
+            (deleted, failed) lists of paths
+        """
+        s3_keys = [p for p in file_paths if self._is_s3_key(p)]
+        local_paths = [p for p in file_paths if not self._is_s3_key(p)]
+        deleted, failed = [], []
+
+        batch_size = min(batch_size, S3_DELETE_BATCH)
+        for start in range(0, len(s3_keys), batch_size):
+            batch = s3_keys[start:start + batch_size]
+            batch_deleted, batch_failed = self._delete_batch_from_s3(batch)
+            deleted.extend(batch_deleted)
+            failed.extend(batch_failed)
+
+        if local_paths:
+            # unlink is I/O bound, threads overlap the filesystem round trips
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for path, ok in zip(local_paths, executor.map(self._delete_quietly, local_paths)):
+                    (deleted if ok else failed).append(path)
+
+        return deleted, failed
+
+    def _delete_quietly(self, file_path):
+        try:
+            return self._delete_locally(file_path)
+        except OSError as e:
+            _safe_log('error', f"Failed to delete local file {file_path}: {str(e)}")
+            return False
+
+    def _delete_batch_from_s3(self, s3_keys):
+        # one DeleteObjects request for up to 1000 keys
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in s3_keys], 'Quiet': True}
+            )
+        except ClientError as e:
+            _safe_log('error', f"Failed to batch delete from S3: {str(e)}")
+            return [], list(s3_keys)
+
+        failed = [error['Key'] for error in response.get('Errors', [])]
+        failed_set = set(failed)
+        deleted = [key for key in s3_keys if key not in failed_set]
+        if self.s3_cache:
+            for key in deleted:
+                self.s3_cache.invalidate(key)
+        _safe_log('info', f"Deleted {len(deleted)} objects from S3 ({len(failed)} failed)")
+        return deleted, failed
+
+    def list_evidence_files(self):
+        """
+        Iterate over every stored evidence file (S3 and local)
+
+        Yields:
+            (path, size_bytes, modified_at) with modified_at as naive UTC datetime
+        """
+        if self.use_s3:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix='evidence/'):
+                for obj in page.get('Contents', []):
+                    if EVIDENCE_FILE_PATTERN.match(obj['Key'].rsplit('/', 1)[-1]):
+                        modified_at = obj['LastModified'].replace(tzinfo=None)
+                        yield obj['Key'], obj['Size'], modified_at
+
+        # local files, including S3 upload fallbacks and the legacy flat layout
+        if not os.path.isdir(self.base_path):
+            return
+        for root, _, files in os.walk(self.base_path):
+            for name in files:
+                if not EVIDENCE_FILE_PATTERN.match(name):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                yield path, stat.st_size, datetime.utcfromtimestamp(stat.st_mtime)
+
+    def list_artifacts(self):
+        """
+        Iterate over every stored artifact (signed PDFs)
+
+        Yields:
+            (path, name, size_bytes, modified_at) with modified_at as naive UTC datetime
+        """
+        if self.use_s3:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=ARTIFACT_PREFIX):
+                for obj in page.get('Contents', []):
+                    name = obj['Key'].rsplit('/', 1)[-1]
+                    if ARTIFACT_FILE_PATTERN.match(name):
+                        yield obj['Key'], name, obj['Size'], obj['LastModified'].replace(tzinfo=None)
+            return
+
+        artifact_root = os.path.join(self.base_path, 'signed')
+        if not os.path.isdir(artifact_root):
+            return
+        for root, _, files in os.walk(artifact_root):
+            for name in files:
+                if not ARTIFACT_FILE_PATTERN.match(name):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                yield path, name, stat.st_size, datetime.utcfromtimestamp(stat.st_mtime)
+
     def _delete_locally(self, file_path):
         #delete file from local storage also
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+        local_path = self._resolve_local_path(file_path)
+        if local_path:
+            os.remove(local_path)
             return True
         return False
 
@@ -158,6 +701,8 @@ class StorageService:
         #delete file from S3 also same same
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            if self.s3_cache:
+                self.s3_cache.invalidate(s3_key)
             _safe_log('info', f"File deleted from S3: {s3_key}")
             return True
         except ClientError as e:
@@ -169,7 +714,7 @@ class StorageService:
         if self.use_s3 and file_path.startswith('evidence/'):
             return self._exists_in_s3(file_path)
         else:
-            return file_path and os.path.exists(file_path)
+            return bool(self._resolve_local_path(file_path))
 
     def _exists_in_s3(self, s3_key):
         # check if file exists in S3 also
@@ -0,0 +1,111 @@
+"""
+Verifier link stores
+Links map a random token to {'token_id', 'claim_id', 'expires_at', 'scopes'}. The database store
+shares links between all app processes; the memory store is a process-local stand-in
+for single-process setups and tests. Both purge expired links through an expiry index
+(DB index / min-heap), so cleanup only touches links that actually expired.
+"""
+import os
+import heapq
+import threading
+import time
+
+from app import db
+from app.models import VerifierLink
+from app.services.link_tokens import SCOPES
+
+
+class DatabaseLinkStore:
+    """Links in the verifier_links table"""
+
+    def put(self, token, data):
+        db.session.merge(VerifierLink(
+            token=token,
+            claim_id=data['claim_id'],
+            token_id=data.get('token_id'),
+            scopes=' '.join(data.get('scopes') or SCOPES),
+            expires_at=data['expires_at']
+        ))
+        db.session.commit()
+
+    def get(self, token):
+        link = db.session.get(VerifierLink, token)
+        if link is None:
+            return None
+        return {
+            'token_id': link.token_id,
+            'claim_id': link.claim_id,
+            'expires_at': link.expires_at,
+            'scopes': (link.scopes or ' '.join(SCOPES)).split(),
+        }
+
+    def delete(self, token):
+        VerifierLink.query.filter_by(token=token).delete()
+        db.session.commit()
+
+    def purge_expired(self, now=None):
+        """Delete expired links (index range scan on expires_at), returns how many"""
+        now = time.time() if now is None else now
+        deleted = VerifierLink.query.filter(VerifierLink.expires_at < now).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def clear(self):
+        VerifierLink.query.delete()
+        db.session.commit()
+
+
+class MemoryLinkStore:
+    """Process-local links: dict for lookups plus a min-heap of (expires_at, token)"""
+
+    def __init__(self):
+        self._links = {}
+        self._expiry_heap = []
+        self._lock = threading.Lock()
+
+    def put(self, token, data):
+        with self._lock:
+            self._links[token] = {'scopes': list(SCOPES), **data}
+            heapq.heappush(self._expiry_heap, (data['expires_at'], token))
+
+    def get(self, token):
+        with self._lock:
+            data = self._links.get(token)
+            return dict(data) if data else None
+
+    def delete(self, token):
+        # its heap entry stays behind and is skipped when it comes up
+        with self._lock:
+            self._links.pop(token, None)
+
+    def purge_expired(self, now=None):
+        """Pop expired heap entries, O(log n) each; returns how many links were removed"""
+        now = time.time() if now is None else now
+        deleted = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                expires_at, token = heapq.heappop(self._expiry_heap)
+                link = self._links.get(token)
+                # skip entries of deleted or re-issued tokens
+                if link and link['expires_at'] == expires_at:
+                    del self._links[token]
+                    deleted += 1
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._links.clear()
+            self._expiry_heap.clear()
+
+    def __len__(self):
+        return len(self._links)
+
+
+def create_link_store():
+    """Store selected by VERIFIER_LINK_STORE: 'database' (default) or 'memory'"""
+    kind = (os.getenv('VERIFIER_LINK_STORE') or 'database').lower()
+    if kind == 'memory':
+        return MemoryLinkStore()
+    if kind == 'database':
+        return DatabaseLinkStore()
+    raise ValueError(f"Unknown VERIFIER_LINK_STORE '{kind}', expected 'database' or 'memory'")
@@ -0,0 +1,161 @@
+"""
+Benchmark: claims table indexes
+Fills a SQLite database with synthetic claims (1M by default), times the queries the
+dashboard, student portal and verify routes run without secondary indexes, then builds
+the model indexes and shows each query's plan and time again. A plan line with
+'SCAN claims' and no index means a full table scan.
+
+Usage (from backend/):
+    python benchmarks/bench_claim_indexes.py
+    python benchmarks/bench_claim_indexes.py --rows 200000 --db /tmp/claims.db
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select, text  # noqa: E402
+from sqlalchemy.schema import CreateTable  # noqa: E402
+
+from app.models import Claim  # noqa: E402
+
+STATUSES = (('pending', 5), ('approved', 5), ('denied', 10), ('minted', 78), ('revoked', 2))
+WALLETS = 100_000
+BATCH = 20_000
+
+
+def _rows(count, seed=1):
+    rnd = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    statuses = [status for status, weight in STATUSES for _ in range(weight)]
+    token_id = 0
+    for i in range(count):
+        status = rnd.choice(statuses)
+        created_at = start + timedelta(seconds=i * 90)
+        row = {
+            'student_name': f'Student {i}',
+            'student_email': f'student{i}@student.dtu.dk',
+            'student_address': f'0x{rnd.randrange(WALLETS):040x}',
+            'credential_type': 'micro-credential',
+            'course_code': f'0{rnd.randrange(2000, 3000)}',
+            'evidence_file_hash': hashlib.sha256(str(i).encode()).hexdigest(),
+            'status': status,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'approved_at': None,
+            'minted_at': None,
+            'token_id': None,
+            'transaction_hash': None,
+        }
+        if status in ('approved', 'minted', 'revoked'):
+            row['approved_at'] = created_at + timedelta(hours=rnd.randrange(1, 72))
+        if status in ('minted', 'revoked'):
+            row['minted_at'] = row['approved_at'] + timedelta(minutes=5)
+            row['token_id'] = token_id
+            row['transaction_hash'] = '0x' + hashlib.sha256(f'tx{token_id}'.encode()).hexdigest()
+            token_id += 1
+        yield row
+
+
+def _fill(engine, count):
+    table = Claim.__table__
+    with engine.begin() as conn:
+        conn.execute(CreateTable(table))
+        batch = []
+        for row in _rows(count):
+            batch.append(row)
+            if len(batch) == BATCH:
+                conn.execute(insert(table), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(table), batch)
+
+
+def _queries(now):
+    # the statements the routes run (app/routes/instructor.py, claims.py, verify.py)
+    week_ago = now - timedelta(days=7)
+    return [
+        ('dashboard pending', select(Claim).where(Claim.status == 'pending').order_by(Claim.created_at.desc())),
+        ('dashboard approved', select(Claim).where(Claim.status == 'approved')
+            .order_by(Claim.approved_at.desc()).limit(5)),
+        ('dashboard minted', select(Claim).where(Claim.status.in_(['minted', 'revoked']))
+            .order_by(Claim.minted_at.desc()).limit(10)),
+        ('count total', select(func.count()).select_from(Claim)),
+        ('count pending', select(func.count()).select_from(Claim).where(Claim.status == 'pending')),
+        ('count approved week', select(func.count()).select_from(Claim)
+            .where(Claim.status == 'approved', Claim.approved_at >= week_ago)),
+        ('count minted', select(func.count()).select_from(Claim).where(Claim.status == 'minted')),
+        ('portal wallet', select(Claim).where(Claim.student_address == f'0x{42:040x}')
+            .order_by(Claim.created_at.desc())),
+        ('verify token', select(Claim).where(Claim.token_id == 4242, Claim.status == 'minted').limit(1)),
+        ('verify hash', select(Claim).where(Claim.evidence_file_hash == hashlib.sha256(b'4242').hexdigest(),
+                                            Claim.status == 'minted')),
+        ('verify tx', select(Claim).where(
+            Claim.transaction_hash == '0x' + hashlib.sha256(b'tx4242').hexdigest(), Claim.status == 'minted')),
+    ]
+
+
+def _time_ms(conn, statement, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        conn.execute(statement).fetchall()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def _plan(conn, statement):
+    sql = str(statement.compile(conn.engine, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+def run(rows=1_000_000, db_path=None, rounds=3):
+    tmp_dir = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, 'claims.db')
+    engine = create_engine(f'sqlite:///{db_path}')
+
+    start = time.perf_counter()
+    _fill(engine, rows)
+    print(f"inserted {rows} claims in {time.perf_counter() - start:.1f}s")
+
+    queries = _queries(datetime(2023, 1, 1) + timedelta(seconds=rows * 90))
+    with engine.connect() as conn:
+        before = {name: _time_ms(conn, statement, rounds) for name, statement in queries}
+
+    start = time.perf_counter()
+    for index in Claim.__table__.indexes:
+        index.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+    print(f"built {len(Claim.__table__.indexes)} indexes in {time.perf_counter() - start:.1f}s\n")
+
+    scans = 0
+    print(f"{'query':<22}{'no index ms':>12}{'indexed ms':>12}  plan")
+    with engine.connect() as conn:
+        for name, statement in queries:
+            after = _time_ms(conn, statement, rounds)
+            plan = _plan(conn, statement)
+            # a full scan is fine for COUNT(*) over a covering index, not for a plain table scan
+            full_scan = any(line.startswith('SCAN claims') and 'INDEX' not in line for line in plan)
+            scans += full_scan
+            print(f"{name:<22}{before[name]:>12.2f}{after:>12.2f}  {' | '.join(plan)}")
+
+    print(f"\n{scans} queries still scan the table" if scans else "\nevery query uses an index")
+    engine.dispose()
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', default=None, help='SQLite file to build (default: temporary)')
+    parser.add_argument('--rounds', type=int, default=3, help='executions per query for the timing')
+    args = parser.parse_args()
+    run(rows=args.rows, db_path=args.db, rounds=args.rounds)
@@ -0,0 +1,93 @@
+"""
+Benchmark: zstd compression of evidence files
+Reports storage saved vs. CPU time per compression level.
+
+Usage (from backend/):
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --path app/private_storage   # real evidence files
+"""
+import argparse
+import os
+import random
+import time
+
+import zstandard as zstd
+
+LEVELS = [1, 3, 9, 19]
+
+
+def _sample_text(size):
+    words = ("credential course assignment evidence student project grade report "
+             "software processes exam lecture module semester university").split()
+    rng = random.Random(42)
+    out = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out).encode()[:size]
+
+
+def _sample_pdf(size):
+    # uncompressed content streams, similar to many generated transcripts
+    body = []
+    rng = random.Random(7)
+    length = 0
+    while length < size:
+        line = f"BT /F1 12 Tf 72 {rng.randint(50, 750)} Td (Course 0{rng.randint(1000, 9999)} passed) Tj ET\n"
+        body.append(line)
+        length += len(line)
+    return b"%PDF-1.4\n" + "".join(body).encode()[:size] + b"\n%%EOF"
+
+
+def _samples(path):
+    if path:
+        for root, _, files in os.walk(path):
+            for name in files:
+                with open(os.path.join(root, name), "rb") as f:
+                    yield name, f.read()
+        return
+
+    size = 2 * 1024 * 1024
+    yield "synthetic.txt", _sample_text(size)
+    yield "synthetic.pdf", _sample_pdf(size)
+    yield "random.jpg", os.urandom(size)
+
+
+def run(path=None, repeat=3):
+    samples = list(_samples(path))
+    total_in = sum(len(content) for _, content in samples)
+    print(f"{len(samples)} files, {total_in / 1024 / 1024:.1f} MiB total\n")
+    print(f"{'level':>5} {'stored MiB':>11} {'saved':>7} {'compress MB/s':>14} {'decompress MB/s':>16}")
+
+    for level in LEVELS:
+        compressor = zstd.ZstdCompressor(level=level)
+        decompressor = zstd.ZstdDecompressor()
+        stored = 0
+        compress_time = 0.0
+        decompress_time = 0.0
+
+        for _, content in samples:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                compressed = compressor.compress(content)
+                compress_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                decompressor.decompress(compressed)
+                decompress_time += time.perf_counter() - start
+            # same rule as StorageService: keep the raw file when compression does not help
+            stored += min(len(compressed), len(content))
+
+        processed = total_in * repeat / 1e6
+        print(f"{level:>5} {stored / 1024 / 1024:>11.2f} {1 - stored / total_in:>7.1%} "
+              f"{processed / compress_time:>14.1f} {processed / decompress_time:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="directory with real evidence files to measure")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.path, args.repeat)
@@ -0,0 +1,120 @@
+"""
+Benchmark: list views with ORM entities vs. read-only projections
+Loads 100k claims (by default) the way the dashboard, portal and bulk verification
+lists did (full Claim entities) and the way they do now (slotted projection rows from
+app.services.read_models), and reports load time and peak Python memory for each.
+
+Usage (from backend/):
+    python benchmarks/bench_read_models.py
+    python benchmarks/bench_read_models.py --rows 20000 --repeat 5
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import db  # noqa: E402
+from app.models import Claim  # noqa: E402
+from app.services.read_models import PendingClaimRow, PortalClaimRow, PublicCredentialRow  # noqa: E402
+
+BATCH = 10_000
+
+
+def _make_app(db_path):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}', SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    return app
+
+
+def _fill(rows):
+    start = datetime(2024, 1, 1)
+    description = 'Completed all assignments and the final project. ' * 8
+    notes = 'Reviewed against the course learning objectives. ' * 4
+    batch = []
+    for i in range(rows):
+        created_at = start + timedelta(minutes=i)
+        batch.append({
+            'student_name': f'Student {i}', 'student_email': f's{i}@student.dtu.dk',
+            'student_address': f'0x{i:040x}', 'credential_type': 'micro-credential',
+            'course_code': f'0{2000 + i % 1000}', 'description': description, 'instructor_notes': notes,
+            'evidence_file_hash': f'{i:064x}', 'evidence_file_path': f'ab/cd/{i}.pdf',
+            'evidence_file_name': 'evidence.pdf', 'status': 'pending', 'token_id': i,
+            'transaction_hash': f'0x{i:064x}', 'metadata_uri': f'ipfs://Qm{i:044d}',
+            'created_at': created_at, 'updated_at': created_at, 'minted_at': created_at,
+        })
+        if len(batch) == BATCH:
+            db.session.execute(insert(Claim), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Claim), batch)
+    db.session.commit()
+
+
+def _measure(load, repeat):
+    # best time of repeat runs, peak traced memory of one run (tracing slows it down)
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        gc.collect()
+        start = time.perf_counter()
+        result = load()
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(result)
+    del result
+    db.session.expunge_all()
+    return best * 1000, peak / 1024 / 1024, count
+
+
+def run(rows=100_000, repeat=3):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = _make_app(os.path.join(tmp_dir, 'claims.db'))
+        with app.app_context():
+            db.create_all()
+            _fill(rows)
+
+            cases = [
+                ('dashboard pending', lambda: Claim.query.filter(Claim.status == 'pending').all(),
+                 lambda: PendingClaimRow.from_rows(PendingClaimRow.query().filter(Claim.status == 'pending'))),
+                ('student portal', lambda: Claim.query.all(),
+                 lambda: PortalClaimRow.from_rows(PortalClaimRow.query())),
+                ('bulk verification', lambda: Claim.query.filter(Claim.status == 'pending').all(),
+                 lambda: PublicCredentialRow.from_rows(
+                     PublicCredentialRow.query().filter(Claim.status == 'pending'))),
+            ]
+
+            print(f"{rows} claims\n")
+            print(f"{'list':<20}{'entities ms':>12}{'rows ms':>10}{'entities MiB':>14}{'rows MiB':>10}")
+            for name, entities, projection in cases:
+                entity_ms, entity_mib, count = _measure(entities, repeat)
+                row_ms, row_mib, row_count = _measure(projection, repeat)
+                assert count == row_count
+                print(f"{name:<20}{entity_ms:>12.0f}{row_ms:>10.0f}{entity_mib:>14.1f}{row_mib:>10.1f}")
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(rows=args.rows, repeat=args.repeat)
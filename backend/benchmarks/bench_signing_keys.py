@@ -0,0 +1,77 @@
+"""
+Benchmark: signing key types
+Compares key generation time, detached digest signatures per second (signature
+manifests), verifications per second and embedded PDF signatures per second for
+RSA-2048 and ECDSA P-256.
+
+Usage (from backend/):
+    python benchmarks/bench_signing_keys.py
+    python benchmarks/bench_signing_keys.py --seconds 2
+"""
+import argparse
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyPDF2 import PdfWriter  # noqa: E402
+
+from app.services.pdf_signer import KEY_TYPES, PDFSignerService, generate_private_key  # noqa: E402
+
+
+def _sample_pdf():
+    writer = PdfWriter()
+    writer.add_blank_page(width=595, height=842)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def _rate(func, seconds):
+    # calls per second, measured for roughly the given time
+    count = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+def _keygen_ms(key_type, rounds=5):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        generate_private_key(key_type)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(seconds=1.0):
+    digest = hashlib.sha256(b"evidence").digest()
+    pdf = _sample_pdf()
+
+    print(f"{'key type':<10}{'keygen ms':>11}{'sign/s':>10}{'verify/s':>10}{'pdf sign/s':>12}")
+    for key_type in KEY_TYPES:
+        with tempfile.TemporaryDirectory() as key_dir:
+            os.environ['PDF_SIGNING_KEY_TYPE'] = key_type
+            os.environ['PDF_SIGNING_KEY_PATH'] = os.path.join(key_dir, 'signing_key.pem')
+            os.environ['PDF_SIGNING_CERT_PATH'] = os.path.join(key_dir, 'signing_cert.pem')
+            signer = PDFSignerService()
+
+            signature = signer.sign_digest(digest)
+            sign_rate = _rate(lambda: signer.sign_digest(digest), seconds)
+            verify_rate = _rate(lambda: signer.verify_digest(digest, signature), seconds)
+            pdf_rate = _rate(lambda: signer.sign_pdf(pdf), seconds)
+
+        print(f"{key_type:<10}{_keygen_ms(key_type):>11.1f}{sign_rate:>10.0f}{verify_rate:>10.0f}{pdf_rate:>12.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=1.0, help='measuring time per operation')
+    args = parser.parse_args()
+    run(args.seconds)
@@ -0,0 +1,104 @@
+"""
+Benchmark: PDF signing in the request thread vs. the signing process pool
+Simulates concurrent evidence downloads (threads, like a threaded web worker) that all
+need a signature, and reports throughput plus how long other requests on the same
+worker stall (measured by a heartbeat thread that should wake up every 10 ms).
+
+Usage (from backend/):
+    python benchmarks/bench_signing_pool.py
+    python benchmarks/bench_signing_pool.py --pages 500 --downloads 32 --concurrency 8 --workers 4
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyPDF2 import PdfWriter  # noqa: E402
+from PyPDF2.generic import DecodedStreamObject, NameObject  # noqa: E402
+
+from app.services.pdf_signer import PDFSignerService  # noqa: E402
+from app.services.signing_pool import SigningPool  # noqa: E402
+
+
+def _sample_pdf(pages):
+    writer = PdfWriter()
+    for number in range(pages):
+        page = writer.add_blank_page(width=595, height=842)
+        lines = "".join(
+            f"BT /F1 10 Tf 40 {800 - line * 12} Td (Page {number} line {line} course evidence) Tj ET\n"
+            for line in range(60)
+        )
+        content = DecodedStreamObject()
+        content.set_data(lines.encode())
+        page[NameObject('/Contents')] = writer._add_object(content)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def _heartbeat(stop, lags):
+    while not stop.is_set():
+        start = time.perf_counter()
+        time.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+def _run(signer, pdf, downloads, concurrency):
+    stop = threading.Event()
+    lags = []
+    beat = threading.Thread(target=_heartbeat, args=(stop, lags))
+    beat.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: signer.sign_pdf(pdf, {'title': 'Benchmark'}), range(downloads)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    beat.join()
+    lags.sort()
+    return {
+        'elapsed': elapsed,
+        'throughput': downloads / elapsed,
+        'lag_p50_ms': lags[len(lags) // 2] * 1000 if lags else 0.0,
+        'lag_max_ms': lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+def run(pages=200, downloads=24, concurrency=8, workers=None):
+    workers = workers or os.cpu_count() or 2
+    with tempfile.TemporaryDirectory() as key_dir:
+        os.environ['PDF_SIGNING_KEY_PATH'] = os.path.join(key_dir, 'signing_key.pem')
+        os.environ['PDF_SIGNING_CERT_PATH'] = os.path.join(key_dir, 'signing_cert.pem')
+        signer = PDFSignerService()
+        pdf = _sample_pdf(pages)
+        print(f"PDF: {pages} pages, {len(pdf) / 1024 / 1024:.1f} MiB; "
+              f"{downloads} downloads, {concurrency} concurrent, {workers} pool workers\n")
+
+        pool = SigningPool(signer, workers, max_queue=downloads)
+        pool.sign_pdf(pdf)  # start the workers outside the measurement
+
+        results = [('request thread', _run(signer, pdf, downloads, concurrency)),
+                   ('process pool', _run(pool, pdf, downloads, concurrency))]
+        pool.shutdown()
+
+    print(f"{'mode':<16}{'time s':>9}{'signs/s':>10}{'stall p50 ms':>14}{'stall max ms':>14}")
+    for name, result in results:
+        print(f"{name:<16}{result['elapsed']:>9.2f}{result['throughput']:>10.1f}"
+              f"{result['lag_p50_ms']:>14.1f}{result['lag_max_ms']:>14.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200, help='pages of the synthetic PDF')
+    parser.add_argument('--downloads', type=int, default=24, help='signing jobs per mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent request threads')
+    parser.add_argument('--workers', type=int, default=None, help='pool processes (default: CPU count)')
+    args = parser.parse_args()
+    run(args.pages, args.downloads, args.concurrency, args.workers)
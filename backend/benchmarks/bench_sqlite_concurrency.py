@@ -0,0 +1,150 @@
+"""
+Benchmark: concurrent claim writes on SQLite
+Several processes (like gunicorn workers) submit claims at the same time while others
+keep reading the claims list. Compares a plain engine (rollback journal, driver defaults)
+with the engine setup of app/database.py (WAL, synchronous=NORMAL, busy_timeout, mmap).
+Reports commits per second, 'database is locked' failures, write latency and
+reads completed by the readers in the meantime.
+
+Usage (from backend/):
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --writers 8 --writes 200
+    python benchmarks/bench_sqlite_concurrency.py --batch 500 --writes 10   # import-sized transactions
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import db  # noqa: E402
+from app.database import engine_options, sqlite_pragmas  # noqa: E402
+from app.models import Claim, ClaimStatusCount  # noqa: E402
+
+def _engine(db_path, tuned):
+    url = f'sqlite:///{db_path}'
+    if not tuned:
+        # what the app used before: no options, pysqlite's 5 s lock timeout
+        return create_engine(url)
+
+    config = {'SQLALCHEMY_DATABASE_URI': url}
+    engine = create_engine(url, **engine_options(config))
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+def _writer(db_path, tuned, writes, batch, ready, go, results):
+    engine = _engine(db_path, tuned)
+    latencies, failures = [], 0
+    # timing starts once every process has imported the app
+    ready.release()
+    go.wait()
+    for i in range(writes):
+        start = time.perf_counter()
+        # a claim submission (batch > 1: an import chunk): inserts plus the status counter update of the flush hook
+        with Session(engine) as session:
+            session.add_all(
+                Claim(student_name=f'Student {os.getpid()}-{i}-{j}', student_email='s@student.dtu.dk',
+                      credential_type='micro-credential', course_code='02369', status='pending')
+                for j in range(batch)
+            )
+            try:
+                session.commit()
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                session.rollback()
+                failures += 1
+    engine.dispose()
+    results.put(('write', latencies, failures))
+
+
+def _reader(db_path, tuned, stop, results):
+    engine = _engine(db_path, tuned)
+    reads, failures = 0, 0
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(select(func.count()).select_from(Claim).where(Claim.status == 'pending')).scalar()
+                conn.execute(select(Claim.id, Claim.course_code).order_by(Claim.created_at.desc()).limit(25)).all()
+            reads += 1
+        except OperationalError:
+            failures += 1
+    engine.dispose()
+    results.put(('read', reads, failures))
+
+
+def _run_case(tuned, writers, readers, writes, batch):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'claims.db')
+        engine = _engine(db_path, tuned)
+        db.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(ClaimStatusCount(status='pending', count=0))
+            session.commit()
+        engine.dispose()
+
+        context = multiprocessing.get_context('spawn')
+        results, stop, go, ready = context.Queue(), context.Event(), context.Event(), context.Semaphore(0)
+        procs = [context.Process(target=_reader, args=(db_path, tuned, stop, results)) for _ in range(readers)]
+        write_procs = [context.Process(target=_writer, args=(db_path, tuned, writes, batch, ready, go, results))
+                       for _ in range(writers)]
+        for proc in procs + write_procs:
+            proc.start()
+        for _ in write_procs:
+            ready.acquire()
+
+        start = time.perf_counter()
+        go.set()
+        for proc in write_procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for proc in procs:
+            proc.join()
+
+        latencies, write_failures, reads, read_failures = [], 0, 0, 0
+        for _ in range(writers + readers):
+            kind, value, failures = results.get()
+            if kind == 'write':
+                latencies.extend(value)
+                write_failures += failures
+            else:
+                reads += value
+                read_failures += failures
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else float('nan')
+    return len(latencies) / elapsed, write_failures, p95, reads / elapsed, read_failures
+
+
+def run(writers=4, readers=2, writes=100, batch=1):
+    print(f"{writers} writer processes x {writes} transactions of {batch} claims, {readers} reader processes\n")
+    print(f"{'engine':<10}{'commits/s':>10}{'locked':>8}{'p95 ms':>9}{'reads/s':>10}{'read errors':>13}")
+    for name, tuned in (('plain', False), ('tuned', True)):
+        rate, failures, p95, read_rate, read_failures = _run_case(tuned, writers, readers, writes, batch)
+        print(f"{name:<10}{rate:>10.0f}{failures:>8}{p95:>9.1f}{read_rate:>10.0f}{read_failures:>13}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--writes', type=int, default=100, help='transactions per writer')
+    parser.add_argument('--batch', type=int, default=1, help='claims per transaction')
+    args = parser.parse_args()
+    run(writers=args.writers, readers=args.readers, writes=args.writes, batch=args.batch)
@@ -35,16 +35,21 @@ def app():
         'WTF_CSRF_ENABLED': False,
     })
 
-    # Initialize db
-    db.init_app(app)
+    # Initialize db (same engine setup as create_app)
+    from app.database import init_database
+    init_database(app)
 
     # IMPORTANT: Register all blueprints!, otherwise routes fail
-    from app.routes import home, auth, claims, instructor, verify
+    from app.routes import home, auth, claims, instructor, verify, registrar
     app.register_blueprint(home.bp)
     app.register_blueprint(auth.bp)
     app.register_blueprint(claims.bp)
     app.register_blueprint(instructor.bp)
     app.register_blueprint(verify.bp)
+    app.register_blueprint(registrar.bp)
+
+    from app.cli import register_commands
+    register_commands(app)
 
     # tables in the temp database
     with app.app_context():
@@ -56,9 +61,14 @@ def app():
     with app.app_context():
         db.session.remove()
         db.drop_all()
+        db.engine.dispose()
 
     os.close(db_fd)
     os.unlink(db_path)
+    # WAL mode side files (app/database.py)
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
 
 
 @pytest.fixture
@@ -38,6 +38,70 @@ def test_verify_credential_handles_contract_error(app):
     assert "error" in result
 
 
+def test_verify_credentials_batches_reads_with_multicall(app):
+    from eth_abi import encode
+
+    owner = "0x" + "ab" * 20
+    svc = BlockchainService()
+
+    class DummyCodec:
+        def decode(self, types, data):
+            from eth_abi import decode
+            return decode(types, data)
+
+    class DummyWeb3:
+        codec = DummyCodec()
+
+    class DummyContract:
+        address = "0x" + "c" * 40
+
+        def encodeABI(self, fn_name, args):
+            return (fn_name, args[0])
+
+    class DummyMulticall:
+        def __init__(self):
+            self.batches = []
+            outer = self
+
+            class Functions:
+                def aggregate3(self, calls):
+                    outer.batches.append(calls)
+
+                    class Call:
+                        def call(self_inner):
+                            results = []
+                            for _, _, (fn_name, token_id) in calls:
+                                if token_id == 2:
+                                    results.append((False, b""))
+                                elif fn_name == "ownerOf":
+                                    results.append((True, encode(["address"], [owner])))
+                                elif fn_name == "tokenURI":
+                                    results.append((True, encode(["string"], [f"ipfs://{token_id}"])))
+                                else:
+                                    results.append((True, encode(["bool"], [token_id == 3])))
+                            return results
+
+                    return Call()
+
+            self.functions = Functions()
+
+    svc.w3 = DummyWeb3()
+    svc.contract = DummyContract()
+    svc.multicall = DummyMulticall()
+
+    with app.app_context():
+        results = svc.verify_credentials([1, 2, 3])
+
+    assert len(svc.multicall.batches) == 1
+    assert len(svc.multicall.batches[0]) == 9
+    assert results[1]["exists"] is True
+    assert results[1]["token_uri"] == "ipfs://1"
+    assert results[1]["owner"].lower() == owner
+    assert results[1]["is_revoked"] is False
+    assert results[2]["exists"] is False
+    assert results[3]["is_revoked"] is True
+
+
 def test_get_balance_uses_web3():
     """
     get_balance uses Web3.to_checksum_address and w3.eth.get_balance + from_wei.
@@ -63,4 +127,96 @@ def test_get_balance_uses_web3():
     # valid 20-byte hex address so Web3.to_checksum_address accepts it
     addr = "0x" + "1" * 40
     bal = svc.get_balance(addr)
-    assert bal == 1
\ No newline at end of file
+    assert bal == 1
+
+
+def test_send_credentials_then_confirm_mints(app):
+    from hexbytes import HexBytes
+
+    contract_address = "0x" + "c" * 40
+    calls = []
+
+    class DummyEth:
+        class account:
+            @staticmethod
+            def sign_transaction(txn, key):
+                class Signed:
+                    rawTransaction = txn
+                return Signed()
+
+        def get_transaction_count(self, address, block):
+            assert block == "pending"
+            return 7
+
+        def get_block(self, block):
+            return {"baseFeePerGas": 10}
+
+        def send_raw_transaction(self, txn):
+            if txn["uri"] == "ipfs://bad":
+                raise ValueError("rejected by node")
+            calls.append(("send", txn["nonce"]))
+            return HexBytes(txn["nonce"].to_bytes(32, "big"))
+
+        def wait_for_transaction_receipt(self, tx_hash, timeout):
+            nonce = int(tx_hash, 16)
+            calls.append(("wait", nonce))
+            topics = [HexBytes(b""), HexBytes(b""), HexBytes(b""), HexBytes((nonce * 10).to_bytes(32, "big"))]
+            return {"status": 0 if nonce == 9 else 1, "logs": [{"address": contract_address, "topics": topics}]}
+
+        def get_transaction_receipt(self, tx_hash):
+            calls.append(("lookup", int(tx_hash, 16)))
+            raise ValueError("not found")
+
+    class DummyWeb3:
+        eth = DummyEth()
+
+        def to_wei(self, value, unit):
+            return value
+
+        def from_wei(self, value, unit):
+            return value
+
+    class DummyContract:
+        class functions:
+            @staticmethod
+            def mint(recipient, uri):
+                class Call:
+                    def estimate_gas(self, params):
+                        calls.append(("estimate", uri))
+                        return 100_000
+
+                    def build_transaction(self, params):
+                        return {**params, "uri": uri}
+
+                return Call()
+
+    class DummyAccount:
+        address = "0x" + "d" * 40
+        key = b"key"
+
+    svc = BlockchainService()
+    svc.w3 = DummyWeb3()
+    svc.contract = DummyContract()
+    svc.contract_address = contract_address
+    svc.deployer_account = DummyAccount()
+
+    wallet = "0x" + "1" * 40
+    with app.app_context():
+        sent = svc.send_credentials([(wallet, "ipfs://a"), (wallet, "ipfs://bad"),
+                                     (wallet, "ipfs://b"), (wallet, "ipfs://longer")])
+        tx_hashes = [tx_hash for tx_hash, _ in sent if tx_hash]
+        receipts = svc.confirm_mints(tx_hashes, timeout=30)
+
+    # one gas estimate, all transactions sent before the first receipt wait;
+    # the rejected one does not use up a nonce
+    assert calls == [("estimate", "ipfs://longer"), ("send", 7), ("send", 8), ("send", 9),
+                     ("wait", 7), ("wait", 8), ("wait", 9)]
+    assert sent[0] == ("0x" + "07".rjust(64, "0"), None)
+    assert sent[1] == (None, "rejected by node")
+    assert receipts == [(70, None), (80, None), (None, "Transaction failed")]
+
+    # once the time is up receipts are looked up, not waited for
+    calls.clear()
+    with app.app_context():
+        assert svc.confirm_mints(tx_hashes[:1], timeout=0) == [None]
+    assert calls == [("lookup", 7)]
@@ -0,0 +1,267 @@
+"""
+Tests for resumable (chunked) evidence uploads
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from app import db
+from app.models import Claim, EvidenceUpload
+from app.routes import claims as claims_module
+from app.services import chunked_upload
+from app.services.chunked_upload import ChunkedUploadService
+from app.services.storage import StorageService
+
+CONTENT = b"%PDF-1.4 resumable evidence " * 5000
+
+
+@pytest.fixture
+def tmp_storage(monkeypatch, tmp_path):
+    storage = StorageService(base_path=str(tmp_path))
+    monkeypatch.setattr(claims_module, "storage_service", storage)
+    return storage
+
+
+def _create(client, size=len(CONTENT), filename="transcript.pdf"):
+    return client.post("/student/uploads", json={"filename": filename, "size": size})
+
+
+def _patch(client, upload_id, offset, chunk):
+    return client.patch(
+        f"/student/uploads/{upload_id}",
+        data=chunk,
+        headers={"Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"},
+    )
+
+
+def test_chunked_upload_and_claim_submission(client, app, tmp_storage):
+    resp = _create(client)
+    assert resp.status_code == 201
+    upload_id = resp.get_json()["upload_id"]
+
+    half = len(CONTENT) // 2
+    assert _patch(client, upload_id, 0, CONTENT[:half]).headers["Upload-Offset"] == str(half)
+
+    # resume: ask the server where we are, then send the rest
+    head = client.head(f"/student/uploads/{upload_id}")
+    offset = int(head.headers["Upload-Offset"])
+    assert offset == half
+    assert _patch(client, upload_id, offset, CONTENT[offset:]).status_code == 204
+
+    resp = client.post(f"/student/uploads/{upload_id}/finalize")
+    assert resp.status_code == 200
+    assert resp.get_json()["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+
+    resp = client.post("/student/submit-claim", data={
+        "student_name": "Erin",
+        "student_email": "erin@student.dtu.dk",
+        "credential_type": "diploma",
+        "course_code": "02369",
+        "upload_id": upload_id,
+    }, follow_redirects=True)
+    assert b"Claim submitted successfully" in resp.data
+
+    with app.app_context():
+        claim = Claim.query.filter_by(student_email="erin@student.dtu.dk").first()
+        assert claim.evidence_file_name == "transcript.pdf"
+        assert claim.evidence_file_hash == hashlib.sha256(CONTENT).hexdigest()
+        assert tmp_storage.get_file(claim.evidence_file_path) == CONTENT
+        assert db.session.get(EvidenceUpload, upload_id).status == "attached"
+
+
+def test_concurrent_submits_attach_upload_once(client, app, tmp_storage, monkeypatch):
+    upload_id = _create(client).get_json()["upload_id"]
+    _patch(client, upload_id, 0, CONTENT)
+    client.post(f"/student/uploads/{upload_id}/finalize")
+
+    # another submit attaches the upload right after this request has read it
+    real_get = db.session.get
+
+    def racing_get(model, ident, **kwargs):
+        upload = real_get(model, ident, **kwargs)
+        if model is EvidenceUpload:
+            table = EvidenceUpload.__table__
+            with db.engine.begin() as conn:
+                conn.execute(table.update().where(table.c.id == ident).values(status="attached"))
+        return upload
+
+    monkeypatch.setattr(db.session, "get", racing_get)
+    resp = client.post("/student/submit-claim", data={
+        "student_name": "Erin",
+        "student_email": "erin@student.dtu.dk",
+        "credential_type": "diploma",
+        "course_code": "02369",
+        "upload_id": upload_id,
+    }, follow_redirects=True)
+    assert b"already attached" in resp.data
+
+    with app.app_context():
+        assert Claim.query.filter_by(student_email="erin@student.dtu.dk").count() == 0
+
+def test_offset_mismatch_is_rejected(client, tmp_storage):
+    upload_id = _create(client).get_json()["upload_id"]
+    _patch(client, upload_id, 0, CONTENT[:100])
+
+    resp = _patch(client, upload_id, 50, CONTENT[50:200])
+    assert resp.status_code == 409
+    assert resp.headers["Upload-Offset"] == "100"
+
+
+def test_upload_limits(client, app, tmp_storage):
+    app.config["MAX_EVIDENCE_UPLOAD_SIZE"] = 1000
+    assert _create(client, size=1001).status_code == 413
+    assert _create(client, filename="malware.exe", size=10).status_code == 400
+
+    upload_id = _create(client, size=10).get_json()["upload_id"]
+    assert _patch(client, upload_id, 0, b"x" * 11).status_code == 413
+    assert client.post(f"/student/uploads/{upload_id}/finalize").status_code == 409
+
+
+def test_hash_recomputed_when_running_hash_is_lost(client, tmp_storage):
+    upload_id = _create(client).get_json()["upload_id"]
+    _patch(client, upload_id, 0, CONTENT)
+
+    # e.g. the chunks were handled by another worker process
+    chunked_upload._hashers.clear()
+    resp = client.post(f"/student/uploads/{upload_id}/finalize")
+    assert resp.get_json()["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+
+
+class FakeMultipartS3:
+    def __init__(self):
+        self.parts = {}
+        self.completed = None
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "mp-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[PartNumber] = Body
+        return {"ETag": f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = MultipartUpload["Parts"]
+
+
+def test_s3_chunks_are_streamed_as_multipart_parts(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(chunked_upload, "S3_PART_SIZE", 1000)
+    storage = StorageService(base_path=str(tmp_path))
+    storage.use_s3 = True
+    storage.s3_client = FakeMultipartS3()
+    storage.bucket_name = "bucket"
+    content = os.urandom(2500)
+
+    with app.app_context():
+        service = ChunkedUploadService(storage)
+        upload = service.create("scan.png", len(content))
+        for start in range(0, len(content), 700):
+            upload = service.append(upload, start, io.BytesIO(content[start:start + 700]))
+        upload = service.finalize(upload)
+
+        assert upload.storage_key == f"evidence/upload_{upload.id}.png"
+        assert upload.file_hash == hashlib.sha256(content).hexdigest()
+        assert [len(storage.s3_client.parts[n]) for n in (1, 2, 3)] == [1000, 1000, 500]
+        assert b"".join(storage.s3_client.parts[n] for n in (1, 2, 3)) == content
+        assert [p["PartNumber"] for p in storage.s3_client.completed] == [1, 2, 3]
+        assert json.loads(upload.s3_parts)[0]["Size"] == 1000
+
+
+class FlakyMultipartS3(FakeMultipartS3):
+    """upload_part fails once, like a throttled or unreachable S3"""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    def upload_part(self, **kwargs):
+        if self.failures:
+            from botocore.exceptions import ClientError
+            self.failures -= 1
+            raise ClientError({"Error": {"Code": "SlowDown", "Message": "Reduce your request rate"}}, "UploadPart")
+        return super().upload_part(**kwargs)
+
+    def get_object(self, Bucket, Key, **kwargs):
+        # the running hash is dropped with a failed chunk, finalize reads the object back
+        return {"Body": io.BytesIO(b"".join(self.parts[n] for n in sorted(self.parts)))}
+
+
+def test_s3_part_failure_returns_503_with_offset(client, tmp_storage, monkeypatch):
+    monkeypatch.setattr(chunked_upload, "S3_PART_SIZE", 1000)
+    tmp_storage.use_s3 = True
+    tmp_storage.s3_client = FlakyMultipartS3()
+    tmp_storage.bucket_name = "bucket"
+    content = os.urandom(1500)
+    upload_id = _create(client, size=len(content), filename="scan.png").get_json()["upload_id"]
+
+    resp = _patch(client, upload_id, 0, content)
+    assert resp.status_code == 503
+    assert resp.headers["Upload-Offset"] == "0"
+
+    # the client resumes from the offset it was given
+    assert _patch(client, upload_id, 0, content).headers["Upload-Offset"] == "1500"
+    resp = client.post(f"/student/uploads/{upload_id}/finalize")
+    assert resp.get_json()["file_hash"] == hashlib.sha256(content).hexdigest()
+    assert tmp_storage.s3_client.parts[1] + tmp_storage.s3_client.parts[2] == content
+
+
+class BlockingStream:
+    """Request body that delivers its first chunk, then stalls until released"""
+
+    def __init__(self, data):
+        self.data = data
+        self.sent = False
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def read(self, size):
+        if not self.sent:
+            self.sent = True
+            return self.data
+        self.started.set()
+        self.release.wait(5)
+        return b""
+
+
+def test_overlapping_appends_at_same_offset(app, tmp_path):
+    storage = StorageService(base_path=str(tmp_path))
+    with app.app_context():
+        upload_id = ChunkedUploadService(storage).create("transcript.pdf", len(CONTENT)).id
+
+    first = BlockingStream(CONTENT[:1000])
+    errors = []
+
+    def slow_patch():
+        with app.app_context():
+            service = ChunkedUploadService(storage)
+            try:
+                service.append(db.session.get(EvidenceUpload, upload_id), 0, first)
+            except Exception as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=slow_patch)
+    thread.start()
+    assert first.started.wait(5)
+
+    # client retry of the same chunk while the first PATCH is still streaming
+    with app.app_context():
+        service = ChunkedUploadService(storage)
+        with pytest.raises(chunked_upload.UploadError) as exc:
+            service.append(db.session.get(EvidenceUpload, upload_id), 0, io.BytesIO(CONTENT[:1000]))
+        assert exc.value.status_code == 409
+
+    first.release.set()
+    thread.join(5)
+    assert errors == []
+
+    with app.app_context():
+        service = ChunkedUploadService(storage)
+        upload = db.session.get(EvidenceUpload, upload_id)
+        assert upload.offset == 1000
+        upload = service.append(upload, 1000, io.BytesIO(CONTENT[1000:]))
+        upload = service.finalize(upload)
+        assert storage.get_file(upload.storage_key) == CONTENT
+        assert upload.file_hash == hashlib.sha256(CONTENT).hexdigest()
@@ -0,0 +1,81 @@
+"""
+Tests for the maintained claim status counters
+"""
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Claim, ClaimStatusCount
+from app.services.claim_stats import dashboard_stats, rebuild_status_counts, status_counts
+
+
+def _claim(status=None, **fields):
+    claim = Claim(student_name='Test', student_email='test@dtu.dk',
+                  credential_type='micro-credential', course_code='02369', **fields)
+    if status:
+        claim.status = status
+    return claim
+
+
+def _stored_counts():
+    return {row.status: row.count for row in ClaimStatusCount.query.all()}
+
+
+def test_counters_follow_inserts_transitions_and_deletes(app):
+    with app.app_context():
+        assert status_counts()['pending'] == 0  # initialised on first read
+
+        claims = [_claim(), _claim(), _claim('approved', approved_at=datetime.utcnow())]
+        db.session.add_all(claims)
+        db.session.commit()
+        assert _stored_counts()['pending'] == 2
+        assert _stored_counts()['approved'] == 1
+
+        # status set on an object expired by the commit
+        claims[2].status = 'minted'
+        claims[0].status = 'denied'
+        db.session.commit()
+        db.session.delete(claims[1])
+        db.session.commit()
+
+        counts = _stored_counts()
+        assert (counts['pending'], counts['approved'], counts['denied'], counts['minted']) == (0, 0, 1, 1)
+        assert counts == rebuild_status_counts()
+
+
+def test_rolled_back_changes_are_not_counted(app):
+    with app.app_context():
+        rebuild_status_counts()
+        db.session.add(_claim())
+        db.session.flush()
+        assert _stored_counts()['pending'] == 1
+        db.session.rollback()
+        assert _stored_counts()['pending'] == 0
+
+
+def test_dashboard_stats(app):
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.add_all([
+            _claim(),
+            _claim('approved', approved_at=now - timedelta(days=1)),
+            _claim('approved', approved_at=now - timedelta(days=30)),
+            _claim('minted'),
+        ])
+        db.session.commit()
+
+        assert dashboard_stats(now) == {'total_claims': 4, 'pending': 1, 'approved_week': 1, 'total_minted': 1}
+
+
+def test_rebuild_counters_command(app, runner):
+    with app.app_context():
+        db.session.add(_claim())
+        db.session.commit()
+        # e.g. an import written with plain SQL
+        ClaimStatusCount.query.delete()
+        db.session.add(ClaimStatusCount(status='pending', count=42))
+        db.session.commit()
+
+    result = runner.invoke(args=['database', 'rebuild-counters'])
+    assert result.exit_code == 0
+    with app.app_context():
+        assert _stored_counts()['pending'] == 1
@@ -0,0 +1,27 @@
+"""
+Tests for the engine configuration
+"""
+from sqlalchemy import text
+
+from app import db
+from app.database import engine_options
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout(app):
+    with app.app_context():
+        pragma = lambda name: db.session.execute(text(f'PRAGMA {name}')).scalar()
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('busy_timeout') == 5000
+
+
+def test_postgres_pool_options():
+    options = engine_options({'SQLALCHEMY_DATABASE_URI': 'postgresql://user:pw@db/campuscred', 'DB_POOL_SIZE': 4})
+    assert options['pool_size'] == 4
+    assert options['pool_pre_ping'] is True
+    assert 'connect_args' not in options
+
+
+def test_sqlite_lock_timeout_follows_config():
+    options = engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///x.db', 'SQLITE_BUSY_TIMEOUT_MS': 2500})
+    assert options['connect_args'] == {'timeout': 2.5}
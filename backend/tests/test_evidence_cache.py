@@ -0,0 +1,117 @@
+"""
+Tests for the S3 read-through disk cache
+"""
+import io
+import os
+
+from botocore.exceptions import ClientError
+
+from app.services.evidence_cache import EvidenceCache
+from app.services.storage import StorageService
+
+
+class FakeS3:
+    """In-memory S3 client that honours IfNoneMatch like the real one"""
+
+    def __init__(self, objects):
+        self.objects = objects  # key -> (etag, bytes)
+        self.get_calls = 0
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        self.get_calls += 1
+        etag, content = self.objects[Key]
+        if IfNoneMatch == etag:
+            raise ClientError({"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject")
+        return {"ETag": etag, "Body": io.BytesIO(content), "ContentLength": len(content)}
+
+
+def _s3_storage(tmp_path, fake, max_bytes=1024, revalidate_after=3600):
+    s = StorageService(base_path=str(tmp_path / "local"))
+    s.use_s3 = True
+    s.s3_client = fake
+    s.bucket_name = "bucket"
+    s.s3_cache = EvidenceCache(str(tmp_path / "cache"), max_bytes, revalidate_after=revalidate_after)
+    return s
+
+
+def test_repeated_reads_are_served_from_disk(tmp_path):
+    fake = FakeS3({"evidence/a.pdf": ('"etag1"', b"A" * 100)})
+    s = _s3_storage(tmp_path, fake)
+
+    assert s.get_file("evidence/a.pdf") == b"A" * 100
+    assert s.get_file("evidence/a.pdf") == b"A" * 100
+    assert s.hash_file("evidence/a.pdf") is not None
+
+    assert fake.get_calls == 1
+    stats = s.cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path):
+    fake = FakeS3({"evidence/a.pdf": ('"etag1"', b"old")})
+    s = _s3_storage(tmp_path, fake, revalidate_after=0)
+
+    assert s.get_file("evidence/a.pdf") == b"old"
+    # unchanged object: 304, still served from cache
+    assert s.get_file("evidence/a.pdf") == b"old"
+    assert s.cache_stats()["hits"] == 1
+
+    # object replaced in S3: new ETag means a fresh download
+    fake.objects["evidence/a.pdf"] = ('"etag2"', b"new")
+    assert s.get_file("evidence/a.pdf") == b"new"
+    assert s.cache_stats()["entries"] == 1
+
+
+def test_lru_eviction_keeps_cache_within_budget(tmp_path):
+    fake = FakeS3({
+        "evidence/a.pdf": ('"a"', b"a" * 400),
+        "evidence/b.pdf": ('"b"', b"b" * 400),
+        "evidence/c.pdf": ('"c"', b"c" * 400),
+    })
+    s = _s3_storage(tmp_path, fake, max_bytes=1000)
+
+    s.get_file("evidence/a.pdf")
+    s.get_file("evidence/b.pdf")
+    s.get_file("evidence/a.pdf")  # a is now most recently used
+    s.get_file("evidence/c.pdf")  # evicts b
+
+    stats = s.cache_stats()
+    assert stats["evictions"] == 1
+    assert stats["size_bytes"] <= 1000
+    assert s.s3_cache.lookup("evidence/b.pdf") is None
+    assert s.s3_cache.lookup("evidence/a.pdf") is not None
+
+
+def test_cache_index_survives_restart(tmp_path):
+    fake = FakeS3({"evidence/a.pdf": ('"etag1"', b"A" * 10)})
+    s = _s3_storage(tmp_path, fake)
+    s.get_file("evidence/a.pdf")
+
+    reopened = EvidenceCache(str(tmp_path / "cache"), 1024)
+    path, etag, _ = reopened.lookup("evidence/a.pdf")
+    assert etag == '"etag1"'
+    with open(path, "rb") as f:
+        assert f.read() == b"A" * 10
+
+
+def test_cached_copy_evicted_before_open_falls_back_to_s3(tmp_path, monkeypatch):
+    fake = FakeS3({"evidence/a.pdf": ('"etag1"', b"A" * 100), "signed/a.pdf": ('"etag2"', b"S" * 50)})
+    s = _s3_storage(tmp_path, fake)
+    fetch = s._fetch_through_cache
+
+    def fetch_then_evict(s3_key):
+        # another worker sharing cache_dir evicts the file right after the lookup
+        cached_path = fetch(s3_key)
+        os.remove(cached_path)
+        return cached_path
+
+    monkeypatch.setattr(s, "_fetch_through_cache", fetch_then_evict)
+
+    with s.open_evidence("evidence/a.pdf") as stream:
+        assert stream.read() == b"A" * 100
+    assert s.get_file("evidence/a.pdf") == b"A" * 100
+    with s.open_artifact("a.pdf") as stream:
+        assert stream.read() == b"S" * 50
+    # the vanished entries were dropped from the index
+    assert s.s3_cache.lookup("evidence/a.pdf") is None
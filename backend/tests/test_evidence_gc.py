@@ -0,0 +1,139 @@
+"""
+Tests for evidence garbage collection
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Claim
+from app.services.evidence_gc import collect_garbage
+from app.services.signed_evidence import artifact_name
+from app.services.storage import StorageService
+
+
+class _Upload:
+    def __init__(self, filename, content=b"evidence"):
+        self.filename = filename
+        self.content = content
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+
+def _age(path, days):
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+def _claim(status, path, updated_days_ago=0):
+    claim = Claim(student_name="S", student_email="s@dtu.dk", credential_type="micro",
+                  course_code="02369", status=status, evidence_file_path=path)
+    db.session.add(claim)
+    db.session.commit()
+    claim.updated_at = datetime.utcnow() - timedelta(days=updated_days_ago)
+    db.session.commit()
+    return claim.id
+
+
+def _setup(app, tmp_path):
+    storage = StorageService(base_path=str(tmp_path))
+    paths = {}
+    for claim_no, name in enumerate(["old_denied", "new_denied", "approved", "orphan", "young_orphan"], start=1):
+        paths[name], _ = storage.save_evidence_file(_Upload(f"{name}.pdf"), claim_no)
+    for name in ("old_denied", "new_denied", "approved", "orphan"):
+        _age(paths[name], 90)
+
+    with app.app_context():
+        ids = {
+            "old_denied": _claim("denied", paths["old_denied"], updated_days_ago=60),
+            "new_denied": _claim("denied", paths["new_denied"], updated_days_ago=1),
+            "approved": _claim("approved", paths["approved"], updated_days_ago=60),
+        }
+    return storage, paths, ids
+
+
+def test_gc_deletes_old_denied_and_orphaned_evidence(app, tmp_path):
+    storage, paths, ids = _setup(app, tmp_path)
+
+    with app.app_context():
+        report = collect_garbage(storage, retention_days=30, orphan_grace_hours=24)
+
+        assert report["denied_claims"] == 1
+        assert report["orphaned_files"] == 1
+        assert report["deleted"] == 2
+        assert report["failed"] == []
+
+        assert db.session.get(Claim, ids["old_denied"]).evidence_file_path is None
+        assert db.session.get(Claim, ids["new_denied"]).evidence_file_path == paths["new_denied"]
+
+    assert not os.path.exists(paths["old_denied"])
+    assert not os.path.exists(paths["orphan"])
+    for kept in ("new_denied", "approved", "young_orphan"):
+        assert os.path.exists(paths[kept])
+
+
+def test_gc_dry_run_reports_without_deleting(app, runner, tmp_path):
+    _, paths, _ = _setup(app, tmp_path)
+
+    result = runner.invoke(args=["storage", "gc", "--base-path", str(tmp_path), "--dry-run"])
+    assert result.exit_code == 0
+    assert f"would delete {paths['old_denied']}" in result.output
+    assert f"would delete {paths['orphan']}" in result.output
+    assert "Dry run" in result.output
+    assert all(os.path.exists(p) for p in paths.values())
+
+
+class FakeS3:
+    def __init__(self):
+        self.delete_calls = []
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_calls.append(len(Delete["Objects"]))
+        return {"Deleted": Delete["Objects"]}
+
+
+def test_s3_deletes_are_batched_by_1000(tmp_path):
+    storage = StorageService(base_path=str(tmp_path))
+    storage.use_s3 = True
+    storage.s3_client = FakeS3()
+    storage.bucket_name = "bucket"
+
+    keys = [f"evidence/claim_{i}_20240101_000000.pdf" for i in range(2500)]
+    deleted, failed = storage.delete_files(keys)
+
+    assert len(deleted) == 2500
+    assert failed == []
+    assert storage.s3_client.delete_calls == [1000, 1000, 500]
+
+
+def test_gc_deletes_stale_signed_pdfs(app, tmp_path):
+    storage, paths, ids = _setup(app, tmp_path)
+
+    with app.app_context():
+        for name in ("old_denied", "approved"):
+            claim = db.session.get(Claim, ids[name])
+            claim.evidence_file_name = f"{name}.pdf"
+            claim.evidence_file_hash = f"{ids[name]:064x}"
+            claim.updated_at = datetime.utcnow() - timedelta(days=60)  # keep the age of the decision
+        db.session.commit()
+
+        approved = db.session.get(Claim, ids["approved"])
+        artifacts = {
+            "current": storage.save_artifact(artifact_name(approved, "new-key"), b"%PDF signed"),
+            "rotated_key": storage.save_artifact(artifact_name(approved, "old-key"), b"%PDF signed"),
+            "denied": storage.save_artifact(
+                artifact_name(db.session.get(Claim, ids["old_denied"]), "new-key"), b"%PDF signed"),
+            "young_leftover": storage.save_artifact("f" * 64 + ".pdf", b"%PDF signed"),
+        }
+        for name in ("current", "rotated_key", "denied"):
+            _age(artifacts[name], 90)
+
+        report = collect_garbage(storage, retention_days=30, orphan_grace_hours=24, key_fingerprint="new-key")
+
+    assert report["stale_artifacts"] == 2
+    assert not os.path.exists(artifacts["rotated_key"])
+    assert not os.path.exists(artifacts["denied"])
+    assert os.path.exists(artifacts["current"])
+    assert os.path.exists(artifacts["young_leftover"])
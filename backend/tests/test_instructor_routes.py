@@ -122,4 +122,205 @@ class TestInstructorDashboard:
             claim = Claim.query.get(sample_claim)
             assert claim is not None
             assert claim.status == "denied"
-            assert claim.instructor_notes == "No reason provided"
\ No newline at end of file
+            assert claim.instructor_notes == "No reason provided"
+
+class DummyIPFS:
+    def upload_json(self, data, pin_name=None):
+        if "Fail" in data["attributes"][3]["value"]:
+            raise Exception("pinning refused")
+        return f"ipfs://{pin_name}"
+
+
+class DummyChain:
+    def __init__(self, mined=True):
+        self.batches = []
+        self.mined = mined
+        self.recorded_before_receipts = None
+
+    def send_credentials(self, mints):
+        self.batches.append(mints)
+        return [(f"0x{i:064x}", None) for i in range(len(mints))]
+
+    def confirm_mints(self, tx_hashes, timeout):
+        # the sent transactions are committed before any receipt is awaited
+        self.recorded_before_receipts = sorted(
+            claim.transaction_hash for claim in Claim.query.filter_by(status="minting")
+        )
+        if not self.mined:
+            return [None] * len(tx_hashes)
+        return [(100 + int(tx_hash, 16), None) for tx_hash in tx_hashes]
+
+
+def _add_claims(app, *claims):
+    with app.app_context():
+        objects = [Claim(student_name=name, student_email=f"{name.lower()}@student.dtu.dk",
+                         credential_type="micro-credential", course_code=course, student_address=wallet,
+                         status=status)
+                   for name, course, wallet, status in claims]
+        db.session.add_all(objects)
+        db.session.commit()
+        return [claim.id for claim in objects]
+
+
+class TestBulkApprove:
+    """Bulk approval with batched pinning and minting"""
+
+    @pytest.fixture
+    def chain(self, monkeypatch):
+        from app.services import blockchain, ipfs
+        chain = DummyChain()
+        monkeypatch.setattr(blockchain, "BlockchainService", lambda: chain)
+        monkeypatch.setattr(ipfs, "IPFSService", DummyIPFS)
+        return chain
+
+    def test_bulk_approve_by_ids_reports_per_claim(self, instructor_client, app, chain):
+        wallet = "0x" + "1" * 40
+        ids = _add_claims(app, ("Ann", "02369", wallet, "pending"), ("Ben", "02369", None, "pending"),
+                          ("Fail", "02369", wallet, "pending"), ("Cid", "02369", wallet, "denied"))
+
+        response = instructor_client.post("/instructor/bulk-approve", json={"claim_ids": ids + [9999]})
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert (data["approved"], data["minted"]) == (3, 1)
+        results = {result["id"]: result for result in data["results"]}
+        assert [result["id"] for result in data["results"]] == ids + [9999]
+        assert results[ids[0]]["status"] == "minted" and results[ids[0]]["token_id"] == 100
+        assert results[ids[1]] == {"id": ids[1], "status": "approved"}
+        assert results[ids[2]]["status"] == "approved" and "IPFS" in results[ids[2]]["error"]
+        assert "already denied" in results[ids[3]]["error"]
+        assert results[9999]["error"] == "Claim not found"
+        # only the pinned claim reached the chain, in one batch
+        assert chain.batches == [[(wallet, f"ipfs://Claim-{ids[0]}")]]
+        assert chain.recorded_before_receipts == [f"0x{0:064x}"]
+
+        with app.app_context():
+            minted = db.session.get(Claim, ids[0])
+            assert minted.status == "minted"
+            assert minted.metadata_uri == f"ipfs://Claim-{ids[0]}"
+            assert db.session.get(Claim, ids[1]).approved_at is not None
+            assert db.session.get(Claim, ids[3]).status == "denied"
+
+    def test_bulk_approve_by_course_code(self, instructor_client, app, chain, monkeypatch):
+        from app.routes import instructor as instructor_module
+        monkeypatch.setattr(instructor_module, "MAX_BULK_APPROVE", 2)
+        ids = _add_claims(app, ("Ann", "02369", None, "pending"), ("Ben", "02369", None, "pending"),
+                          ("Cid", "02369", None, "pending"), ("Dan", "02102", None, "pending"))
+
+        response = instructor_client.post("/instructor/bulk-approve", json={"course_code": "02369"})
+
+        data = response.get_json()
+        assert [result["id"] for result in data["results"]] == ids[:2]
+        assert data["remaining"] == 1
+        assert chain.batches == []
+        with app.app_context():
+            assert db.session.get(Claim, ids[3]).status == "pending"
+
+    def test_bulk_approve_mint_failure_keeps_claims_approved(self, instructor_client, app, monkeypatch):
+        from app.services import blockchain, ipfs
+
+        class BrokenChain:
+            def send_credentials(self, mints):
+                raise ValueError("Deployer private key not configured")
+
+        monkeypatch.setattr(blockchain, "BlockchainService", BrokenChain)
+        monkeypatch.setattr(ipfs, "IPFSService", DummyIPFS)
+        ids = _add_claims(app, ("Ann", "02369", "0x" + "1" * 40, "pending"))
+
+        data = instructor_client.post("/instructor/bulk-approve", json={"claim_ids": ids}).get_json()
+
+        assert data["results"][0]["status"] == "approved"
+        assert "Deployer" in data["results"][0]["error"]
+        with app.app_context():
+            assert db.session.get(Claim, ids[0]).status == "approved"
+
+    def test_bulk_approve_validates_input(self, instructor_client, client):
+        assert instructor_client.post("/instructor/bulk-approve", json={}).status_code == 400
+        assert instructor_client.post("/instructor/bulk-approve", json={"claim_ids": []}).status_code == 400
+        assert instructor_client.post("/instructor/bulk-approve", json={"claim_ids": ["1"]}).status_code == 400
+        assert instructor_client.post(
+            "/instructor/bulk-approve", json={"claim_ids": list(range(501))}
+        ).status_code == 400
+
+    def test_bulk_approve_leaves_unconfirmed_claims_minting(self, instructor_client, app, runner, monkeypatch):
+        from app.services import blockchain, ipfs
+        from app.services.claim_stats import status_counts
+        chain = DummyChain(mined=False)
+        monkeypatch.setattr(blockchain, "BlockchainService", lambda: chain)
+        monkeypatch.setattr(ipfs, "IPFSService", DummyIPFS)
+        ids = _add_claims(app, ("Ann", "02369", "0x" + "1" * 40, "pending"))
+        with app.app_context():
+            status_counts()
+
+        data = instructor_client.post("/instructor/bulk-approve", json={"claim_ids": ids}).get_json()
+
+        assert (data["minted"], data["minting"]) == (0, 1)
+        assert data["results"][0]["tx_hash"] == f"0x{0:064x}"
+        with app.app_context():
+            claim = db.session.get(Claim, ids[0])
+            assert (claim.status, claim.transaction_hash) == ("minting", f"0x{0:064x}")
+            assert status_counts()["minting"] == 1
+
+        # receipts arrive later and are recorded by the CLI
+        chain.mined = True
+        result = runner.invoke(args=["registrar", "confirm-mints"])
+        assert "1 minted, 0 failed, 0 still pending." in result.output
+        with app.app_context():
+            claim = db.session.get(Claim, ids[0])
+            assert (claim.status, claim.token_id) == ("minted", 100)
+            assert (status_counts()["minting"], status_counts()["minted"]) == (0, 1)
+
+    def test_bulk_approve_skips_claims_approved_concurrently(self, instructor_client, app, chain):
+        from sqlalchemy import event, update
+        from app.services.claim_stats import rebuild_status_counts, status_counts
+        wallet = "0x" + "1" * 40
+        ids = _add_claims(app, ("Ann", "02369", wallet, "pending"), ("Ben", "02369", wallet, "pending"))
+
+        def approve_elsewhere(state):
+            # another request approves Ben after this one loaded both claims as pending
+            if state.is_select and not raced:
+                raced.append(True)
+                result = state.invoke_statement().freeze()
+                with db.engine.begin() as conn:
+                    conn.execute(update(Claim).where(Claim.id == ids[1]).values(status="approved"))
+                return result()
+
+        raced = []
+        with app.app_context():
+            status_counts()
+            event.listen(db.session, "do_orm_execute", approve_elsewhere)
+            try:
+                data = instructor_client.post("/instructor/bulk-approve", json={"claim_ids": ids}).get_json()
+            finally:
+                event.remove(db.session, "do_orm_execute", approve_elsewhere)
+
+        assert raced
+        assert data["approved"] == 1
+        assert "already approved" in data["results"][1]["error"]
+        assert chain.batches == [[(wallet, f"ipfs://Claim-{ids[0]}")]]
+        with app.app_context():
+            counts = status_counts()
+            # the other request's write bypassed the counters, this one's did not
+            assert (counts["pending"], counts["minted"]) == (1, 1)
+            assert rebuild_status_counts()["pending"] == 0
+
+    def test_unrecorded_transactions_are_reported(self, app, caplog, monkeypatch):
+        from app.services.issuance import issue_credentials
+        ids = _add_claims(app, ("Ann", "02369", "0x" + "1" * 40, "approved"))
+
+        def failing_commit():
+            raise RuntimeError("database is locked")
+
+        with app.app_context():
+            claims = Claim.query.filter(Claim.id.in_(ids)).all()
+            for claim in claims:
+                claim.approved_at = claim.created_at
+            db.session.commit()
+            with monkeypatch.context() as patch:
+                patch.setattr(db.session, "commit", failing_commit)
+                results = issue_credentials(claims, DummyIPFS(), DummyChain())
+
+        # not waited for, but the hash is in the response and the log
+        assert results[ids[0]]["tx_hash"] == f"0x{0:064x}"
+        assert "not recorded" in results[ids[0]]["error"]
+        assert f"claim {ids[0]}: 0x{0:064x}" in caplog.text
@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.link_tokens import LinkTokenError, LinkTokenSigner, is_stateless
+
+
+def test_issue_and_validate_roundtrip():
+    signer = LinkTokenSigner("secret")
+    token = signer.issue(claim_id=5, token_id=42, expires_at=1000, scopes=["view"])
+
+    assert is_stateless(token)
+    data = signer.validate(token, "view", now=999)
+    assert data == {"claim_id": 5, "token_id": 42, "expires_at": 1000, "scopes": ["view"]}
+
+
+@pytest.mark.parametrize("now,scope,reason", [
+    (1001, "view", "expired"),
+    (10, "download", "scope"),
+])
+def test_validate_rejects_expired_and_wrong_scope(now, scope, reason):
+    signer = LinkTokenSigner("secret")
+    token = signer.issue(5, 42, 1000, ["view"])
+    with pytest.raises(LinkTokenError) as excinfo:
+        signer.validate(token, scope, now=now)
+    assert excinfo.value.reason == reason
+
+
+def test_validate_rejects_tampered_and_foreign_tokens():
+    signer = LinkTokenSigner("secret")
+    version, key_id, payload, mac = signer.issue(5, 42, 1000).split(".")
+
+    other_payload = LinkTokenSigner("secret").issue(6, 42, 1000).split(".")[2]
+    for token in [
+        f"{version}.{key_id}.{other_payload}.{mac}",
+        f"{version}.{key_id}.{payload}.{mac[:-2]}AA",
+        LinkTokenSigner("other-secret").issue(5, 42, 1000),
+        "v1.only.three",
+        "v1.x.y.z",
+    ]:
+        with pytest.raises(LinkTokenError):
+            signer.validate(token, "view", now=0)
+
+
+def test_rotated_secret_still_validates_old_tokens():
+    old_token = LinkTokenSigner("old-secret").issue(5, 42, 1000)
+    rotated = LinkTokenSigner("new-secret", fallbacks=["old-secret"])
+
+    assert rotated.validate(old_token, "download", now=0)["claim_id"] == 5
+    # new tokens are signed with the new secret only
+    with pytest.raises(LinkTokenError):
+        LinkTokenSigner("old-secret").validate(rotated.issue(5, 42, 1000), "view", now=0)
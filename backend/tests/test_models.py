@@ -4,6 +4,7 @@ Tests for database models
 import pytest
 from app import db
 from app.models import Claim
+from sqlalchemy import text
 from datetime import datetime
 
 
@@ -99,4 +100,69 @@ class TestClaimModel:
             db.session.commit()
 
             assert claim.status == 'approved'
-            assert claim.approved_at is not None
\ No newline at end of file
+            assert claim.approved_at is not None
+
+    def test_verification_lookups_are_indexed(self, app):
+        """token_id, evidence hash and tx hash lookups use an index"""
+        with app.app_context():
+            plans = {
+                column: db.session.execute(
+                    text(f"EXPLAIN QUERY PLAN SELECT * FROM claims WHERE {column} = :value"),
+                    {'value': 'x'}
+                ).fetchall()
+                for column in ('token_id', 'evidence_file_hash', 'transaction_hash')
+            }
+
+            for column, plan in plans.items():
+                assert any(f'ix_claims_{column}' in row[-1] for row in plan), plan
+
+    def test_ensure_indexes_creates_missing(self, app, runner):
+        """flask database ensure-indexes adds indexes to an older database"""
+        with app.app_context():
+            db.session.execute(text('DROP INDEX ix_claims_transaction_hash'))
+            db.session.commit()
+
+        result = runner.invoke(args=['database', 'ensure-indexes'])
+        assert result.exit_code == 0
+        assert 'Created ix_claims_transaction_hash' in result.output
+
+        result = runner.invoke(args=['database', 'ensure-indexes'])
+        assert 'All indexes exist.' in result.output
+
+    def test_ensure_indexes_reports_duplicate_token_ids(self, app, runner):
+        """token_id only becomes unique once duplicates are resolved"""
+        with app.app_context():
+            # database from before token_id was unique
+            db.session.execute(text('DROP INDEX ix_claims_token_id'))
+            db.session.execute(text('CREATE INDEX ix_claims_token_id ON claims (token_id)'))
+            for _ in range(2):
+                db.session.add(Claim(student_name='Test', student_email='test@dtu.dk',
+                                     credential_type='micro-credential', course_code='02369', token_id=7))
+            db.session.commit()
+
+        result = runner.invoke(args=['database', 'ensure-indexes'])
+        assert result.exit_code == 1
+        assert 'Cannot build unique index ix_claims_token_id' in result.output
+        assert '7: rows 1, 2' in result.output
+
+        with app.app_context():
+            db.session.get(Claim, 2).token_id = 8
+            db.session.commit()
+
+        result = runner.invoke(args=['database', 'ensure-indexes'])
+        assert result.exit_code == 0
+        assert 'Rebuilt ix_claims_token_id' in result.output
+
+    def test_dashboard_and_portal_queries_use_indexes(self, app):
+        """the composite indexes serve the filtered + ordered lists"""
+        with app.app_context():
+            queries = {
+                'ix_claims_status_created_at': Claim.query.filter_by(status='pending').order_by(Claim.created_at.desc()),
+                'ix_claims_status_approved_at': Claim.query.filter_by(status='approved').order_by(Claim.approved_at.desc()),
+                'ix_claims_student_address_created_at': Claim.query.filter_by(student_address='0xabc').order_by(Claim.created_at.desc()),
+            }
+            for index_name, query in queries.items():
+                sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+                plan = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+                assert any(index_name in row[-1] for row in plan), plan
+                assert not any('TEMP B-TREE' in row[-1] for row in plan), plan
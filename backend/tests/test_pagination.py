@@ -0,0 +1,121 @@
+"""
+Tests for keyset pagination of claim lists
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Claim
+from app.routes.auth import INSTRUCTOR_WALLET
+from app.services.pagination import decode_cursor, encode_cursor, keyset_page, page_size
+
+
+def _add_claims(count, status='pending', same_time=False):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        created_at = start if same_time else start + timedelta(minutes=i)
+        db.session.add(Claim(student_name=f'Student {i}', student_email=f's{i}@dtu.dk',
+                             credential_type='micro-credential', course_code=f'C{i:03d}',
+                             status=status, created_at=created_at))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('same_time', [False, True])
+def test_pages_cover_every_claim_once_newest_first(app, same_time):
+    with app.app_context():
+        _add_claims(23, same_time=same_time)
+
+        seen, cursor = [], None
+        while True:
+            claims, cursor = keyset_page(Claim.query, cursor=cursor, limit=10)
+            seen.extend(claims)
+            if cursor is None:
+                break
+
+        assert [len(seen), len({c.id for c in seen})] == [23, 23]
+        keys = [(c.created_at, c.id) for c in seen]
+        assert keys == sorted(keys, reverse=True)
+
+
+def test_cursor_round_trip_and_invalid_cursor(app):
+    with app.app_context():
+        _add_claims(1)
+        claim = Claim.query.first()
+        assert decode_cursor(encode_cursor(claim)) == (claim.created_at, claim.id)
+
+        with pytest.raises(ValueError):
+            keyset_page(Claim.query, cursor='not-a-cursor')
+
+
+def test_page_size_is_clamped():
+    assert page_size(None) == 25
+    assert page_size('abc') == 25
+    assert page_size('0') == 1
+    assert page_size('5000') == 100
+
+
+def test_portal_load_more_endpoint(app, client):
+    with app.app_context():
+        _add_claims(30)
+
+    page = client.get('/student/portal')
+    # 'Credential Claim' is the title of cards without a description in the "All" list
+    assert page.data.count(b'- Credential Claim') == 25
+    assert b'loadMoreClaims' in page.data
+
+    first = client.get('/student/claims?limit=20').get_json()
+    assert len(first['claims']) == 20
+    assert first['html'].count('- Credential Claim') == 20
+
+    second = client.get(f"/student/claims?limit=20&cursor={first['next_cursor']}").get_json()
+    assert len(second['claims']) == 10
+    assert second['next_cursor'] is None
+    assert {c['id'] for c in first['claims']}.isdisjoint(c['id'] for c in second['claims'])
+
+    assert client.get('/student/claims?cursor=bogus').status_code == 400
+
+
+def test_portal_status_tabs_paginate_on_the_server(app, client):
+    with app.app_context():
+        _add_claims(30, status='minted')
+        for i, claim in enumerate(Claim.query.all()):
+            claim.token_id = 1000 + i
+        _add_claims(30)
+        db.session.commit()
+
+    page = client.get('/student/portal').data
+    # "All" shows the newest 25 (all pending); the minted tab still has its own first page
+    assert page.count(b'copyVerificationLink(') == 25 + 1  # cards plus the script function
+    assert b'id="loadMoreClaims-minted"' in page
+    assert b'id="loadMoreClaims-pending"' in page
+    assert b'id="loadMoreClaims-denied"' not in page
+
+    first = client.get('/student/claims?status=minted').get_json()
+    assert {c['status'] for c in first['claims']} == {'minted'}
+    second = client.get(f"/student/claims?status=minted&cursor={first['next_cursor']}").get_json()
+    assert len(second['claims']) == 5
+    assert second['html'].count('copyVerificationLink(') == 5
+    assert second['next_cursor'] is None
+
+    assert client.get('/student/claims?status=bogus').status_code == 400
+
+
+def test_dashboard_pending_load_more_endpoint(app, client):
+    with app.app_context():
+        _add_claims(27)
+        _add_claims(3, status='approved')
+
+    with client.session_transaction() as sess:
+        sess['wallet_address'] = INSTRUCTOR_WALLET.lower()
+        sess['is_instructor'] = True
+
+    page = client.get('/instructor/dashboard')
+    assert page.data.count(b'<tr data-claim-id=') == 25
+    assert b'loadMorePending' in page.data
+
+    first = client.get('/instructor/pending-claims?limit=25').get_json()
+    rest = client.get(f"/instructor/pending-claims?cursor={first['next_cursor']}").get_json()
+    assert len(rest['claims']) == 2
+    assert rest['html'].count('<tr data-claim-id=') == 2
+    assert all(c['status'] == 'pending' for c in first['claims'] + rest['claims'])
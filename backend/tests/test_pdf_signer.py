@@ -54,4 +54,193 @@ def test_get_certificate_info_has_expected_fields(monkeypatch, tmp_path):
     assert "issuer" in info
     assert "serial_number" in info
     assert "not_before" in info
-    assert "not_after" in info
\ No newline at end of file
+    assert "not_after" in info
+
+def test_signed_evidence_cache_stores_signed_pdf(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+
+    from app.services.signed_evidence import SignedEvidenceCache
+    from app.services.storage import StorageService
+
+    monkeypatch.setenv("PDF_SIGNING_KEY_PATH", str(tmp_path / "signing_key.pem"))
+    monkeypatch.setenv("PDF_SIGNING_CERT_PATH", str(tmp_path / "signing_cert.pem"))
+    storage = StorageService(base_path=str(tmp_path / "storage"))
+    evidence_path = tmp_path / "evidence.pdf"
+    evidence_path.write_bytes(_make_dummy_pdf())
+
+    claim = SimpleNamespace(
+        id=1, course_code="02369", student_name="Alice", token_id=5,
+        evidence_file_path=str(evidence_path), evidence_file_name="evidence.pdf",
+        evidence_file_hash="b" * 64,
+    )
+    cache = SignedEvidenceCache(storage, PDFSignerService())
+
+    assert cache.open_signed(claim) is None
+    assert cache.ensure_signed(claim) is True
+
+    stream = cache.open_signed(claim)
+    reader = PdfReader(io.BytesIO(stream.read()))
+    assert reader.metadata.get("/Title") == "02369 - Alice"
+
+
+def _signer(monkeypatch, tmp_path):
+    monkeypatch.setenv("PDF_SIGNING_KEY_PATH", str(tmp_path / "signing_key.pem"))
+    monkeypatch.setenv("PDF_SIGNING_CERT_PATH", str(tmp_path / "signing_cert.pem"))
+    return PDFSignerService()
+
+
+def test_sign_pdf_appends_incremental_update(monkeypatch, tmp_path):
+    svc = _signer(monkeypatch, tmp_path)
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    writer.write(buf)
+    original = buf.getvalue()
+
+    signed = svc.sign_pdf(original, metadata={"title": "T", "claim_id": 7, "evidence_hash": "a" * 64})
+
+    # original bytes are kept as they are, the update only adds a constant amount
+    assert signed.startswith(original)
+    reader = PdfReader(io.BytesIO(signed))
+    assert len(reader.pages) == 3
+    assert reader.metadata.get("/CampusCredClaimId") == "7"
+    assert reader.trailer["/Root"]["/AcroForm"]["/SigFlags"] == 3
+
+    result = svc.verify_pdf(signed)
+    assert result["valid"] is True
+    assert result["covers_whole_document"] is True
+    assert result["key_fingerprint"] == svc.key_fingerprint
+
+
+def test_verify_pdf_detects_tampering(monkeypatch, tmp_path):
+    svc = _signer(monkeypatch, tmp_path)
+    original = _make_dummy_pdf()
+    signed = svc.sign_pdf(original)
+
+    tampered = bytearray(signed)
+    tampered[10] ^= 0x01
+    assert svc.verify_pdf(bytes(tampered))["valid"] is False
+
+    appended = svc.verify_pdf(signed + b"% later change\n")
+    assert appended["covers_whole_document"] is False
+
+    assert svc.verify_pdf(original)["error"] == "PDF is not signed"
+
+    other = _signer(monkeypatch, tmp_path / "other")
+    assert other.verify_pdf(signed)["error"] == "Signed with an unknown key"
+
+
+def test_signing_pool_signs_in_worker_and_limits_queue(monkeypatch, tmp_path):
+    import pytest
+
+    from app.services.signing_pool import SigningPool, SigningQueueFull
+
+    svc = _signer(monkeypatch, tmp_path)
+    pool = SigningPool(svc, workers=1, max_queue=1)
+    try:
+        signed = pool.sign_pdf(_make_dummy_pdf(), {"title": "Pooled"})
+        # the worker loaded the same key as this process
+        assert svc.verify_pdf(signed)["valid"] is True
+        assert pool.key_fingerprint == svc.key_fingerprint
+
+        # with every slot taken new jobs are refused instead of queued
+        pool._slots.acquire()
+        with pytest.raises(SigningQueueFull):
+            pool.sign_pdf(_make_dummy_pdf())
+        pool._slots.release()
+    finally:
+        pool.shutdown()
+
+
+def test_ec_keys(monkeypatch, tmp_path):
+    import hashlib
+
+    digest = hashlib.sha256(b"evidence").digest()
+
+    monkeypatch.setenv("PDF_SIGNING_KEY_TYPE", "ec-p256")
+    ec_signer = _signer(monkeypatch, tmp_path / "ec")
+    assert ec_signer.signature_algorithm == "ECDSA-P256-SHA256"
+    assert ec_signer.verify_digest(digest, ec_signer.sign_digest(digest))
+    assert ec_signer.verify_pdf(ec_signer.sign_pdf(_make_dummy_pdf()))["valid"] is True
+
+
+def test_ed25519_is_rejected_as_signing_key(monkeypatch, tmp_path):
+    import hashlib
+
+    import pytest
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+
+    # CMS cannot carry Ed25519, PDF evidence would be served unsigned
+    monkeypatch.setenv("PDF_SIGNING_KEY_TYPE", "ed25519")
+    with pytest.raises(ValueError, match="ed25519"):
+        _signer(monkeypatch, tmp_path / "configured")
+    monkeypatch.delenv("PDF_SIGNING_KEY_TYPE")
+
+    svc = _signer(monkeypatch, tmp_path / "rotated")
+    with pytest.raises(ValueError, match="ed25519"):
+        svc.rotate_key("ed25519")
+    assert svc.key_type == "rsa"
+
+    # an Ed25519 key already on disk is retired and replaced, its certificate still verifies
+    from datetime import datetime, timedelta
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from app.services.pdf_signer import public_key_fingerprint
+
+    key = ed25519.Ed25519PrivateKey.generate()
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Old signer")])
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(
+        key.public_key()).serial_number(1).not_valid_before(datetime.utcnow()).not_valid_after(
+        datetime.utcnow() + timedelta(days=1)).sign(key, None)
+    with open(svc.key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    with open(svc.cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    old_fingerprint = public_key_fingerprint(key.public_key())
+    digest = hashlib.sha256(b"evidence").digest()
+    old_signature = key.sign(digest)
+
+    reloaded = PDFSignerService()
+    assert reloaded.key_type == "rsa"
+    assert reloaded.key_fingerprint != old_fingerprint
+    assert reloaded.verify_pdf(reloaded.sign_pdf(_make_dummy_pdf()))["valid"] is True
+    assert reloaded.verify_digest(digest, old_signature, key_fingerprint=old_fingerprint)
+
+
+def test_rotate_key_keeps_old_certificate_for_verification(monkeypatch, tmp_path):
+    import hashlib
+
+    svc = _signer(monkeypatch, tmp_path)
+    old_fingerprint = svc.key_fingerprint
+    signed = svc.sign_pdf(_make_dummy_pdf())
+    digest = hashlib.sha256(b"evidence").digest()
+    old_signature = svc.sign_digest(digest)
+
+    assert svc.rotate_key("ec-p256") == old_fingerprint
+    assert svc.key_type == "ec-p256"
+    assert svc.key_fingerprint != old_fingerprint
+
+    # a fresh process loads the new key and the retired certificate
+    reloaded = PDFSignerService()
+    assert reloaded.key_fingerprint == svc.key_fingerprint
+    assert set(reloaded.verification_certificates) == {old_fingerprint, svc.key_fingerprint}
+    assert reloaded.verify_pdf(signed)["valid"] is True
+    assert reloaded.verify_digest(digest, old_signature, key_fingerprint=old_fingerprint)
+    assert not reloaded.verify_digest(digest, old_signature)
+
+
+def test_rotate_key_command(app, runner, monkeypatch, tmp_path):
+    svc = _signer(monkeypatch, tmp_path)
+
+    result = runner.invoke(args=["signing", "rotate-key", "--key-type", "ec-p256"])
+    assert result.exit_code == 0, result.output
+    assert f"Retired key {svc.key_fingerprint}" in result.output
+
+    listing = runner.invoke(args=["signing", "list-keys"])
+    assert svc.key_fingerprint in listing.output
+    assert "ec-p256" in listing.output
+
+    assert runner.invoke(args=["signing", "rotate-key", "--key-type", "ed25519"]).exit_code != 0
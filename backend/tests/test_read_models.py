@@ -0,0 +1,29 @@
+"""
+Tests for the read-only claim projections
+"""
+import pytest
+
+from app import db
+from app.models import Claim
+from app.services.read_models import PendingClaimRow, PortalClaimRow
+
+
+def test_projection_rows_are_slotted_and_read_only(app):
+    with app.app_context():
+        db.session.add(Claim(student_name='Alice', student_email='alice@dtu.dk', credential_type='micro-credential',
+                             course_code='02369', description='x' * 200, instructor_notes='notes'))
+        db.session.commit()
+        db.session.expunge_all()
+
+        (row,) = PendingClaimRow.from_rows(PendingClaimRow.query().filter(Claim.status == 'pending'))
+        assert (row.student_name, row.course_code, row.status) == ('Alice', '02369', 'pending')
+        assert row.description == 'x' * 50
+        assert not hasattr(row, '__dict__')
+        with pytest.raises(AttributeError):
+            row.status = 'approved'
+        # nothing was loaded into the session
+        assert len(db.session.identity_map) == 0
+
+        (portal_row,) = PortalClaimRow.from_rows(PortalClaimRow.query())
+        assert portal_row.instructor_notes == 'notes'
+        assert not hasattr(portal_row, 'student_email')
@@ -0,0 +1,181 @@
+"""
+Tests for the registrar roster import (endpoint, CLI and service)
+"""
+import io
+import json
+
+import pytest
+
+from app import db
+from app.models import Claim, ClaimStatusCount
+from app.routes.auth import INSTRUCTOR_WALLET
+from app.services.claim_stats import status_counts
+from app.services.roster_import import RosterError, import_roster
+
+WALLET = '0x' + 'Ab' * 20
+
+CSV_ROSTER = (
+    "student_name,student_email,wallet_address,course_code,credential_type,description\n"
+    f"Alice,alice@student.dtu.dk,{WALLET},02369,micro-credential,Software engineering\n"
+    "Bob,bob-at-dtu,,02369,micro-credential,\n"
+    "Carol,carol@student.dtu.dk,,02102,course-completion,\n"
+    "Dan,dan@student.dtu.dk,0x123,02102,diploma,\n"
+    ",eve@student.dtu.dk,,02102,diploma,\n"
+    "Frank,frank@student.dtu.dk,,02102,certificate,\n"
+)
+
+
+@pytest.fixture
+def registrar_client(client):
+    with client.session_transaction() as sess:
+        sess["wallet_address"] = INSTRUCTOR_WALLET.lower()
+    return client
+
+
+def test_import_csv_upload_reports_rejected_rows(registrar_client, app):
+    with app.app_context():
+        status_counts()  # initialise the counters
+
+    response = registrar_client.post(
+        "/registrar/import",
+        data={"roster": (io.BytesIO(CSV_ROSTER.encode()), "roster.csv")},
+        content_type="multipart/form-data",
+    )
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert (data["rows"], data["imported"], data["failed"]) == (6, 2, 4)
+    assert data["errors"] == [
+        {"line": 3, "error": "invalid email address"},
+        {"line": 5, "error": "invalid wallet_address"},
+        {"line": 6, "error": "missing student_name"},
+        {"line": 7, "error": "unknown credential_type 'certificate'"},
+    ]
+
+    with app.app_context():
+        alice = Claim.query.filter_by(student_name="Alice").one()
+        assert alice.status == "pending"
+        assert alice.student_address == WALLET.lower()
+        assert alice.description == "Software engineering"
+        assert Claim.query.count() == 2
+        # bulk inserts bypass the flush hook, the import moves the counter itself
+        assert db.session.get(ClaimStatusCount, "pending").count == 2
+
+
+def test_import_jsonl_body_in_chunks(registrar_client, app):
+    lines = [json.dumps({"student_name": f"Student {i}", "student_email": f"s{i}@student.dtu.dk",
+                         "course_code": "02369", "credential_type": "micro-credential"})
+             for i in range(7)]
+    lines.insert(3, "{not json")
+    body = "\n".join(lines) + "\n"
+
+    response = registrar_client.post("/registrar/import", data=body, content_type="application/x-ndjson")
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data["imported"] == 7
+    assert data["errors"] == [{"line": 4, "error": "invalid JSON"}]
+
+
+def test_import_requires_instructor(client):
+    response = client.post("/registrar/import", data=CSV_ROSTER, content_type="text/csv")
+    assert response.status_code == 401
+
+
+def test_import_rejects_missing_file_and_unknown_format(registrar_client):
+    assert registrar_client.post("/registrar/import").status_code == 400
+
+    response = registrar_client.post("/registrar/import?format=xlsx", data=CSV_ROSTER, content_type="text/csv")
+    assert response.status_code == 400
+
+
+def test_import_service_commits_per_chunk(app):
+    roster = "student_name,student_email,course_code,credential_type\n" + "".join(
+        f"S{i},s{i}@student.dtu.dk,02369,diploma\n" for i in range(25)
+    )
+    with app.app_context():
+        status_counts()
+        report = import_roster(io.BytesIO(roster.encode()), "csv", chunk_size=10)
+
+        assert report == {"rows": 25, "imported": 25, "skipped": 0, "failed": 0, "errors": [],
+                          "committed_line": 26}
+        assert Claim.query.count() == 25
+        assert status_counts()["pending"] == 25
+
+
+def test_reimport_skips_existing_claims(registrar_client, app):
+    def post():
+        return registrar_client.post("/registrar/import", data=CSV_ROSTER + CSV_ROSTER.splitlines(True)[1],
+                                     content_type="text/csv").get_json()
+
+    with app.app_context():
+        status_counts()
+
+    first = post()
+    # Alice's row appears twice in the file
+    assert (first["imported"], first["skipped"]) == (2, 1)
+
+    second = post()
+    assert (second["imported"], second["skipped"]) == (0, 3)
+    with app.app_context():
+        assert Claim.query.count() == 2
+        assert status_counts()["pending"] == 2
+
+
+def test_reimport_matches_email_case_insensitively(registrar_client, app):
+    header = CSV_ROSTER.splitlines(True)[0]
+    registrar_client.post("/registrar/import", content_type="text/csv",
+                          data=header + "Alice,Alice@Student.dtu.dk,,02369,micro-credential,\n")
+    report = registrar_client.post("/registrar/import", content_type="text/csv",
+                                   data=header + "Alice, alice@student.DTU.dk ,,02369,micro-credential,\n").get_json()
+
+    assert (report["imported"], report["skipped"]) == (0, 1)
+    with app.app_context():
+        assert [claim.student_email for claim in Claim.query.all()] == ["alice@student.dtu.dk"]
+
+def test_import_error_reports_committed_progress(registrar_client, app):
+    roster = "student_name,student_email,course_code,credential_type\n" + "".join(
+        f"S{i},s{i}@student.dtu.dk,02369,diploma\n" for i in range(2000)
+    )
+    # the text layer decodes in blocks, the error surfaces once the bad block is reached
+    body = roster.encode() + "J\xf8rgen,j@student.dtu.dk,02369,diploma\n".encode("latin-1")
+
+    with app.app_context():
+        with pytest.raises(RosterError) as excinfo:
+            import_roster(io.BytesIO(body), "csv", chunk_size=500)
+        report = excinfo.value.report
+        assert report["imported"] > 0
+        assert report["committed_line"] == report["imported"] + 1  # header line
+        imported = report["imported"]
+
+    response = registrar_client.post("/registrar/import", data=body, content_type="text/csv")
+    data = response.get_json()
+    assert response.status_code == 400
+    assert "UTF-8" in data["error"]
+    # with the default chunk size the error comes before the first commit
+    assert (data["imported"], data["committed_line"]) == (0, 0)
+    with app.app_context():
+        assert Claim.query.count() == imported
+
+
+def test_import_service_rejects_non_utf8(app):
+    with app.app_context():
+        with pytest.raises(ValueError, match="UTF-8"):
+            import_roster(io.BytesIO("student_name\nJ\xf8rgen\n".encode("latin-1")), "csv")
+
+
+def test_import_cli(runner, app, tmp_path):
+    roster = tmp_path / "roster.jsonl"
+    roster.write_text(
+        json.dumps({"student_name": "Grace", "student_email": "grace@student.dtu.dk",
+                    "course_code": "02369", "credential_type": "diploma"}) + "\n"
+        + json.dumps({"student_name": "Heidi"}) + "\n"
+    )
+
+    result = runner.invoke(args=["registrar", "import", str(roster)])
+
+    assert result.exit_code == 1
+    assert "line 2: missing student_email, course_code, credential_type" in result.output
+    assert "Read 2 rows: 1 imported, 0 already existed, 1 rejected." in result.output
+    with app.app_context():
+        assert Claim.query.filter_by(student_name="Grace").count() == 1
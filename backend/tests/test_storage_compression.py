@@ -0,0 +1,59 @@
+"""
+Tests for transparent zstd compression of stored evidence
+"""
+import hashlib
+import io
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app.services.storage import StorageService
+
+zstd = pytest.importorskip("zstandard")
+
+TEXT = b"Completed all assignments for 02369 Software Processes.\n" * 2000
+
+
+@pytest.fixture
+def compressing_storage(monkeypatch, tmp_path):
+    monkeypatch.setenv("EVIDENCE_COMPRESSION", "zstd")
+    return StorageService(base_path=str(tmp_path))
+
+
+def _upload(name, content):
+    return FileStorage(stream=io.BytesIO(content), filename=name)
+
+
+def test_text_evidence_is_stored_compressed(compressing_storage):
+    path, original = compressing_storage.save_evidence_file(_upload("essay.txt", TEXT), 1)
+
+    assert original == "essay.txt"
+    assert path.endswith(".txt.zst")
+    assert os.path.getsize(path) < len(TEXT)
+    assert compressing_storage.get_file(path) == TEXT
+
+
+def test_hash_is_computed_over_original_content(compressing_storage):
+    path, _ = compressing_storage.save_evidence_file(_upload("essay.txt", TEXT), 2)
+    assert compressing_storage.hash_file(path) == hashlib.sha256(TEXT).hexdigest()
+
+
+def test_open_evidence_streams_decompressed_bytes(compressing_storage):
+    path, _ = compressing_storage.save_evidence_file(_upload("essay.pdf", TEXT), 3)
+    stream = compressing_storage.open_evidence(path)
+    chunks = []
+    for chunk in iter(lambda: stream.read(4096), b""):
+        chunks.append(chunk)
+    stream.close()
+    assert b"".join(chunks) == TEXT
+
+
+def test_images_and_incompressible_files_stay_raw(compressing_storage):
+    png_path, _ = compressing_storage.save_evidence_file(_upload("photo.png", TEXT), 4)
+    assert png_path.endswith(".png")
+
+    random_bytes = os.urandom(64 * 1024)
+    pdf_path, _ = compressing_storage.save_evidence_file(_upload("scan.pdf", random_bytes), 5)
+    assert pdf_path.endswith(".pdf")
+    assert compressing_storage.get_file(pdf_path) == random_bytes
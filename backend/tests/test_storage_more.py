@@ -1,4 +1,9 @@
+import os
+
+from app import db
+from app.models import Claim
 from app.services.storage import StorageService
+
 def test_allowed_file_none():
     assert StorageService().allowed_file(None) is False
 
@@ -10,4 +15,62 @@ def test_file_exists_and_delete(tmp_path):
     assert s.delete_file(str(p)) is True
     assert s.file_exists(str(p)) is False
     # deleting non-existent should be False
-    assert s.delete_file(str(p)) is False
\ No newline at end of file
+    assert s.delete_file(str(p)) is False
+
+class _Upload:
+    # minimal stand-in for a werkzeug FileStorage
+    def __init__(self, filename, content):
+        self.filename = filename
+        self.content = content
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+
+def test_save_uses_sharded_directories(tmp_path):
+    s = StorageService(base_path=str(tmp_path))
+    path, original = s.save_evidence_file(_Upload("proof.pdf", b"%PDF-data"), 7)
+    assert original == "proof.pdf"
+    # base/ab/cd/claim_7_...
+    rel = os.path.relpath(path, tmp_path).split(os.sep)
+    assert len(rel) == 3
+    assert len(rel[0]) == 2 and len(rel[1]) == 2
+    assert s.get_file(path) == b"%PDF-data"
+
+
+def test_hash_file_and_open_evidence_use_mapping(tmp_path):
+    s = StorageService(base_path=str(tmp_path))
+    path, _ = s.save_evidence_file(_Upload("notes.txt", b"hello world" * 1000), 1)
+    assert s.hash_file(path) == Claim.compute_file_hash(path)
+
+    stream = s.open_evidence(path)
+    assert stream.read() == b"hello world" * 1000
+    stream.close()
+
+
+def test_shard_command_moves_flat_files_and_updates_claims(app, runner, tmp_path):
+    flat = tmp_path / "claim_3_20240101_120000.pdf"
+    flat.write_bytes(b"old layout")
+    (tmp_path / "signing_key.pem").write_text("not evidence")
+
+    with app.app_context():
+        claim = Claim(student_name="A", student_email="a@dtu.dk", credential_type="micro",
+                      course_code="02369", evidence_file_path=str(flat))
+        db.session.add(claim)
+        db.session.commit()
+        claim_id = claim.id
+
+    # legacy path is still readable through the shard fallback after migration
+    result = runner.invoke(args=["storage", "shard", "--base-path", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "Moved 1 files, updated 1 claims" in result.output
+    assert not flat.exists()
+    assert (tmp_path / "signing_key.pem").exists()
+
+    s = StorageService(base_path=str(tmp_path))
+    assert s.get_file(str(flat)) == b"old layout"
+    with app.app_context():
+        new_path = db.session.get(Claim, claim_id).evidence_file_path
+        assert new_path != str(flat)
+        assert s.get_file(new_path) == b"old layout"
@@ -2,9 +2,13 @@
 Tests for student portal routes
 """
 import pytest
+from sqlalchemy import event
 from app import db
 from app.models import Claim
+from app.routes import claims as claims_module
+from app.services.storage import StorageService
 import io
+import os
 
 
 class TestStudentPortal:
@@ -83,6 +87,50 @@ class TestStudentPortal:
             assert claim.evidence_file_hash is not None
             assert len(claim.evidence_file_hash) == 64
 
+    def test_submit_claim_with_file_commits_once(self, client, app, monkeypatch, tmp_path):
+        """Evidence is stored first, the claim is inserted with it in a single transaction"""
+        monkeypatch.setattr(claims_module, 'storage_service', StorageService(base_path=str(tmp_path)))
+        commits = []
+        with app.app_context():
+            event.listen(db.engine, 'commit', lambda conn: commits.append(conn))
+
+        client.post('/student/submit-claim', data={
+            'student_name': 'Erik',
+            'student_email': 'erik@student.dtu.dk',
+            'credential_type': 'course-completion',
+            'course_code': '02102',
+            'evidence': (io.BytesIO(b"single commit evidence"), 'proof.pdf')
+        }, content_type='multipart/form-data')
+
+        assert len(commits) == 1
+        with app.app_context():
+            claim = Claim.query.filter_by(student_email='erik@student.dtu.dk').one()
+            assert os.path.basename(claim.evidence_file_path).startswith('upload_')
+            assert os.path.exists(claim.evidence_file_path)
+            assert len(claim.evidence_file_hash) == 64
+
+    def test_submit_claim_db_failure_removes_evidence(self, client, app, monkeypatch, tmp_path):
+        """A failed insert leaves neither a claim nor an orphaned evidence file"""
+        monkeypatch.setattr(claims_module, 'storage_service', StorageService(base_path=str(tmp_path)))
+
+        def failing_commit():
+            raise RuntimeError('database unavailable')
+
+        monkeypatch.setattr(db.session, 'commit', failing_commit)
+        response = client.post('/student/submit-claim', data={
+            'student_name': 'Frida',
+            'student_email': 'frida@student.dtu.dk',
+            'credential_type': 'course-completion',
+            'course_code': '02102',
+            'evidence': (io.BytesIO(b"orphan evidence"), 'proof.pdf')
+        }, content_type='multipart/form-data', follow_redirects=True)
+        monkeypatch.undo()
+
+        assert b'Error submitting claim' in response.data
+        assert [files for _, _, files in os.walk(tmp_path) if files] == []
+        with app.app_context():
+            assert Claim.query.filter_by(student_email='frida@student.dtu.dk').count() == 0
+
     def test_portal_shows_claims(self, client, sample_claim):
         """Test that portal displays submitted claims"""
         response = client.get('/student/portal')
@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.verifier_links import DatabaseLinkStore, MemoryLinkStore, create_link_store
+
+
+def _link(claim_id, expires_at):
+    return {"token_id": claim_id, "claim_id": claim_id, "expires_at": expires_at}
+
+
+@pytest.mark.parametrize("store_class", [MemoryLinkStore, DatabaseLinkStore])
+def test_purge_removes_only_expired_links(app, store_class):
+    with app.app_context():
+        store = store_class()
+        store.clear()
+        store.put("old", _link(1, 100.0))
+        store.put("older", _link(2, 50.0))
+        store.put("fresh", _link(3, 500.0))
+
+        assert store.purge_expired(now=200.0) == 2
+        assert store.get("old") is None
+        assert store.get("older") is None
+        assert store.get("fresh")["claim_id"] == 3
+
+        store.delete("fresh")
+        assert store.get("fresh") is None
+
+
+def test_memory_store_skips_stale_heap_entries():
+    store = MemoryLinkStore()
+    store.put("token", _link(1, 100.0))
+    # re-issued with a later expiry: the first heap entry must not remove it
+    store.put("token", _link(1, 300.0))
+
+    assert store.purge_expired(now=200.0) == 0
+    assert store.get("token")["expires_at"] == 300.0
+    assert store.purge_expired(now=400.0) == 1
+    assert len(store) == 0
+
+
+def test_link_store_selected_by_env(monkeypatch):
+    monkeypatch.setenv("VERIFIER_LINK_STORE", "memory")
+    assert isinstance(create_link_store(), MemoryLinkStore)
+    monkeypatch.delenv("VERIFIER_LINK_STORE")
+    assert isinstance(create_link_store(), DatabaseLinkStore)
+    monkeypatch.setenv("VERIFIER_LINK_STORE", "redis")
+    with pytest.raises(ValueError):
+        create_link_store()
@@ -1,4 +1,8 @@
 from datetime import datetime
+import base64
+import hashlib
+import io
+import json
 import time
 
 import pytest
@@ -60,6 +64,9 @@ class DummyBlockchain:
             "token_id": token_id,
         }
 
+    def verify_credentials(self, token_ids):
+        return {token_id: self.verify_credential(token_id) for token_id in token_ids}
+
 
 def test_verify_credential_happy_path(client, minted_claim, monkeypatch):
     # stub out real Web3 calls
@@ -81,7 +88,105 @@ def test_verify_credential_not_found_db(client):
     assert b"not found" in resp.data.lower()
 
 
-def test_generate_verifier_link_success(client, minted_claim):
+def test_verify_by_evidence_hash(client, minted_claim, monkeypatch):
+    monkeypatch.setattr(verify_module, "BlockchainService", lambda: DummyBlockchain(exists=True))
+
+    resp = client.get("/verify/hash/" + "A" * 64)
+    assert resp.status_code == 200
+    assert b"Verified Credential" in resp.data
+    assert b"02369" in resp.data
+
+    assert b"No credential found" in client.get("/verify/hash/" + "b" * 64).data
+    assert b"Not a valid SHA-256 hash" in client.get("/verify/hash/abc").data
+
+
+def test_verify_by_transaction_hash(client, minted_claim, monkeypatch):
+    monkeypatch.setattr(verify_module, "BlockchainService", lambda: DummyBlockchain(exists=True))
+
+    for tx_hash in ("0x" + "1" * 64, "1" * 64):
+        resp = client.get(f"/verify/tx/{tx_hash}")
+        assert b"Verified Credential" in resp.data
+
+    assert b"No credential found" in client.get("/verify/tx/0x" + "2" * 64).data
+    assert b"Not a valid transaction hash" in client.get("/verify/tx/0x123").data
+
+
+def test_verify_credential_json_etag(app, client, minted_claim, monkeypatch):
+    chain = DummyBlockchain(exists=True)
+    monkeypatch.setattr(verify_module, "BlockchainService", lambda: chain)
+    url = f"/verify/credential/{minted_claim['token_id']}.json"
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.get_json()["credential"]["course_code"] == "02369"
+    etag, weak = resp.get_etag()
+    assert etag and not weak
+    assert "public" in resp.headers["Cache-Control"]
+
+    cached = client.get(url, headers={"If-None-Match": f'"{etag}"'})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    # revoked on chain: new representation, new ETag
+    chain.revoked = True
+    resp = client.get(url, headers={"If-None-Match": f'"{etag}"'})
+    assert resp.status_code == 200
+    assert resp.get_json()["credential"]["is_revoked"] is True
+    revoked_etag = resp.get_etag()[0]
+    assert revoked_etag != etag
+
+    # any update of the claim changes it too
+    with app.app_context():
+        claim = db.session.get(Claim, minted_claim["id"])
+        claim.description = "Updated description"
+        db.session.commit()
+    resp = client.get(url, headers={"If-None-Match": f'"{revoked_etag}"'})
+    assert resp.status_code == 200
+    assert resp.get_etag()[0] != revoked_etag
+
+
+def test_verify_credential_json_not_found(client):
+    resp = client.get("/verify/credential/999999.json")
+    assert resp.status_code == 404
+    assert resp.get_json()["success"] is False
+    assert resp.get_etag() == (None, None)
+
+
+def test_verify_credentials_bulk(client, minted_claim, monkeypatch):
+    calls = []
+
+    class CountingBlockchain(DummyBlockchain):
+        def verify_credentials(self, token_ids):
+            calls.append(list(token_ids))
+            return super().verify_credentials(token_ids)
+
+    monkeypatch.setattr(verify_module, "BlockchainService", lambda: CountingBlockchain(revoked=True))
+
+    resp = client.post("/verify/credentials", json={"token_ids": [minted_claim["token_id"], 999, 999]})
+    assert resp.status_code == 200
+    assert resp.is_streamed
+
+    data = json.loads(resp.get_data())
+    assert data["success"] is True
+    assert data["count"] == 2
+    found, missing = data["credentials"]
+    assert found["verified"] is True
+    assert found["credential"]["course_code"] == "02369"
+    assert found["credential"]["is_revoked"] is True
+    assert "student_name" not in found["credential"]
+    assert missing == {"token_id": 999, "verified": False, "error": "Credential with Token ID 999 not found"}
+    # one batched chain read, only for credentials found in the database
+    assert calls == [[minted_claim["token_id"]]]
+
+
+def test_verify_credentials_bulk_rejects_bad_input(client):
+    assert client.post("/verify/credentials", json={"token_ids": []}).status_code == 400
+    assert client.post("/verify/credentials", json={"token_ids": ["1"]}).status_code == 400
+    too_many = list(range(verify_module.MAX_BULK_TOKEN_IDS + 1))
+    assert client.post("/verify/credentials", json={"token_ids": too_many}).status_code == 400
+
+
+def test_generate_verifier_link_success(app, client, minted_claim):
     resp = client.post(
         f"/verify/generate-verifier-link/{minted_claim['token_id']}",
         json={"wallet_address": minted_claim["wallet"]},
@@ -93,8 +198,9 @@ def test_generate_verifier_link_success(client, minted_claim):
     assert data["verifier_url"].startswith("/verify/private/")
 
     token = data["verifier_url"].split("/")[-1]
-    assert token in verify_module.verifier_links
-    stored = verify_module.verifier_links[token]
+    with app.app_context():
+        stored = verify_module.verifier_links.get(token)
+    assert stored is not None
     assert stored["token_id"] == minted_claim["token_id"]
     assert stored["claim_id"] == minted_claim["id"]
 
@@ -127,37 +233,69 @@ def test_view_private_credential_with_valid_token(client, minted_claim):
     assert b"Private Information Disclosed" in resp.data
     assert b"alice@example.com" in resp.data
     assert b"evidence.pdf" in resp.data
+    # the PDF download carries its signature, there is no manifest to offer
+    assert f"/verify/download-evidence/{token}/signature".encode() not in resp.data
 
 
-def test_view_private_credential_expired_token(client, minted_claim):
+def test_view_private_credential_expired_token(app, client, minted_claim):
     token = _get_verifier_token(client, minted_claim)
 
     # Force-expire the token
-    verify_module.verifier_links[token]["expires_at"] = time.time() - 10
+    with app.app_context():
+        stored = verify_module.verifier_links.get(token)
+        verify_module.verifier_links.put(token, {**stored, "expires_at": time.time() - 10})
 
     resp = client.get(f"/verify/private/{token}")
     assert resp.status_code == 200
     assert b"expired" in resp.data.lower()
     # token should be cleaned up
-    assert token not in verify_module.verifier_links
+    with app.app_context():
+        assert verify_module.verifier_links.get(token) is None
 
 
-def test_download_evidence_pdf_signed(client, minted_claim, monkeypatch):
-    # create a valid verifier token
-    token = _get_verifier_token(client, minted_claim)
+class DummyStorage:
+    def __init__(self):
+        self.artifacts = {}
 
-    class DummyStorage:
-        def get_file(self, path):
-            # minimal but valid-ish PDF bytes
-            return b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF"
+    def get_file(self, path):
+        # minimal but valid-ish PDF bytes
+        return b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF"
 
-    class DummySigner:
-        def __init__(self):
-            self.last_metadata = None
+    def hash_file(self, path):
+        return hashlib.sha256(self.get_file(path)).hexdigest()
 
-        def sign_pdf(self, content, metadata=None):
-            self.last_metadata = metadata
-            return content + b"SIGNED"
+    def save_artifact(self, name, content):
+        self.artifacts[name] = content
+        return name
+
+    def open_artifact(self, name):
+        if name not in self.artifacts:
+            return None
+        return io.BytesIO(self.artifacts[name])
+
+
+class DummySigner:
+    key_fingerprint = "f" * 64
+
+    def __init__(self):
+        self.last_metadata = None
+        self.sign_calls = 0
+
+    def sign_pdf(self, content, metadata=None):
+        self.last_metadata = metadata
+        self.sign_calls += 1
+        return content + b"SIGNED"
+
+    def get_certificate_info(self):
+        return {"subject": "CN=Dummy"}
+
+    def certificate_pem(self):
+        return "-----BEGIN CERTIFICATE-----\n"
+
+
+def test_download_evidence_pdf_signed(client, minted_claim, monkeypatch):
+    # create a valid verifier token
+    token = _get_verifier_token(client, minted_claim)
 
     dummy_storage = DummyStorage()
     dummy_signer = DummySigner()
@@ -176,6 +314,288 @@ def test_download_evidence_pdf_signed(client, minted_claim, monkeypatch):
     )
 
 
+def test_download_evidence_signs_only_once(client, minted_claim, monkeypatch):
+    token = _get_verifier_token(client, minted_claim)
+
+    dummy_storage = DummyStorage()
+    dummy_signer = DummySigner()
+    monkeypatch.setattr(verify_module, "storage_service", dummy_storage)
+    monkeypatch.setattr(verify_module, "pdf_signer", dummy_signer)
+
+    first = client.get(f"/verify/download-evidence/{token}")
+    second = client.get(f"/verify/download-evidence/{token}")
+
+    assert first.data == second.data
+    assert second.data.endswith(b"SIGNED")
+    assert dummy_signer.sign_calls == 1
+    assert len(dummy_storage.artifacts) == 1
+
+    # a different signing key must not reuse the cached artifact
+    dummy_signer.key_fingerprint = "0" * 64
+    client.get(f"/verify/download-evidence/{token}")
+    assert dummy_signer.sign_calls == 2
+
+
+def test_download_evidence_signing_busy_returns_503(client, minted_claim, monkeypatch):
+    from app.services.signing_pool import SigningQueueFull
+
+    token = _get_verifier_token(client, minted_claim)
+
+    class BusySigner(DummySigner):
+        def sign_pdf(self, content, metadata=None):
+            raise SigningQueueFull("full")
+
+    monkeypatch.setattr(verify_module, "storage_service", DummyStorage())
+    monkeypatch.setattr(verify_module, "pdf_signer", BusySigner())
+
+    resp = client.get(f"/verify/download-evidence/{token}")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "5"
+
+
+class TextStorage(DummyStorage):
+    content = b"lab report, plain text\n"
+
+    def get_file(self, path):
+        return self.content
+
+    def open_evidence(self, path):
+        return io.BytesIO(self.content)
+
+
+def _text_evidence(app, claim_id):
+    with app.app_context():
+        claim = db.session.get(Claim, claim_id)
+        claim.evidence_file_name = "evidence.txt"
+        claim.evidence_file_path = "dummy/path.txt"
+        db.session.commit()
+
+
+def test_download_evidence_signature_manifest(app, client, minted_claim, monkeypatch, tmp_path):
+    from app.services.signed_evidence import manifest_digest
+
+    signer = _real_signer(monkeypatch, tmp_path)
+    monkeypatch.setattr(verify_module, "storage_service", TextStorage())
+    _text_evidence(app, minted_claim["id"])
+    token = _get_verifier_token(client, minted_claim)
+
+    resp = client.get(f"/verify/download-evidence/{token}/signature")
+    assert resp.status_code == 200
+    assert "evidence.txt.sig.json" in resp.headers["Content-Disposition"]
+
+    manifest = resp.get_json()
+    downloaded = client.get(f"/verify/download-evidence/{token}").data
+    assert f"/verify/download-evidence/{token}/signature".encode() in client.get(f"/verify/private/{token}").data
+    assert manifest["version"] == 2
+    assert manifest["file_hash"] == hashlib.sha256(downloaded).hexdigest()
+    assert manifest["claim_id"] == minted_claim["id"]
+    assert manifest["matches_recorded_hash"] is False  # fixture records "a" * 64
+    assert manifest["key_fingerprint"] == signer.key_fingerprint
+
+    signature = base64.b64decode(manifest["signature"])
+    assert signer.verify_digest(manifest_digest(manifest), signature)
+    # the signature covers the claim, not just the file
+    assert not signer.verify_digest(manifest_digest(dict(manifest, claim_id=999)), signature)
+
+
+def test_download_evidence_signature_refused_for_pdf(client, minted_claim, monkeypatch, tmp_path):
+    _real_signer(monkeypatch, tmp_path)
+    monkeypatch.setattr(verify_module, "storage_service", DummyStorage())
+    token = _get_verifier_token(client, minted_claim)
+
+    resp = client.get(f"/verify/download-evidence/{token}/signature")
+    assert resp.status_code == 400
+    assert "embedded signature" in resp.get_json()["error"]
+
+
+def test_download_evidence_signature_invalid_token(client):
+    resp = client.get("/verify/download-evidence/not-a-real-token/signature")
+    assert resp.status_code == 403
+
+
+def test_evidence_bundle_streams_zip(client, minted_claim, monkeypatch):
+    import zipfile
+
+    token = _get_verifier_token(client, minted_claim)
+
+    monkeypatch.setattr(verify_module, "storage_service", DummyStorage())
+    monkeypatch.setattr(verify_module, "pdf_signer", DummySigner())
+    monkeypatch.setattr(verify_module, "BlockchainService", lambda: DummyBlockchain(exists=True))
+
+    resp = client.get(f"/verify/evidence-bundle?token={token}&token=expired-token")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/zip"
+    # streamed, no length known upfront
+    assert resp.is_streamed
+
+    archive = zipfile.ZipFile(io.BytesIO(resp.data))
+    assert archive.testzip() is None
+    folder = "123_02369"
+    assert sorted(archive.namelist()) == sorted([
+        "certificate.json", "certificate.pem",
+        f"{folder}/metadata.json", f"{folder}/verification.json", f"{folder}/evidence.pdf",
+        "errors.json",
+    ])
+    assert archive.read(f"{folder}/evidence.pdf").endswith(b"SIGNED")
+    metadata = json.loads(archive.read(f"{folder}/metadata.json"))
+    assert metadata["student_name"] == "Alice"
+    assert json.loads(archive.read(f"{folder}/verification.json"))["exists"] is True
+    assert json.loads(archive.read("errors.json"))["invalid_or_expired_links"] == ["expired-token"]
+
+
+def test_evidence_bundle_download_only_link_omits_pii(client, minted_claim, monkeypatch):
+    import zipfile
+
+    monkeypatch.setattr(verify_module, "storage_service", DummyStorage())
+    monkeypatch.setattr(verify_module, "pdf_signer", DummySigner())
+    monkeypatch.setattr(verify_module, "BlockchainService", lambda: DummyBlockchain(exists=True))
+
+    resp = client.post(
+        f"/verify/generate-verifier-link/{minted_claim['token_id']}",
+        json={"wallet_address": minted_claim["wallet"], "scopes": ["download"]},
+    )
+    token = resp.get_json()["verifier_url"].split("/")[-1]
+    # the link itself cannot show the private page
+    assert b"alice@example.com" not in client.get(f"/verify/private/{token}").data
+
+    archive = zipfile.ZipFile(io.BytesIO(client.get(f"/verify/evidence-bundle?token={token}").data))
+    metadata = json.loads(archive.read("123_02369/metadata.json"))
+    assert "student_name" not in metadata and "student_email" not in metadata
+    assert metadata["token_id"] == 123
+    assert b"alice@example.com" not in archive.read("123_02369/metadata.json")
+
+
+def test_evidence_bundle_rejects_invalid_links(client):
+    assert client.get("/verify/evidence-bundle").status_code == 400
+    assert client.get("/verify/evidence-bundle?token=nope").status_code == 403
+
+
+def _real_signer(monkeypatch, tmp_path):
+    from app.services.pdf_signer import PDFSignerService
+
+    monkeypatch.setenv("PDF_SIGNING_KEY_PATH", str(tmp_path / "signing_key.pem"))
+    monkeypatch.setenv("PDF_SIGNING_CERT_PATH", str(tmp_path / "signing_cert.pem"))
+    signer = PDFSignerService()
+    monkeypatch.setattr(verify_module, "pdf_signer", signer)
+    return signer
+
+
+def _blank_pdf():
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def test_verify_signature_of_signed_pdf(client, app, minted_claim, monkeypatch, tmp_path):
+    signer = _real_signer(monkeypatch, tmp_path)
+    original = _blank_pdf()
+    with app.app_context():
+        claim = db.session.get(Claim, minted_claim["id"])
+        claim.evidence_file_hash = hashlib.sha256(original).hexdigest()
+        db.session.commit()
+
+    signed = signer.sign_pdf(original, {
+        "title": "x", "claim_id": minted_claim["id"],
+        "evidence_hash": hashlib.sha256(original).hexdigest(),
+    })
+
+    resp = client.post("/verify/signature", data={"file": (io.BytesIO(signed), "evidence.pdf")},
+                       content_type="multipart/form-data")
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body["valid"] is True
+    assert body["method"] == "pdf"
+    assert body["current_key"] is True
+    assert body["credential"]["token_id"] == minted_claim["token_id"]
+
+    # appending an update after signing is reported
+    resp = client.post("/verify/signature", data={"file": (io.BytesIO(signed + b"%x\n"), "evidence.pdf")},
+                       content_type="multipart/form-data")
+    body = resp.get_json()
+    assert body["valid"] is False
+    assert body["credential"] is None
+
+
+def test_verify_signature_with_manifest(app, client, minted_claim, monkeypatch, tmp_path):
+    _real_signer(monkeypatch, tmp_path)
+    storage = TextStorage()
+    monkeypatch.setattr(verify_module, "storage_service", storage)
+    with app.app_context():
+        db.session.get(Claim, minted_claim["id"]).evidence_file_hash = hashlib.sha256(storage.content).hexdigest()
+        db.session.commit()
+    _text_evidence(app, minted_claim["id"])
+    token = _get_verifier_token(client, minted_claim)
+    manifest = client.get(f"/verify/download-evidence/{token}/signature").get_json()
+    evidence = client.get(f"/verify/download-evidence/{token}").data
+
+    def post(content, manifest=manifest):
+        return client.post("/verify/signature", data={
+            "file": (io.BytesIO(content), "evidence.txt"),
+            "manifest": (io.BytesIO(json.dumps(manifest).encode()), "evidence.txt.sig.json"),
+        }, content_type="multipart/form-data").get_json()
+
+    body = post(evidence)
+    assert body["valid"] is True
+    assert body["method"] == "manifest"
+    assert body["credential"]["token_id"] == minted_claim["token_id"]
+
+    assert post(evidence + b"x")["valid"] is False
+
+    # pointing the manifest at another claim breaks the signature
+    tampered = post(evidence, dict(manifest, claim_id=minted_claim["id"] + 1))
+    assert tampered["valid"] is False
+    assert tampered["credential"] is None
+
+    unversioned = post(evidence, dict(manifest, version=1))
+    assert unversioned["valid"] is False
+    assert "version" in unversioned["error"]
+
+
+def test_verify_signature_requires_file(client):
+    resp = client.post("/verify/signature", data={}, content_type="multipart/form-data")
+    assert resp.status_code == 400
+
+
+def test_stateless_verifier_link(app, client, minted_claim, monkeypatch):
+    app.config["VERIFIER_LINK_MODE"] = "stateless"
+    monkeypatch.setattr(verify_module, "storage_service", DummyStorage())
+    monkeypatch.setattr(verify_module, "pdf_signer", DummySigner())
+
+    resp = client.post(
+        f"/verify/generate-verifier-link/{minted_claim['token_id']}",
+        json={"wallet_address": minted_claim["wallet"], "scopes": ["view"]},
+    )
+    token = resp.get_json()["verifier_url"].split("/")[-1]
+    assert "." in token
+    # nothing was stored server side
+    with app.app_context():
+        assert verify_module.verifier_links.get(token) is None
+
+    assert b"alice@example.com" in client.get(f"/verify/private/{token}").data
+    # view-only link cannot download
+    resp = client.get(f"/verify/download-evidence/{token}")
+    assert resp.status_code == 403
+    assert "does not allow" in resp.get_json()["error"]
+
+    # a token signed under a different secret is rejected
+    app.config["SECRET_KEY"] = "rotated-secret"
+    assert b"Invalid or expired" in client.get(f"/verify/private/{token}").data
+    app.config["SECRET_KEY_FALLBACKS"] = ["test-secret-key"]
+    assert b"alice@example.com" in client.get(f"/verify/private/{token}").data
+
+
+def test_generate_verifier_link_rejects_unknown_scope(client, minted_claim):
+    resp = client.post(
+        f"/verify/generate-verifier-link/{minted_claim['token_id']}",
+        json={"wallet_address": minted_claim["wallet"], "scopes": ["admin"]},
+    )
+    assert resp.status_code == 400
+
+
 def test_download_evidence_invalid_token(client):
     resp = client.get("/verify/download-evidence/not-a-real-token")
     assert resp.status_code == 403
\ No newline at end of file